@@ -7,56 +7,198 @@ Scanne les tags #reflitterature et trouve les DOI/métadonnées
 import re
 import json
 import sys
+import asyncio
+import argparse
 import os
+import time
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Generator, Iterable, Iterator, List, Dict, Optional, Tuple
+from collections import deque, Counter
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 try:
     import requests
-    import ollama
     from tqdm import tqdm
+    from ollama_client import OllamaClient
 except ImportError:
     print("❌ Erreur: Certaines dépendances sont manquantes.")
     print("Installez-les avec: pip install -r requirements.txt")
     sys.exit(1)
 
 import config
+import config_defaults
+from bibliography import BibliographyIndex, normalize_key
+from citation_parser import parse_reference
+from cache import LLMCache, HttpCache
+from http_client import HttpClient
+from async_client import AsyncHttpClient
+from ratelimit import RateLimiter
+from pipeline import Pipeline
+from ranking import author_score, normalize_doi, rank_candidates, year_score
+from metrics import Metrics
+from doi_index import OfflineIndex
+from identifiers import find_identifiers
+from manifest import VaultManifest, reference_key
+from journal import Journal
+from watcher import VaultWatcher
+import server
+import citation_index
+from citation_index import CitationIndex
+from reports import JsonArrayWriter, JsonLinesWriter, MarkdownReportWriter, ReportWriters
+
+# Réglages ajoutés depuis la création du config.py de l'utilisateur
+config_defaults.apply(config)
+
+# Pattern pour détecter %% #reflitterature description %%
+TAG_PATTERN = re.compile(r'%%\s*#reflitterature\s+(.+?)\s*%%')
+# Citation surlignée juste avant le tag : ==...citation...== %% #reflitterature
+CITATION_PATTERN = re.compile(r'==(.+?)==\s*%%\s*#reflitterature')
+# Citations entre parenthèses (Auteur Année)
+PAREN_REF_PATTERN = re.compile(r'\(([^)]+?\d{4}[^)]*)\)')
+# Champs propres à une occurrence (voir _scan_window_line), recopiés sur chaque doublon
+OCCURRENCE_FIELDS = ('file', 'line', 'raw_text', 'comment', 'context', 'context_range', 'line_text')
+# Backticks parfois ajoutés par le LLM autour du JSON
+JSON_FENCE_START = re.compile(r'^```json\s*')
+JSON_FENCE_END = re.compile(r'\s*```$')
+
+# Champs demandés aux APIs (select=) : seuls ceux lus par les candidats
+OPENALEX_SELECT = 'id,doi,title,publication_year,authorships'
+CROSSREF_SELECT = 'DOI,title,author,published-print,issued'
+# Un lot d'ISBN est réattribué à chaque identifiant via ce champ
+CROSSREF_ISBN_SELECT = CROSSREF_SELECT + ',ISBN'
+# Noms des APIs dans les messages
+API_LABELS = {'openalex': 'OpenAlex', 'crossref': 'CrossRef'}
+# Séparateurs de la syntaxe des filtres, à retirer des valeurs recherchées
+FILTER_UNSAFE = re.compile(r'[,|:]+')
+ET_AL_PATTERN = re.compile(r'\bet\s+al\b\.?', re.I)
+
+# Version du gabarit de prompt LLM (à incrémenter à chaque modification du prompt
+# pour invalider le cache)
+PROMPT_VERSION = "2"
+
+# Marge de tokens par référence dans un prompt groupé (numérotation + réponse JSON)
+LLM_BATCH_TOKENS_PER_ITEM = 80
+# Tokens générés au plus pour la réponse JSON d'une seule référence
+LLM_MAX_OUTPUT_TOKENS = 256
 
 
 class BiblioEnricher:
     """Agent pour enrichir les références bibliographiques"""
 
-    def __init__(self, vault_path: str = None):
+    def __init__(self, vault_path: str = None, use_cache: bool = True,
+                 refresh_cache: bool = False, async_api: bool = False,
+                 offline: bool = False):
         """
         Initialise l'enrichisseur
 
         Args:
             vault_path: Chemin vers le vault Obsidian (par défaut: config.VAULT_PATH)
+            use_cache: False pour ne pas utiliser les caches LLM et HTTP (--no-cache)
+            refresh_cache: True pour recalculer et réécrire les caches (--refresh)
+            async_api: True pour interroger les APIs en asynchrone (--async-api)
+            offline: True pour résoudre uniquement avec l'index DOI local (--offline)
         """
         self.vault_path = Path(vault_path or config.VAULT_PATH).resolve()
         self.biblio_file = self.vault_path / config.BIBLIO_FILE
         self.output_dir = self.vault_path / config.OUTPUT_DIR
         self.output_dir.mkdir(exist_ok=True)
-
-        # Vérifier qu'Ollama est accessible
+        self.async_api = async_api
+
+        # Latence par étape, compteurs (voies d'extraction, erreurs), jauges
+        self.metrics = Metrics(trace='trace' in config.METRICS_FORMATS)
+        self.last_unique_count = 0
+
+        # Index de la bibliographie (chargé à la première recherche)
+        self._biblio_index: Optional[BibliographyIndex] = None
+        self._biblio_signature: Optional[Tuple[int, int]] = None
+
+        # Cache persistant des extractions LLM
+        self.llm_cache = LLMCache(
+            self.output_dir / config.LLM_CACHE_FILE,
+            max_entries=config.LLM_CACHE_MAX_ENTRIES,
+            max_age_days=config.LLM_CACHE_MAX_AGE_DAYS,
+            enabled=use_cache and config.LLM_CACHE_ENABLED,
+            refresh=refresh_cache
+        )
+
+        # Session HTTP partagée (keep-alive) avec cache des réponses API
+        self.http = HttpClient(
+            HttpCache(
+                self.output_dir / config.HTTP_CACHE_FILE,
+                max_entries=config.HTTP_CACHE_MAX_ENTRIES,
+                enabled=use_cache and config.HTTP_CACHE_ENABLED,
+                refresh=refresh_cache
+            ),
+            RateLimiter(
+                config.API_RATE_LIMITS,
+                max_retries=config.API_MAX_RETRIES,
+                backoff_base=config.API_BACKOFF_BASE,
+                backoff_max=config.API_BACKOFF_MAX,
+                breaker_threshold=config.CIRCUIT_BREAKER_THRESHOLD,
+                breaker_cooldown=config.CIRCUIT_BREAKER_COOLDOWN
+            ),
+            pool_size=config.HTTP_POOL_SIZE,
+            timeout=config.HTTP_TIMEOUT,
+            default_ttl=config.HTTP_CACHE_TTL_HOURS * 3600
+        )
+        # Requêtes des sessions asynchrones (--async-api), cumulées pour les métriques
+        self.async_http_stats = Counter()
+
+        # Index DOI local (hors ligne), construit avec doi_index.py
+        self.offline = offline
+        self.offline_index: Optional[OfflineIndex] = None
+        if config.OFFLINE_INDEX_FILE:
+            self.offline_index = OfflineIndex(self.output_dir / config.OFFLINE_INDEX_FILE)
+        elif offline:
+            raise ValueError("--offline nécessite OFFLINE_INDEX_FILE dans config.py")
+
+        # Index des citations du vault (alimenté à chaque sauvegarde des résultats)
+        self.citation_index: Optional[CitationIndex] = None
+        if config.CITATION_INDEX_FILE:
+            self.citation_index = CitationIndex(self.output_dir / config.CITATION_INDEX_FILE)
+
+        # Requêtes CrossRef lancées pendant que le worker interroge OpenAlex
+        self._api_executor = ThreadPoolExecutor(max_workers=config.HTTP_WORKERS,
+                                                thread_name_prefix='crossref')
+
+        # Client Ollama : modèle préchargé, appels simultanés jusqu'à OLLAMA_NUM_PARALLEL
+        self.llm = OllamaClient(
+            host=config.OLLAMA_URL,
+            model=config.OLLAMA_MODEL,
+            keep_alive=config.OLLAMA_KEEP_ALIVE,
+            num_ctx=config.OLLAMA_NUM_CTX,
+            num_parallel=config.OLLAMA_NUM_PARALLEL,
+            output_format=config.OLLAMA_FORMAT,
+            timeout=config.OLLAMA_TIMEOUT
+        )
+        # Lots et replis individuels d'un même appel envoyés en parallèle
+        self._llm_executor = ThreadPoolExecutor(max_workers=config.OLLAMA_NUM_PARALLEL,
+                                                thread_name_prefix='ollama')
+
+        # Vérifier qu'Ollama est accessible et charger le modèle
         self._check_ollama()
 
     def _check_ollama(self):
-        """Vérifie que le serveur Ollama est accessible"""
+        """Vérifie que le serveur Ollama est accessible et précharge le modèle"""
         try:
-            response = requests.get(f"{config.OLLAMA_URL}/api/tags", timeout=5)
-            if response.status_code == 200:
-                models = response.json().get('models', [])
-                model_names = [m['name'] for m in models]
-                if not any(config.OLLAMA_MODEL in name for name in model_names):
-                    print(f"⚠️  Warning: Le modèle '{config.OLLAMA_MODEL}' n'est pas installé.")
-                    print(f"   Téléchargez-le avec: ollama pull {config.OLLAMA_MODEL}")
-            else:
-                raise ConnectionError()
-        except:
+            model_names = self.llm.installed_models()
+        except Exception:
             print(f"⚠️  Warning: Ollama n'est pas accessible à {config.OLLAMA_URL}")
             print("   Assurez-vous qu'Ollama est démarré: ollama serve")
+            return
+
+        if not any(config.OLLAMA_MODEL in name for name in model_names):
+            print(f"⚠️  Warning: Le modèle '{config.OLLAMA_MODEL}' n'est pas installé.")
+            print(f"   Téléchargez-le avec: ollama pull {config.OLLAMA_MODEL}")
+            return
+
+        try:
+            with self.metrics.timer('llm_warmup'):
+                self.llm.warm_up()
+        except Exception as e:
+            print(f"⚠️  Warning: Préchargement du modèle impossible: {e}")
 
     def scan_file(self, filename: str) -> List[Dict]:
         """
@@ -68,6 +210,23 @@ class BiblioEnricher:
         Returns:
             Liste de dictionnaires contenant les références trouvées
         """
+        return list(self.iter_references(filename))
+
+    def iter_references(self, filename: str) -> Iterator[Dict]:
+        """
+        Scanne un fichier .md en flux et produit les références au fil de la lecture
+
+        Le fichier est lu ligne à ligne avec une fenêtre glissante de
+        2 × CONTEXT_LINES + 1 lignes : la mémoire reste bornée même pour
+        de très gros fichiers, et chaque référence peut être enrichie
+        avant la fin du scan.
+
+        Args:
+            filename: Nom du fichier à scanner (avec ou sans .md)
+
+        Yields:
+            Dictionnaires décrivant chaque référence trouvée
+        """
         # Ajouter .md si nécessaire
         if not filename.endswith('.md'):
             filename += '.md'
@@ -86,53 +245,95 @@ class BiblioEnricher:
                 for f in similar[:5]:
                     print(f"   - {f.name}")
 
-            return []
+            return
 
         print(f"📖 Scan du fichier: {filename}")
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        references = []
+        context_lines = config.CONTEXT_LINES
+        window = deque(maxlen=2 * context_lines + 1)  # (numéro, ligne)
+        count = 0
+        # Temps de scan hors attente du consommateur (mesuré entre deux yield)
+        busy = 0.0
+        started = time.perf_counter()
 
-        # Pattern pour détecter %% #reflitterature description %%
-        pattern = r'%%\s*#reflitterature\s+(.+?)\s*%%'
-
-        for line_num, line in enumerate(lines, 1):
-            matches = re.finditer(pattern, line)
-            for match in matches:
-                comment_text = match.group(1).strip()
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                window.append((line_num, line))
+                # La ligne centrale a maintenant tout son contexte suivant
+                center = line_num - context_lines
+                if center >= 1:
+                    for ref in self._scan_window_line(window, center, filename):
+                        count += 1
+                        busy += time.perf_counter() - started
+                        yield ref
+                        started = time.perf_counter()
+
+            # Fin du fichier : traiter les dernières lignes (contexte suivant tronqué)
+            last = window[-1][0] if window else 0
+            for center in range(max(1, last - context_lines + 1), last + 1):
+                for ref in self._scan_window_line(window, center, filename):
+                    count += 1
+                    busy += time.perf_counter() - started
+                    yield ref
+                    started = time.perf_counter()
+
+        self.metrics.observe('scan', busy + time.perf_counter() - started)
+        print(f"   ✓ {count} référence(s) #reflitterature trouvée(s)")
+
+    def _scan_window_line(self, window: deque, line_num: int, filename: str) -> Iterator[Dict]:
+        """
+        Extrait les références d'une ligne de la fenêtre glissante
 
-                # Extraire la citation AVANT le tag (entre == ==)
-                # Pattern : ==...citation...== %% #reflitterature
-                citation_pattern = r'==(.+?)==\s*%%\s*#reflitterature'
-                citation_match = re.search(citation_pattern, line)
+        Args:
+            window: Dernières lignes lues (numéro, ligne)
+            line_num: Numéro de la ligne à analyser
+            filename: Nom du fichier (pour les résultats)
 
-                if citation_match:
-                    citation_text = citation_match.group(1).strip()
-                    # Extraire les citations entre parenthèses (Auteur Année)
-                    citation_refs = re.findall(r'\(([^)]+?\d{4}[^)]*)\)', citation_text)
-                    ref_text = '; '.join(citation_refs) if citation_refs else citation_text
-                else:
-                    # Fallback : utiliser le commentaire si pas de citation trouvée
-                    ref_text = comment_text
-
-                # Extraire le contexte (lignes autour)
-                start_idx = max(0, line_num - 1 - config.CONTEXT_LINES)
-                end_idx = min(len(lines), line_num + config.CONTEXT_LINES)
-                context = ''.join(lines[start_idx:end_idx])
-
-                references.append({
-                    'file': filename,
-                    'line': line_num,
-                    'raw_text': ref_text,
-                    'comment': comment_text,
-                    'context': context,
-                    'line_text': line.strip()
-                })
-
-        print(f"   ✓ {len(references)} référence(s) #reflitterature trouvée(s)")
-        return references
+        Yields:
+            Références trouvées sur la ligne
+        """
+        line = window[line_num - window[0][0]][1]
+
+        # Pré-filtre rapide avant les expressions régulières
+        if '#reflitterature' not in line:
+            return
+
+        matches = list(TAG_PATTERN.finditer(line))
+        if not matches:
+            return
+
+        # Extraire la citation AVANT le tag (entre == ==)
+        # Pattern : ==...citation...== %% #reflitterature
+        citation_match = CITATION_PATTERN.search(line)
+        if citation_match:
+            citation_text = citation_match.group(1).strip()
+            # Extraire les citations entre parenthèses (Auteur Année)
+            citation_refs = PAREN_REF_PATTERN.findall(citation_text)
+            citation_ref_text = '; '.join(citation_refs) if citation_refs else citation_text
+        else:
+            citation_ref_text = None
+
+        # Extraire le contexte (lignes autour)
+        context_lines = [(num, text) for num, text in window
+                         if line_num - config.CONTEXT_LINES <= num <= line_num + config.CONTEXT_LINES]
+        context = ''.join(text for _, text in context_lines)
+        context_range = [context_lines[0][0], context_lines[-1][0]]
+
+        for match in matches:
+            comment_text = match.group(1).strip()
+
+            # Fallback : utiliser le commentaire si pas de citation trouvée
+            ref_text = citation_ref_text if citation_ref_text is not None else comment_text
+
+            yield {
+                'file': filename,
+                'line': line_num,
+                'raw_text': ref_text,
+                'comment': comment_text,
+                'context': context,
+                'context_range': context_range,
+                'line_text': line.strip()
+            }
 
     def search_in_bibliography(self, ref_text: str) -> Optional[str]:
         """
@@ -144,47 +345,28 @@ class BiblioEnricher:
         Returns:
             La référence complète si trouvée, None sinon
         """
-        if not self.biblio_file.exists():
-            return None
-
-        with open(self.biblio_file, 'r', encoding='utf-8') as f:
-            biblio_content = f.read()
-
-        # Extraire tous les auteurs et années de la citation
-        # Format : "Habermas 2021, Habermas 1992" ou "Anderson and Rainie 2017"
+        with self.metrics.timer('bibliography'):
+            index = self._get_bibliography_index()
+            if index is None:
+                return None
 
-        # Extraire les années
-        years = re.findall(r'\b(19|20)\d{2}\b', ref_text)
+            return index.search(ref_text)
 
-        # Extraire les noms d'auteur (mots commençant par une majuscule)
-        authors = re.findall(r'\b([A-Z][a-zà-ÿ]+)', ref_text)
-        # Filtrer les mots comme "and", "et"
-        authors = [a for a in authors if a.lower() not in ['and', 'et', 'the', 'de', 'du', 'la', 'le']]
-
-        if not (authors and years):
+    def _get_bibliography_index(self) -> Optional[BibliographyIndex]:
+        """
+        Retourne l'index de la bibliographie, parsé une seule fois
+        et reconstruit uniquement si le fichier a changé sur le disque
+        """
+        if not self.biblio_file.exists():
             return None
 
-        # Chercher dans la bibliographie
-        lines = biblio_content.split('\n')
-        best_match = None
-        max_matches = 0
+        stat = self.biblio_file.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._biblio_index is None or self._biblio_signature != signature:
+            self._biblio_index = BibliographyIndex.from_file(self.biblio_file)
+            self._biblio_signature = signature
 
-        for i, line in enumerate(lines):
-            # Compter les matchs (auteurs + année)
-            matches = sum(1 for author in authors if author in line)
-            matches += sum(1 for year in years if year in line)
-
-            if matches > max_matches:
-                max_matches = matches
-                # Retourner cette ligne et éventuellement les suivantes
-                full_ref = line
-                j = i + 1
-                while j < len(lines) and lines[j].strip() and not lines[j].startswith('\n'):
-                    full_ref += ' ' + lines[j].strip()
-                    j += 1
-                best_match = full_ref.strip()
-
-        return best_match if max_matches >= 2 else None
+        return self._biblio_index
 
     def extract_metadata_with_llm(self, ref_text: str, full_ref: Optional[str] = None) -> Dict:
         """
@@ -201,46 +383,32 @@ class BiblioEnricher:
         # Texte à analyser (priorité à la référence complète)
         text_to_analyze = full_ref if full_ref else ref_text
 
-        prompt = f"""Tu es un assistant bibliographique. Analyse cette référence et extrais les informations suivantes.
-Note : la référence peut contenir des erreurs OCR (caractères mal reconnus).
-
-Référence: {text_to_analyze}
-
-Extrais et retourne UNIQUEMENT un objet JSON avec ce format exact:
-{{
-  "author": "Nom de l'auteur principal (format: Nom, Prénom)",
-  "title": "Titre complet de l'ouvrage ou article",
-  "year": "Année de publication (nombre à 4 chiffres)",
-  "confidence": 0.85
-}}
+        prompt = self._build_prompt(text_to_analyze)
 
-Le champ confidence doit être entre 0 et 1 selon ta certitude (1 = très sûr, 0.5 = incertain).
-NE retourne QUE le JSON, sans texte avant ou après."""
+        # Réutiliser une extraction déjà faite (même prompt, même modèle)
+        cache_key = LLMCache.make_key(prompt, config.OLLAMA_MODEL, PROMPT_VERSION)
+        cached = self.llm_cache.get(cache_key)
+        if cached is not None:
+            self._count_path('cache')
+            return cached
 
         try:
             # Appel à Ollama
-            response = ollama.chat(
-                model=config.OLLAMA_MODEL,
-                messages=[{'role': 'user', 'content': prompt}]
-            )
-
-            # Parser la réponse JSON
-            response_text = response['message']['content'].strip()
-
-            # Nettoyer la réponse (parfois le LLM ajoute des backticks)
-            response_text = re.sub(r'^```json\s*', '', response_text)
-            response_text = re.sub(r'\s*```$', '', response_text)
+            response_text = self._call_llm(prompt, LLM_MAX_OUTPUT_TOKENS)
 
-            metadata = json.loads(response_text)
+            metadata = json.loads(self._strip_json_fences(response_text))
 
             # Validation basique
-            if not all(k in metadata for k in ['author', 'title', 'year']):
+            if not self._is_valid_metadata(metadata):
                 raise ValueError("Champs manquants dans la réponse")
 
+            self.llm_cache.set(cache_key, metadata, config.OLLAMA_MODEL, PROMPT_VERSION)
+            self._count_path('llm')
             return metadata
 
         except Exception as e:
             print(f"   ⚠️  Erreur LLM: {e}")
+            self._count_path('llm_error')
             # Retour par défaut en cas d'erreur
             return {
                 'author': 'Unknown',
@@ -249,6 +417,223 @@ NE retourne QUE le JSON, sans texte avant ou après."""
                 'confidence': 0.0
             }
 
+    def extract_metadata_batch(self, refs: List[Tuple[str, Optional[str]]]) -> List[Dict]:
+        """
+        Extrait les métadonnées de plusieurs références en regroupant les appels LLM
+
+        Les références absentes du cache sont regroupées en lots (limités par
+        LLM_BATCH_TOKEN_BUDGET) envoyés en un seul prompt qui demande un
+        tableau JSON. Chaque élément est validé individuellement ; ceux qui
+        échouent repassent par extract_metadata_with_llm.
+
+        Args:
+            refs: Liste de (texte brut, référence complète ou None)
+
+        Returns:
+            Métadonnées dans le même ordre que refs
+        """
+        results: List[Optional[Dict]] = [None] * len(refs)
+        pending = []  # (position, texte analysé, clé de cache)
+
+        for i, (ref_text, full_ref) in enumerate(refs):
+            text_to_analyze = full_ref if full_ref else ref_text
+            cache_key = LLMCache.make_key(self._build_prompt(text_to_analyze),
+                                          config.OLLAMA_MODEL, PROMPT_VERSION)
+            cached = self.llm_cache.get(cache_key)
+            if cached is not None:
+                self._count_path('cache')
+                results[i] = cached
+            else:
+                pending.append((i, text_to_analyze, cache_key))
+
+        # Les lots partent ensemble : le serveur en traite OLLAMA_NUM_PARALLEL à la fois
+        batches = [batch for batch in self._split_llm_batches(pending) if len(batch) > 1]
+        for batch, parsed in zip(batches, self._llm_executor.map(self._extract_batch, batches)):
+            for position, (i, _, cache_key) in enumerate(batch):
+                metadata = parsed.get(position)
+                if metadata is not None:
+                    self.llm_cache.set(cache_key, metadata, config.OLLAMA_MODEL, PROMPT_VERSION)
+                    self._count_path('llm')
+                    results[i] = metadata
+
+        # Repli : appel individuel pour les éléments non résolus
+        unresolved = [i for i in range(len(refs)) if results[i] is None]
+        fallbacks = self._llm_executor.map(lambda i: self.extract_metadata_with_llm(*refs[i]), unresolved)
+        for i, metadata in zip(unresolved, fallbacks):
+            results[i] = metadata
+
+        return results
+
+    def _extract_batch(self, batch: List[Tuple]) -> Dict[int, Dict]:
+        """Un appel LLM pour un lot ; métadonnées par position ({} en cas d'échec)"""
+        try:
+            response_text = self._call_llm(
+                self._build_batch_prompt([text for _, text, _ in batch]),
+                LLM_BATCH_TOKENS_PER_ITEM * len(batch), batch=True
+            )
+            return self._parse_batch_response(response_text, len(batch))
+        except Exception as e:
+            print(f"   ⚠️  Erreur LLM (lot de {len(batch)}): {e}")
+            return {}
+
+    def parse_with_rules(self, ref_text: str, full_ref: Optional[str] = None) -> Optional[Dict]:
+        """
+        Voie rapide : parseur déterministe (APA, Chicago) avant le LLM
+
+        Args:
+            ref_text: Texte brut de la référence
+            full_ref: Référence complète depuis bibliographie (optionnel)
+
+        Returns:
+            Métadonnées si le parseur est assez confiant
+            (>= PARSER_MIN_CONFIDENCE), None pour passer au LLM
+        """
+        metadata = parse_reference(full_ref if full_ref else ref_text)
+        if metadata and metadata['confidence'] >= config.PARSER_MIN_CONFIDENCE:
+            self._count_path('parser')
+            return metadata
+        return None
+
+    def _count_path(self, path: str):
+        """Comptabilise la voie d'extraction empruntée par une référence"""
+        self.metrics.incr('extraction_path', path)
+
+    @property
+    def path_counts(self) -> Counter:
+        """Nombre de références par voie d'extraction (identifiant, règles, cache, LLM, échec)"""
+        snapshot = self.metrics.snapshot()['counters'].get('extraction_path', {})
+        return Counter(snapshot)
+
+    def _split_llm_batches(self, pending: List[Tuple]) -> Iterator[List[Tuple]]:
+        """
+        Découpe les références à extraire en lots respectant le budget de tokens
+
+        Estimation grossière : ~4 caractères par token, plus une marge par
+        élément pour la réponse JSON.
+        """
+        batch = []
+        used = 0
+        for item in pending:
+            cost = len(item[1]) // 4 + LLM_BATCH_TOKENS_PER_ITEM
+            if batch and (used + cost > config.LLM_BATCH_TOKEN_BUDGET
+                          or len(batch) >= config.LLM_BATCH_SIZE):
+                yield batch
+                batch, used = [], 0
+            batch.append(item)
+            used += cost
+        if batch:
+            yield batch
+
+    def _call_llm(self, prompt: str, num_predict: int, batch: bool = False) -> str:
+        """Envoie un prompt à Ollama et retourne le texte de la réponse"""
+        with self.metrics.timer('llm'):
+            return self.llm.chat(prompt, num_predict, batch)
+
+    @staticmethod
+    def _strip_json_fences(response_text: str) -> str:
+        """Nettoie la réponse (parfois le LLM ajoute des backticks)"""
+        response_text = JSON_FENCE_START.sub('', response_text.strip())
+        return JSON_FENCE_END.sub('', response_text)
+
+    @staticmethod
+    def _is_valid_metadata(metadata) -> bool:
+        """Vérifie qu'une réponse contient les champs attendus"""
+        return isinstance(metadata, dict) and all(k in metadata for k in ['author', 'title', 'year'])
+
+    def _parse_batch_response(self, response_text: str, size: int) -> Dict[int, Dict]:
+        """
+        Parse la réponse d'un prompt groupé, élément par élément
+
+        Accepte un tableau JSON, un objet {"references": [...]}, ou à défaut
+        une suite d'objets JSON isolés dans le texte (réponse tronquée ou
+        mal formée). Les éléments sont rattachés par leur champ "id"
+        (numérotation à partir de 1) ou, sinon, par leur position.
+
+        Args:
+            response_text: Réponse brute du LLM
+            size: Nombre de références dans le lot
+
+        Returns:
+            {position dans le lot: métadonnées validées}
+        """
+        text = self._strip_json_fences(response_text)
+
+        try:
+            data = json.loads(text)
+            if isinstance(data, dict):
+                data = data.get('references', [data])
+            items = data if isinstance(data, list) else []
+        except ValueError:
+            # Récupérer chaque objet décodable indépendamment
+            decoder = json.JSONDecoder()
+            items = []
+            pos = text.find('{')
+            while pos != -1:
+                try:
+                    obj, end = decoder.raw_decode(text, pos)
+                    items.append(obj)
+                    pos = text.find('{', end)
+                except ValueError:
+                    pos = text.find('{', pos + 1)
+
+        parsed = {}
+        for position, item in enumerate(items):
+            if not self._is_valid_metadata(item):
+                continue
+            item = dict(item)
+            item_id = item.pop('id', None)
+            try:
+                index = int(item_id) - 1
+            except (TypeError, ValueError):
+                index = position
+            if 0 <= index < size and index not in parsed:
+                parsed[index] = item
+
+        return parsed
+
+    def _build_prompt(self, text_to_analyze: str) -> str:
+        """Construit le prompt d'extraction de métadonnées pour une référence"""
+        return f"""Tu es un assistant bibliographique. Analyse cette référence et extrais les informations suivantes.
+Note : la référence peut contenir des erreurs OCR (caractères mal reconnus).
+
+Référence: {text_to_analyze}
+
+Extrais et retourne UNIQUEMENT un objet JSON avec ce format exact:
+{{
+  "author": "Nom de l'auteur principal (format: Nom, Prénom)",
+  "title": "Titre complet de l'ouvrage ou article",
+  "year": "Année de publication (nombre à 4 chiffres)",
+  "confidence": 0.85
+}}
+
+Le champ confidence doit être entre 0 et 1 selon ta certitude (1 = très sûr, 0.5 = incertain).
+NE retourne QUE le JSON, sans texte avant ou après."""
+
+    def _build_batch_prompt(self, texts: List[str]) -> str:
+        """Construit le prompt d'extraction groupée pour plusieurs références numérotées"""
+        numbered = '\n'.join(f"[{i}] {text}" for i, text in enumerate(texts, 1))
+        return f"""Tu es un assistant bibliographique. Analyse chacune des {len(texts)} références numérotées ci-dessous et extrais leurs informations.
+Note : les références peuvent contenir des erreurs OCR (caractères mal reconnus).
+
+Références:
+{numbered}
+
+Retourne UNIQUEMENT un objet JSON dont le champ "references" contient un objet par référence, dans le même ordre, avec ce format exact:
+{{
+  "references": [
+    {{
+      "id": 1,
+      "author": "Nom de l'auteur principal (format: Nom, Prénom)",
+      "title": "Titre complet de l'ouvrage ou article",
+      "year": "Année de publication (nombre à 4 chiffres)",
+      "confidence": 0.85
+    }}
+  ]
+}}
+
+Le champ id reprend le numéro de la référence. Le champ confidence doit être entre 0 et 1 selon ta certitude (1 = très sûr, 0.5 = incertain).
+NE retourne QUE le JSON, sans texte avant ou après."""
+
     def search_openalex(self, author: str, title: str, year: str) -> Optional[Dict]:
         """
         Recherche dans OpenAlex (API gratuite prioritaire)
@@ -257,58 +642,379 @@ NE retourne QUE le JSON, sans texte avant ou après."""
             author, title, year: Métadonnées extraites
 
         Returns:
-            Informations bibliographiques avec DOI si trouvé
+            Informations bibliographiques avec DOI si trouvé (meilleur candidat)
         """
-        base_url = "https://api.openalex.org/works"
+        metadata = {'author': author, 'title': title, 'year': year}
+        return rank_candidates(metadata, self._fetch('openalex', author, title, year),
+                               config.RANKING_WEIGHTS)
 
-        # Construire la requête de recherche
-        # OpenAlex utilise un format de requête spécifique
-        query = f"{title} {author} {year}".strip()
+    def search_local(self, author: str, title: str, year: str) -> Optional[Dict]:
+        """
+        Recherche dans l'index DOI local (sans réseau)
 
-        params = {
-            'search': query,
-            'per_page': 5  # Limiter à 5 résultats
-        }
+        Args:
+            author, title, year: Métadonnées extraites
+
+        Returns:
+            Informations bibliographiques avec DOI si trouvé (meilleur candidat)
+        """
+        if self.offline_index is None:
+            return None
+        metadata = {'author': author, 'title': title, 'year': year}
+        with self.metrics.timer('local_index'):
+            candidates = self.offline_index.candidates(author, title, year)
+        return rank_candidates(metadata, candidates, config.RANKING_WEIGHTS)
+
+    def resolve_identifiers(self, identifiers: List[Dict[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """
+        Résout des identifiants par requêtes exactes groupées
+
+        DOI : index local, puis OpenAlex, puis CrossRef. OpenAlex (W...) :
+        notices OpenAlex. ISBN : filtre isbn de CrossRef. Les identifiants
+        sont regroupés par lots de BULK_LOOKUP_SIZE (filtres OU des deux APIs),
+        envoyés en parallèle ; chaque notice reçue est aussi mise en cache
+        sous la requête individuelle, sans expiration.
+
+        Args:
+            identifiers: Liste de {'type': 'doi' | 'openalex' | 'isbn', 'value': ...}
+
+        Returns:
+            {(type, valeur): résultat au format des recherches API (confiance 1.0)},
+            sans les identifiants introuvables
+        """
+        keys = list(dict.fromkeys((i['type'], i['value']) for i in identifiers))
+        found: Dict[Tuple[str, str], Dict] = {}
+
+        if self.offline_index is not None:
+            for kind, value in keys:
+                if kind == 'doi':
+                    with self.metrics.timer('local_index'):
+                        local = self.offline_index.lookup_doi(value)
+                    if local:
+                        found[(kind, value)] = local
+
+        if not self.offline:
+            found.update(self._bulk_lookup(
+                [k for k in keys if k not in found and k[0] in ('doi', 'openalex')],
+                self._cached_openalex, self._openalex_chunk
+            ))
+            found.update(self._bulk_lookup(
+                [k for k in keys if k not in found and k[0] in ('doi', 'isbn')],
+                self._cached_crossref, self._crossref_chunk
+            ))
+
+        return {key: {**candidate, 'confidence': 1.0, 'identifier': f"{key[0]}:{key[1]}"}
+                for key, candidate in found.items()}
+
+    def _bulk_lookup(self, keys: List[Tuple[str, str]], cached, fetch_chunk) -> Dict[Tuple[str, str], Dict]:
+        """
+        Résout des identifiants d'une même API : cache d'abord, puis lots en parallèle
+
+        Args:
+            keys: (type, valeur) à résoudre
+            cached: Fonction (type, valeur) -> candidat en cache ou None
+            fetch_chunk: Fonction (type, valeurs) -> {(type, valeur): candidat}
+        """
+        found = {}
+        todo: Dict[str, List[str]] = {}
+        for kind, value in keys:
+            candidate = cached(kind, value)
+            if candidate:
+                found[(kind, value)] = candidate
+            else:
+                todo.setdefault(kind, []).append(value)
+
+        chunks = [(kind, chunk) for kind, values in todo.items() for chunk in self._chunks(values)]
+        for result in self._api_executor.map(lambda chunk: fetch_chunk(*chunk), chunks):
+            found.update(result)
+        return found
+
+    @staticmethod
+    def _chunks(values: List[str]) -> Iterator[List[str]]:
+        """
+        Lots de BULK_LOOKUP_SIZE valeurs ; une valeur contenant un séparateur
+        de filtre (',' ou '|') part seule, par requête individuelle
+        """
+        alone = [v for v in values if ',' in v or '|' in v]
+        grouped = [v for v in values if v not in alone]
+        size = max(1, config.BULK_LOOKUP_SIZE)
+        for start in range(0, len(grouped), size):
+            yield grouped[start:start + size]
+        for value in alone:
+            yield [value]
+
+    def _openalex_single(self, kind: str, value: str) -> Tuple[str, Dict]:
+        """URL et paramètres de la notice OpenAlex d'un identifiant (requête individuelle)"""
+        params = self._openalex_params()
+        work_id = f"doi:{value}" if kind == 'doi' else value
+        return f"{config.OPENALEX_URL}/works/{work_id}", params
+
+    def _cached_openalex(self, kind: str, value: str) -> Optional[Dict]:
+        data = self.http.cached_json(*self._openalex_single(kind, value))
+        return self._openalex_candidates({'results': [data]})[0] if data else None
+
+    def _openalex_chunk(self, kind: str, values: List[str]) -> Dict[Tuple[str, str], Dict]:
+        """Un lot d'identifiants OpenAlex : filtre doi:a|b|... ou ids.openalex:W1|W2|..."""
+        try:
+            if len(values) == 1:
+                candidates = self._lookup_openalex(f"doi:{values[0]}" if kind == 'doi' else values[0])
+                return {(kind, values[0]): candidates[0]} if candidates else {}
+
+            field = 'doi' if kind == 'doi' else 'ids.openalex'
+            params = {**self._openalex_params(), 'filter': f"{field}:{'|'.join(values)}",
+                      'per_page': len(values)}
+            with self.metrics.timer('openalex'):
+                data = self.http.get_json(f"{config.OPENALEX_URL}/works", params=params,
+                                          ttl=HttpClient.NEVER_EXPIRES, api='openalex')
+        except Exception as e:
+            print(f"   ⚠️  Erreur OpenAlex (lot de {len(values)} identifiant(s)): {e}")
+            return {}
+
+        wanted = {value.lower(): value for value in values}
+        found = {}
+        for work in data.get('results', []):
+            if kind == 'doi':
+                key = normalize_doi(work.get('doi'))
+            else:
+                key = (work.get('id') or '').rsplit('/', 1)[-1].lower()
+            value = wanted.get(key)
+            if value is None or (kind, value) in found:
+                continue
+            self.http.store_json(*self._openalex_single(kind, value), work, ttl=HttpClient.NEVER_EXPIRES)
+            found[(kind, value)] = self._openalex_candidates({'results': [work]})[0]
+        return found
+
+    @staticmethod
+    def _crossref_single(kind: str, value: str) -> Tuple[str, Dict]:
+        """Chemin et paramètres de la requête CrossRef individuelle d'un identifiant"""
+        if kind == 'doi':
+            return f"/works/{value}", {}
+        return '/works', {'filter': f"isbn:{value}", 'rows': 1}
+
+    def _cached_crossref(self, kind: str, value: str) -> Optional[Dict]:
+        path, params = self._crossref_single(kind, value)
+        data = self.http.cached_json(f"{config.CROSSREF_URL}{path}", params)
+        if not data:
+            return None
+        message = data['message']
+        candidates = self._crossref_candidates({'message': {'items': message.get('items', [message])}})
+        return candidates[0] if candidates else None
+
+    def _crossref_chunk(self, kind: str, values: List[str]) -> Dict[Tuple[str, str], Dict]:
+        """Un lot d'identifiants CrossRef : filtres répétés (doi:a,doi:b,... ou isbn:...), combinés en OU"""
+        try:
+            if len(values) == 1:
+                candidates = self._lookup_crossref(*self._crossref_single(kind, values[0]))
+                return {(kind, values[0]): candidates[0]} if candidates else {}
+
+            # Un ISBN peut couvrir plusieurs notices (chapitres) : marge sur le nombre de lignes
+            rows = len(values) if kind == 'doi' else min(1000, len(values) * 5)
+            params = {'filter': ','.join(f"{kind}:{value}" for value in values), 'rows': rows,
+                      'select': CROSSREF_SELECT if kind == 'doi' else CROSSREF_ISBN_SELECT}
+            with self.metrics.timer('crossref'):
+                data = self.http.get_json(f"{config.CROSSREF_URL}/works", params=params,
+                                          headers=self._crossref_headers(),
+                                          ttl=HttpClient.NEVER_EXPIRES, api='crossref')
+        except Exception as e:
+            print(f"   ⚠️  Erreur CrossRef (lot de {len(values)} identifiant(s)): {e}")
+            return {}
+
+        wanted = {value.lower(): value for value in values}
+        found = {}
+        for item in data['message'].get('items', []):
+            if kind == 'doi':
+                keys = [normalize_doi(item.get('DOI'))]
+            else:
+                keys = [re.sub(r'[^0-9X]', '', isbn.upper()).lower() for isbn in item.get('ISBN', [])]
+            for key in keys:
+                value = wanted.get(key)
+                if value is None or (kind, value) in found:
+                    continue
+                path, params = self._crossref_single(kind, value)
+                body = {'message': item} if kind == 'doi' else {'message': {'items': [item]}}
+                self.http.store_json(f"{config.CROSSREF_URL}{path}", params, body,
+                                     ttl=HttpClient.NEVER_EXPIRES)
+                found[(kind, value)] = self._crossref_candidates({'message': {'items': [item]}})[0]
+        return found
+
+    def _lookup_openalex(self, work_id: str) -> List[Dict]:
+        """Notice OpenAlex par identifiant exact (W..., doi:...), liste vide si inconnue"""
+        params = self._openalex_params()
+        try:
+            with self.metrics.timer('openalex'):
+                data = self.http.get_json(f"{config.OPENALEX_URL}/works/{work_id}", params=params,
+                                          ttl=HttpClient.NEVER_EXPIRES, api='openalex')
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return []
+            raise
+        return self._openalex_candidates({'results': [data]})
+
+    def _lookup_crossref(self, path: str, params: Optional[Dict] = None) -> List[Dict]:
+        """Notice(s) CrossRef par requête exacte (/works/<doi> ou filtre), liste vide si inconnue"""
+        try:
+            with self.metrics.timer('crossref'):
+                data = self.http.get_json(f"{config.CROSSREF_URL}{path}", params=params or {},
+                                          headers=self._crossref_headers(),
+                                          ttl=HttpClient.NEVER_EXPIRES, api='crossref')
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return []
+            raise
+        message = data['message']
+        return self._crossref_candidates({'message': {'items': message.get('items', [message])}})
+
+    def _search_plan(self, api: str, author: str, title: str,
+                     year: str) -> Generator[Tuple[str, Dict, Dict], Optional[Dict], List[Dict]]:
+        """
+        Recherche d'une API, indépendante du client HTTP
+
+        Partagée par le client synchrone (_fetch) et le client asyncio
+        (_fetch_async) : rend chaque requête à essayer (URL, paramètres,
+        en-têtes) et reçoit sa réponse, None en cas d'erreur. Requête
+        structurée d'abord, requête libre si rien n'est trouvé.
+
+        Args:
+            api: 'openalex' ou 'crossref'
+            author, title, year: Métadonnées extraites
 
+        Returns:
+            Candidats de la première requête qui en trouve (liste vide sinon)
+        """
+        if api == 'openalex':
+            requests_to_try = self._openalex_requests(author, title, year)
+            parse = self._openalex_candidates
+        else:
+            requests_to_try = self._crossref_requests(author, title, year)
+            parse = self._crossref_candidates
+
+        for attempt, request in enumerate(requests_to_try):
+            if attempt:
+                self.metrics.incr('search_fallback', api)
+            data = yield request
+            candidates = parse(data) if data is not None else []
+            if candidates:
+                return candidates
+        return []
+
+    def _fetch(self, api: str, author: str, title: str, year: str) -> List[Dict]:
+        """Candidats d'une API pour une référence (voir _search_plan), liste vide en cas d'erreur"""
+        plan = self._search_plan(api, author, title, year)
+        try:
+            url, params, headers = next(plan)
+            while True:
+                try:
+                    with self.metrics.timer(api):
+                        data = self.http.get_json(url, params=params, headers=headers, api=api)
+                except Exception as e:
+                    print(f"   ⚠️  Erreur {API_LABELS[api]}: {e}")
+                    data = None
+                url, params, headers = plan.send(data)
+        except StopIteration as done:
+            return done.value
+
+    async def _fetch_async(self, client: AsyncHttpClient, api: str, author: str,
+                           title: str, year: str) -> List[Dict]:
+        """
+        Équivalent asynchrone de _fetch (même recherche, client asyncio)
+
+        Args:
+            client: Client HTTP asynchrone ouvert
+            api: 'openalex' ou 'crossref'
+            author, title, year: Métadonnées extraites
+
+        Returns:
+            Candidats (liste vide en cas d'erreur)
+        """
+        plan = self._search_plan(api, author, title, year)
+        try:
+            url, params, headers = next(plan)
+            while True:
+                try:
+                    with self.metrics.timer(api):
+                        data = await client.get_json(url, params=params, headers=headers, api=api)
+                except Exception as e:
+                    print(f"   ⚠️  Erreur {API_LABELS[api]}: {e}")
+                    data = None
+                url, params, headers = plan.send(data)
+        except StopIteration as done:
+            return done.value
+
+    @staticmethod
+    def _openalex_params() -> Dict:
+        """Paramètres communs des requêtes OpenAlex (champs utiles seulement, email)"""
+        params = {'select': OPENALEX_SELECT}
         # Ajouter email si configuré (pour être poli avec l'API)
         if config.OPENALEX_EMAIL:
             params['mailto'] = config.OPENALEX_EMAIL
+        return params
 
-        try:
-            response = requests.get(base_url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if data['results']:
-                # Prendre le premier résultat (le plus pertinent)
-                work = data['results'][0]
-
-                # Calculer un score de confiance basique
-                # (comparaison titre + année)
-                title_similarity = self._similarity_score(
-                    title.lower(),
-                    work.get('title', '').lower()
-                )
-                year_match = str(year) in str(work.get('publication_year', ''))
-
-                confidence = title_similarity * (1.2 if year_match else 0.8)
-                confidence = min(confidence, 1.0)
-
-                return {
-                    'source': 'OpenAlex',
-                    'doi': work.get('doi', '').replace('https://doi.org/', ''),
-                    'title': work.get('title'),
-                    'authors': [a.get('author', {}).get('display_name')
-                               for a in work.get('authorships', [])],
-                    'year': work.get('publication_year'),
-                    'url': work.get('doi') or work.get('id'),
-                    'confidence': confidence
-                }
+    def _openalex_requests(self, author: str, title: str, year: str) -> List[Tuple[str, Dict, Dict]]:
+        """
+        Requêtes d'une recherche OpenAlex (URL, paramètres, en-têtes), par ordre d'essai
 
-        except Exception as e:
-            print(f"   ⚠️  Erreur OpenAlex: {e}")
+        Avec API_STRUCTURED_QUERIES : filtres title.search, raw_author_name.search
+        et intervalle publication_year, puis la recherche plein texte en repli.
+        """
+        base_url = f"{config.OPENALEX_URL}/works"
+        common = {**self._openalex_params(), 'per_page': 5}  # Limiter à 5 résultats
+        requests_to_try = []
+
+        title_query = self._query_title(title)
+        if config.API_STRUCTURED_QUERIES and title_query:
+            filters = [f"title.search:{title_query}"]
+            surname = self._query_surname(author)
+            if surname:
+                filters.append(f"raw_author_name.search:{surname}")
+            years = self._year_range(year)
+            if years:
+                filters.append(f"publication_year:{years[0]}-{years[1]}")
+            requests_to_try.append((base_url, {**common, 'filter': ','.join(filters)}, {}))
 
-        return None
+        query = f"{title} {author} {year}".strip()
+        requests_to_try.append((base_url, {**common, 'search': query}, {}))
+        return requests_to_try
+
+    @staticmethod
+    def _query_title(title: Optional[str]) -> str:
+        """Titre utilisable dans un filtre (sans séparateurs de filtres), '' si inconnu"""
+        if not title or title == 'Unknown':
+            return ''
+        return ' '.join(FILTER_UNSAFE.sub(' ', title).split())
+
+    @staticmethod
+    def _query_surname(author: Optional[str]) -> str:
+        """Nom de famille du premier auteur pour les filtres ('' si inconnu)"""
+        if not author or author == 'Unknown':
+            return ''
+        author = ET_AL_PATTERN.sub('', author).strip()
+        name = author.split(',')[0] if ',' in author else (author.split() or [''])[-1]
+        return ' '.join(FILTER_UNSAFE.sub(' ', name).split())
+
+    @staticmethod
+    def _year_range(year) -> Optional[Tuple[int, int]]:
+        """Années acceptées autour de l'année extraite (API_YEAR_TOLERANCE), None si inconnue"""
+        match = re.match(r'\d{4}', str(year or ''))
+        if not match:
+            return None
+        tolerance = config.API_YEAR_TOLERANCE
+        return int(match.group()) - tolerance, int(match.group()) + tolerance
+
+    @staticmethod
+    def _openalex_candidates(data: Dict) -> List[Dict]:
+        """Convertit une réponse OpenAlex en candidats, dans l'ordre de pertinence de l'API"""
+        return [
+            {
+                'source': 'OpenAlex',
+                'doi': (work.get('doi') or '').replace('https://doi.org/', ''),
+                'title': work.get('title'),
+                'authors': [a.get('author', {}).get('display_name')
+                           for a in work.get('authorships', [])],
+                'year': work.get('publication_year'),
+                'url': work.get('doi') or work.get('id')
+            }
+            for work in data['results']
+        ]
 
     def search_crossref(self, author: str, title: str, year: str) -> Optional[Dict]:
         """
@@ -318,186 +1024,722 @@ NE retourne QUE le JSON, sans texte avant ou après."""
             author, title, year: Métadonnées extraites
 
         Returns:
-            Informations bibliographiques avec DOI si trouvé
+            Informations bibliographiques avec DOI si trouvé (meilleur candidat)
         """
-        base_url = "https://api.crossref.org/works"
+        metadata = {'author': author, 'title': title, 'year': year}
+        return rank_candidates(metadata, self._fetch('crossref', author, title, year),
+                               config.RANKING_WEIGHTS)
 
-        query = f"{title} {author} {year}".strip()
+    def _crossref_requests(self, author: str, title: str, year: str) -> List[Tuple[str, Dict, Dict]]:
+        """
+        Requêtes d'une recherche CrossRef (URL, paramètres, en-têtes), par ordre d'essai
 
-        params = {
-            'query': query,
-            'rows': 5
-        }
+        Avec API_STRUCTURED_QUERIES : query.bibliographic (titre), query.author
+        et filtre from-pub-date/until-pub-date, puis la requête libre en repli.
+        """
+        base_url = f"{config.CROSSREF_URL}/works"
+        headers = self._crossref_headers()
+        common = {'rows': 5, 'select': CROSSREF_SELECT}
+        requests_to_try = []
+
+        title_query = self._query_title(title)
+        if config.API_STRUCTURED_QUERIES and title_query:
+            params = {**common, 'query.bibliographic': title_query}
+            surname = self._query_surname(author)
+            if surname:
+                params['query.author'] = surname
+            years = self._year_range(year)
+            if years:
+                params['filter'] = f"from-pub-date:{years[0]},until-pub-date:{years[1]}"
+            requests_to_try.append((base_url, params, headers))
+
+        query = f"{title} {author} {year}".strip()
+        requests_to_try.append((base_url, {**common, 'query': query}, headers))
+        return requests_to_try
 
+    @staticmethod
+    def _crossref_headers() -> Dict:
+        """En-têtes CrossRef (User-Agent avec email pour le pool « polite »)"""
         headers = {}
         if config.CROSSREF_EMAIL:
             headers['User-Agent'] = f"BiblioEnricher/1.0 (mailto:{config.CROSSREF_EMAIL})"
+        return headers
+
+    @staticmethod
+    def _crossref_candidates(data: Dict) -> List[Dict]:
+        """Convertit une réponse CrossRef en candidats, dans l'ordre de pertinence de l'API"""
+        candidates = []
+        for item in data['message']['items']:
+            authors = [f"{a.get('family', '')}, {a.get('given', '')}"
+                      for a in item.get('author', [])]
+            candidates.append({
+                'source': 'CrossRef',
+                'doi': item.get('DOI'),
+                'title': ' '.join(item.get('title', [])),
+                'authors': authors,
+                'year': (item.get('published-print') or item.get('issued') or {}).get(
+                    'date-parts', [[None]])[0][0],
+                'url': f"https://doi.org/{item.get('DOI')}"
+            })
+        return candidates
+
+    def process_references(self, references: Iterable[Dict],
+                           journal: Optional[Journal] = None) -> List[Dict]:
+        """
+        Traite une liste de références et enrichit avec métadonnées
 
-        try:
-            response = requests.get(base_url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+        Les références identiques (même texte normalisé, ou même référence
+        complète dans la bibliographie) ne sont enrichies qu'une fois ; le
+        résultat est recopié sur chaque occurrence avec sa ligne et son contexte.
 
-            if data['message']['items']:
-                item = data['message']['items'][0]
+        Les étapes (règles → LLM → APIs) tournent en pipeline :
+        pendant que le LLM traite une référence, les APIs sont interrogées
+        pour les précédentes. L'ordre des résultats est celui des entrées.
+        En mode asynchrone, toutes les recherches API sont lancées ensemble
+        dans une boucle asyncio une fois les métadonnées extraites.
 
-                # Score de confiance
-                title_similarity = self._similarity_score(
-                    title.lower(),
-                    ' '.join(item.get('title', [''])).lower()
-                )
-                year_match = str(year) == str(item.get('published-print', {}).get('date-parts', [[None]])[0][0])
-
-                confidence = title_similarity * (1.2 if year_match else 0.8)
-                confidence = min(confidence, 1.0)
-
-                authors = [f"{a.get('family', '')}, {a.get('given', '')}"
-                          for a in item.get('author', [])]
-
-                return {
-                    'source': 'CrossRef',
-                    'doi': item.get('DOI'),
-                    'title': ' '.join(item.get('title', [])),
-                    'authors': authors,
-                    'year': item.get('published-print', {}).get('date-parts', [[None]])[0][0],
-                    'url': f"https://doi.org/{item.get('DOI')}",
-                    'confidence': confidence
-                }
+        Args:
+            references: Liste de références extraites du fichier
+            journal: Journal de reprise (références déjà faites ignorées,
+                     nouvelles références ajoutées dès qu'elles sont terminées)
 
-        except Exception as e:
-            print(f"   ⚠️  Erreur CrossRef: {e}")
+        Returns:
+            Liste enrichie avec DOI et métadonnées
+        """
+        return list(self.stream_references(references, journal))
 
-        return None
+    def stream_references(self, references: Iterable[Dict],
+                          journal: Optional[Journal] = None) -> Iterator[Dict]:
+        """
+        Comme process_references, mais rend chaque référence dès qu'elle est
+        enrichie (barre de progression et bilan compris) : à brancher
+        directement sur save_results pour écrire les rapports en flux
+        """
+        total = len(references) if hasattr(references, '__len__') else None
+        if total is not None:
+            print(f"\n🔍 Traitement de {total} référence(s)...")
+        else:
+            print("\n🔍 Traitement des références...")
+
+        count = 0
+        # Compteur cumulé sur toute l'exécution (mode vault) : seul l'écart compte ici
+        resumed_before = self.metrics.count('resumed_references')
+        for result in tqdm(self.iter_enriched(references, journal), total=total,
+                           desc="Enrichissement"):
+            count += 1
+            yield result
+
+        resumed = self.metrics.count('resumed_references') - resumed_before
+        if resumed:
+            print(f"\n   ⏩ {resumed} référence(s) reprise(s) du journal")
+        print(f"\n   ♻️  {count} occurrence(s), {self.last_unique_count} référence(s) unique(s)")
+
+    def iter_enriched(self, references: Iterable[Dict],
+                      journal: Optional[Journal] = None) -> Iterator[Dict]:
+        """
+        Enrichit les références en flux (voir process_references)
 
-    def _similarity_score(self, str1: str, str2: str) -> float:
+        Yields:
+            Références enrichies, dans l'ordre d'entrée
         """
-        Calcul de similarité simple entre deux chaînes
-        (Ratio de mots communs)
+        stages = [
+            # Lot : les références déjà en file, identifiants résolus par requêtes groupées
+            ('identifiers', self._stage_identifiers, config.HTTP_WORKERS, config.PIPELINE_QUEUE_SIZE),
+            ('rules', self._stage_rules, 1),
+            ('llm', self._stage_llm, config.LLM_WORKERS, config.LLM_BATCH_SIZE),
+        ]
+        if not self.async_api:
+            stages.append(('api', self._stage_api, config.HTTP_WORKERS))
+
+        pipeline = Pipeline(stages, queue_size=config.PIPELINE_QUEUE_SIZE)
+
+        # (occurrence, résultat journalisé ou None), dans l'ordre d'entrée
+        slots = deque()
+
+        def pending():
+            for ref in references:
+                previous = journal.get(ref) if journal else None
+                slots.append((ref, previous))
+                if previous is None:
+                    yield ref
+
+        # (occurrence, numéro de la référence unique), alimenté par le pipeline
+        occurrences = deque()
+        unique_results = pipeline.run(self._unique_jobs(pending(), occurrences))
+
+        if self.async_api:
+            items = list(tqdm(unique_results, desc="Extraction"))
+            # Références déjà résolues par identifiant : pas de recherche
+            todo = [item for item in items if 'api_result' not in item]
+            print(f"\n🌐 Recherche des DOI ({len(todo)} requête(s) asynchrones)...")
+            for item, api_result in zip(todo, self.lookup_all_async([i['metadata'] for i in todo])):
+                item['api_result'] = api_result
+            unique_results = (self._combine(item, item['api_result']) for item in items)
+
+        def resumed():
+            # Résultats journalisés qui précèdent la prochaine nouvelle référence
+            while slots and slots[0][1] is not None:
+                ref, previous = slots.popleft()
+                self.metrics.incr('resumed_references')
+                yield {**previous, **ref}
+
+        for result in self._fan_out(unique_results, occurrences):
+            yield from resumed()
+            slots.popleft()
+            if journal:
+                journal.append(result)
+            yield result
+
+        yield from resumed()
+
+    @staticmethod
+    def dedup_key(raw_text: str, full_ref: Optional[str]) -> str:
         """
-        if not str1 or not str2:
-            return 0.0
+        Clé canonique d'une référence pour le dédoublonnage
 
-        words1 = set(str1.lower().split())
-        words2 = set(str2.lower().split())
+        Args:
+            raw_text: Texte brut de la référence
+            full_ref: Référence complète depuis bibliographie (ou None)
 
-        if not words1 or not words2:
-            return 0.0
+        Returns:
+            Référence complète normalisée si connue, sinon texte brut normalisé
+        """
+        if full_ref:
+            return 'bib:' + normalize_key(full_ref)
+        return 'raw:' + normalize_key(raw_text)
+
+    def _unique_jobs(self, references: Iterable[Dict], occurrences: deque) -> Iterator[Dict]:
+        """
+        Regroupe les occurrences par clé canonique et ne produit que les références uniques
 
-        intersection = words1 & words2
-        union = words1 | words2
+        Chaque occurrence est consignée dans `occurrences` (avec l'heure
+        de son entrée dans le pipeline) avant que sa référence unique ne parte.
+        """
+        jobs: Dict[str, int] = {}
+        bibliography: Dict[str, Optional[str]] = {}  # texte normalisé → référence complète
+        self.last_unique_count = 0
+
+        for ref in references:
+            raw_key = normalize_key(ref['raw_text'])
+            if 'full_reference' in ref:
+                # Déjà cherchée par l'appelant (démon, voir server.EnrichmentService)
+                full_ref = ref['full_reference']
+            elif raw_key in bibliography:
+                full_ref = bibliography[raw_key]
+            else:
+                full_ref = self.search_in_bibliography(ref['raw_text'])
+                bibliography[raw_key] = full_ref
 
-        return len(intersection) / len(union)
+            key = self.dedup_key(ref['raw_text'], full_ref)
+            if key in jobs:
+                occurrences.append((ref, jobs[key], time.perf_counter()))
+                continue
 
-    def process_references(self, references: List[Dict]) -> List[Dict]:
+            jobs[key] = len(jobs)
+            self.last_unique_count = len(jobs)
+            occurrences.append((ref, jobs[key], time.perf_counter()))
+            if full_ref:
+                print(f"\n   ✓ Référence complète trouvée dans bibliographie")
+            yield {'ref': ref, 'full_ref': full_ref, 'metadata': None}
+
+    def _fan_out(self, unique_results: Iterable[Dict], occurrences: deque) -> Iterator[Dict]:
         """
-        Traite une liste de références et enrichit avec métadonnées
+        Recopie le résultat de chaque référence unique sur toutes ses occurrences
 
-        Args:
-            references: Liste de références extraites du fichier
+        Les occurrences sont restituées dans leur ordre d'origine, dès que
+        le résultat de leur référence unique est disponible. La latence de
+        bout en bout de chaque occurrence est mesurée (étape 'reference').
+        """
+        # Résultat complet en attente de sa propre occurrence (libéré dès qu'elle est rendue)
+        pending: Dict[int, Dict] = {}
+        # Pour les doublons, à venir ou non : résultat sans les champs propres à
+        # l'occurrence (contexte, ligne...), que chaque doublon fournit lui-même
+        shared: Dict[int, Dict] = {}
+
+        def ready():
+            while occurrences and occurrences[0][1] in shared:
+                ref, job, fed_at = occurrences.popleft()
+                self.metrics.observe('reference', time.perf_counter() - fed_at, fed_at)
+                result = pending.get(job)
+                if result is not None and result['line'] == ref['line'] and result['file'] == ref['file']:
+                    del pending[job]
+                    yield result
+                else:
+                    # Même résultat, position et contexte propres à l'occurrence
+                    yield {**shared[job], **ref}
+
+        for job, result in enumerate(unique_results):
+            pending[job] = result
+            shared[job] = {k: v for k, v in result.items() if k not in OCCURRENCE_FIELDS}
+            yield from ready()
+
+        yield from ready()
+
+    def _stage_identifiers(self, items: List[Dict]) -> List[Dict]:
+        """
+        Étape 1 : références portant un DOI, un ISBN ou un identifiant OpenAlex
+        (citation ou référence complète) résolues par requêtes exactes,
+        groupées pour tout le lot
+
+        Les identifiants du contexte peuvent appartenir à une citation voisine :
+        ils sont résolus dans le même lot mais ne deviennent que des candidats,
+        retenus après l'extraction s'ils concordent avec l'auteur et l'année
+        (voir _match_context_candidates).
+        """
+        found = [find_identifiers([item['ref']['raw_text'], item['full_ref']]) for item in items]
+        nearby = [[i for i in find_identifiers([item['ref']['context']]) if i not in identifiers]
+                  for item, identifiers in zip(items, found)]
+        resolved = self.resolve_identifiers(
+            [i for identifiers in found + nearby for i in identifiers]
+        )
+
+        for item, identifiers, context_identifiers in zip(items, found, nearby):
+            self._apply_identifier(item, identifiers, resolved)
+            if 'api_result' not in item:
+                item['context_candidates'] = [
+                    resolved[(i['type'], i['value'])] for i in context_identifiers
+                    if resolved.get((i['type'], i['value']))
+                ]
+        return items
+
+    def _apply_identifier(self, item: Dict, identifiers: List[Dict[str, str]],
+                          resolved: Dict[Tuple[str, str], Dict]):
+        """Retient le premier identifiant résolu de la référence (ordre de priorité)"""
+        for identifier in identifiers:
+            api_result = resolved.get((identifier['type'], identifier['value']))
+            if api_result:
+                self._count_path('identifier')
+                item['api_result'] = api_result
+                item['metadata'] = {
+                    'author': api_result['authors'][0] if api_result['authors'] else 'Unknown',
+                    'title': api_result['title'],
+                    'year': str(api_result['year'] or ''),
+                    'confidence': 1.0,
+                    'identifier': f"{identifier['type']}:{identifier['value']}"
+                }
+                break
+
+    def _stage_rules(self, item: Dict) -> Dict:
+        """Étape 2 : voie rapide, référence bien formée parsée sans LLM"""
+        if item['metadata'] is None:
+            item['metadata'] = self.parse_with_rules(item['ref']['raw_text'], item['full_ref'])
+        return item
+
+    def _stage_llm(self, items: List[Dict]) -> List[Dict]:
+        """Étape 3 : extraire les métadonnées avec le LLM (par lots), sauf voie rapide"""
+        todo = [item for item in items if item['metadata'] is None]
+        metadata_list = self.extract_metadata_batch(
+            [(item['ref']['raw_text'], item['full_ref']) for item in todo]
+        )
+        for item, metadata in zip(todo, metadata_list):
+            item['metadata'] = metadata
+        for item in items:
+            self._match_context_candidates(item)
+        return items
+
+    def _match_context_candidates(self, item: Dict):
+        """
+        Retient un identifiant du contexte si l'œuvre résolue a le même auteur
+        et la même année (à un an près) que les métadonnées extraites
+        """
+        candidates = item.pop('context_candidates', None)
+        if not candidates or 'api_result' in item:
+            return
+        metadata = item['metadata']
+        matching = [c for c in candidates
+                    if author_score(metadata['author'], c['authors']) > 0
+                    and year_score(metadata['year'], c['year']) > 0]
+        if matching:
+            self.metrics.incr('context_identifier_matches')
+            item['api_result'] = rank_candidates(metadata, matching, config.RANKING_WEIGHTS)
+
+    def _stage_api(self, item: Dict) -> Dict:
+        """Étape 4 : chercher le DOI (sauf identifiant déjà résolu) et combiner les résultats"""
+        if 'api_result' in item:
+            return self._combine(item, item['api_result'])
+        return self._combine(item, self._resolve_api(item['metadata']))
+
+    def _resolve_api(self, metadata: Dict) -> Optional[Dict]:
+        """
+        Cherche le DOI : index local d'abord, puis OpenAlex et CrossRef
+        interrogés en parallèle, tous leurs candidats classés ensemble (voir ranking.py)
+        """
+        resolved, result = self._resolve_locally(metadata)
+        if resolved:
+            return result
+
+        args = (metadata['author'], metadata['title'], metadata['year'])
+        crossref = self._api_executor.submit(self._fetch, 'crossref', *args)
+        candidates = self._fetch('openalex', *args)
+        candidates += crossref.result()
+
+        return rank_candidates(metadata, candidates, config.RANKING_WEIGHTS)
+
+    async def _resolve_api_async(self, client: AsyncHttpClient, metadata: Dict) -> Optional[Dict]:
+        """Équivalent asynchrone de _resolve_api (index local lu hors de la boucle)"""
+        resolved, result = await asyncio.to_thread(self._resolve_locally, metadata)
+        if resolved:
+            return result
+
+        args = (metadata['author'], metadata['title'], metadata['year'])
+        openalex, crossref = await asyncio.gather(
+            self._fetch_async(client, 'openalex', *args),
+            self._fetch_async(client, 'crossref', *args)
+        )
+
+        return rank_candidates(metadata, openalex + crossref, config.RANKING_WEIGHTS)
+
+    def _resolve_locally(self, metadata: Dict) -> Tuple[bool, Optional[Dict]]:
+        """
+        Partie de _resolve_api sans réseau, commune aux deux modes
 
         Returns:
-            Liste enrichie avec DOI et métadonnées
+            (résolu, résultat) : résolu si les APIs n'ont pas à être interrogées
+            (auteur inconnu, mode hors ligne, index local assez sûr)
         """
-        enriched = []
+        if metadata['author'] == 'Unknown':
+            return True, None
 
-        print(f"\n🔍 Traitement de {len(references)} référence(s)...")
+        local = self.search_local(metadata['author'], metadata['title'], metadata['year'])
+        if self.offline or (local and local['confidence'] >= config.OFFLINE_INDEX_MIN_CONFIDENCE):
+            return True, local
+        return False, None
 
-        for ref in tqdm(references, desc="Enrichissement"):
-            # 1. Chercher dans bibliographie
-            full_ref = self.search_in_bibliography(ref['raw_text'])
-            if full_ref:
-                print(f"\n   ✓ Référence complète trouvée dans bibliographie")
+    def lookup_all_async(self, metadata_list: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Runner synchrone : résout toutes les recherches DOI dans une seule boucle asyncio
 
-            # 2. Extraire métadonnées avec LLM
-            metadata = self.extract_metadata_with_llm(ref['raw_text'], full_ref)
+        Args:
+            metadata_list: Métadonnées extraites (auteur, titre, année)
 
-            # 3. Chercher DOI (OpenAlex prioritaire, puis CrossRef)
-            api_result = None
-            if metadata['author'] != 'Unknown':
-                api_result = self.search_openalex(
-                    metadata['author'],
-                    metadata['title'],
-                    metadata['year']
+        Returns:
+            Résultats API dans le même ordre (None si non trouvé)
+        """
+        return asyncio.run(self._lookup_all_async(metadata_list))
+
+    async def _lookup_all_async(self, metadata_list: List[Dict]) -> List[Optional[Dict]]:
+        client = AsyncHttpClient(
+            self.http.cache,
+            self.http.limiter,
+            host_limits=config.ASYNC_HOST_LIMITS,
+            default_host_limit=config.ASYNC_DEFAULT_HOST_LIMIT,
+            timeout=config.HTTP_TIMEOUT,
+            default_ttl=self.http.default_ttl
+        )
+        try:
+            async with client:
+                return await asyncio.gather(
+                    *(self._resolve_api_async(client, metadata) for metadata in metadata_list)
                 )
+        finally:
+            # Cache et limiteur sont partagés ; seuls les compteurs de requêtes sont propres au client
+            self.async_http_stats['requests_sent'] += client.requests_sent
+            self.async_http_stats['revalidated'] += client.revalidated
+
+    def _combine(self, item: Dict, api_result: Optional[Dict]) -> Dict:
+        """Combine la référence, les métadonnées et le résultat API"""
+        metadata = item['metadata']
+        return {
+            **item['ref'],
+            'extracted_metadata': metadata,
+            'full_reference': item['full_ref'],
+            'api_result': api_result,
+            'final_confidence': api_result['confidence'] if api_result else metadata.get('confidence', 0.0)
+        }
 
-                if not api_result or api_result['confidence'] < config.MIN_CONFIDENCE_SCORE:
-                    api_result = self.search_crossref(
-                        metadata['author'],
-                        metadata['title'],
-                        metadata['year']
-                    )
-
-            # 4. Combiner les résultats
-            enriched_ref = {
-                **ref,
-                'extracted_metadata': metadata,
-                'full_reference': full_ref,
-                'api_result': api_result,
-                'final_confidence': api_result['confidence'] if api_result else metadata.get('confidence', 0.0)
-            }
+    def process_vault(self, pattern: str = '**/*.md',
+                      journal: Optional[Journal] = None) -> Iterator[Dict]:
+        """
+        Traite toutes les notes du vault correspondant au motif, en incrémental
+
+        Les notes inchangées depuis le dernier passage (manifeste) sont ignorées.
+        Dans une note modifiée, seules les références nouvelles ou éditées
+        sont ré-enrichies ; les autres reprennent le résultat précédent.
+        Le manifeste est sauvegardé une fois le flux épuisé.
+
+        Args:
+            pattern: Motif glob relatif au vault (ex: '**/*.md', 'Chapitre 1/*.md')
+            journal: Journal de reprise (voir process_references)
+
+        Yields:
+            Références enrichies des notes modifiées, note par note (voir process_notes)
+        """
+        manifest = VaultManifest(self.output_dir / config.VAULT_MANIFEST_FILE)
+        manifest.prune(self.vault_path)
+        if self.citation_index is not None:
+            self.citation_index.prune(self.vault_path)
+
+        notes = self._vault_notes(pattern)
+        print(f"🗂️  {len(notes)} note(s) dans le vault ({pattern})")
+
+        yield from self.process_notes(notes, manifest, journal)
+        manifest.save()
+        if self.citation_index is not None:
+            # Notes relues sans aucune référence : leurs anciennes occurrences sont retirées
+            self.citation_index.commit()
+
+    def _vault_notes(self, pattern: str) -> List[Path]:
+        """Notes du vault correspondant au motif (hors dossier de sortie et bibliographie)"""
+        return sorted(
+            p for p in self.vault_path.glob(pattern)
+            if p.is_file() and p.suffix == '.md'
+            and self.output_dir not in p.parents
+            and p != self.biblio_file
+        )
+
+    def process_notes(self, notes: List[Path], manifest: VaultManifest,
+                      journal: Optional[Journal] = None) -> Iterator[Dict]:
+        """
+        Enrichit les notes modifiées depuis le dernier passage (voir process_vault)
+
+        Un seul pipeline pour toutes les notes : elles sont scannées au fil de
+        l'enrichissement, et les références d'une note sont rendues dès que ses
+        références nouvelles sont enrichies. Seules les notes en cours restent
+        en mémoire, contextes compris ; les rapports s'écrivent en flux.
+
+        Args:
+            notes: Notes candidates (chemins absolus)
+            manifest: Manifeste du vault, mis à jour pour les notes traitées (non sauvegardé)
+            journal: Journal de reprise (voir process_references)
+
+        Yields:
+            Toutes les références des notes modifiées, dans l'ordre des notes
+        """
+        # Notes scannées pas encore rendues : (chemin relatif, chemin, empreinte,
+        # références, nombre de références à enrichir). Rempli par le thread
+        # d'entrée du pipeline, vidé ici dans le même ordre
+        scanned = deque()
+        # Résultats des références nouvelles, pas encore rendus avec leur note
+        received = deque()
+        counts = Counter()
+
+        def to_enrich():
+            for path in notes:
+                rel_path = path.relative_to(self.vault_path).as_posix()
+                sha = manifest.check(rel_path, path)
+                if sha is None:
+                    continue
+
+                references = self.scan_file(rel_path)
+                if self.citation_index is not None:
+                    self.citation_index.replace_file(rel_path)
+                previous = manifest.previous_results(rel_path)
+                fresh = [ref for ref in references if reference_key(ref) not in previous]
+                counts['changed'] += 1
+                counts['reused'] += len(references) - len(fresh)
+                scanned.append((rel_path, path, sha, references, len(fresh)))
+                yield from fresh
+
+        def ready():
+            # Notes dont toutes les références nouvelles sont arrivées
+            while scanned and len(received) >= scanned[0][4]:
+                rel_path, path, sha, references, count = scanned.popleft()
+                fresh = iter([received.popleft() for _ in range(count)])
+                previous = manifest.previous_results(rel_path)
+                note_results = [
+                    next(fresh) if reference_key(ref) not in previous
+                    # Résultat précédent, avec la position et le contexte actuels
+                    else {**previous[reference_key(ref)], **ref}
+                    for ref in references
+                ]
+                manifest.update(rel_path, path, sha, note_results)
+                yield from note_results
+
+        for result in self.stream_references(to_enrich(), journal):
+            received.append(result)
+            yield from ready()
+        yield from ready()
+
+        print(f"\n📝 {counts['changed']} note(s) modifiée(s), "
+              f"{len(notes) - counts['changed']} inchangée(s), "
+              f"{counts['reused']} référence(s) reprise(s) du passage précédent")
+
+    def watch(self, pattern: str = '**/*.md'):
+        """
+        Surveille le vault et enrichit les notes dès leur enregistrement (--watch)
+
+        Un premier passage rattrape les modifications faites hors surveillance ;
+        ensuite, chaque rafale d'enregistrements ne ré-enrichit que les tags
+        nouveaux ou modifiés des notes touchées. Index bibliographique, session
+        HTTP, caches et modèle Ollama restent chargés entre deux rafales.
+        Les résultats vont dans le manifeste et l'index des citations (pas de
+        rapport horodaté par enregistrement). S'arrête avec Ctrl+C.
+
+        Args:
+            pattern: Motif glob des notes surveillées, relatif au vault
+        """
+        manifest = VaultManifest(self.output_dir / config.VAULT_MANIFEST_FILE)
+        manifest.prune(self.vault_path)
+        if self.citation_index is not None:
+            self.citation_index.prune(self.vault_path)
+
+        self._index_watched(self.process_notes(self._vault_notes(pattern), manifest))
+        manifest.save()
+
+        watcher = VaultWatcher(self.vault_path, ignored=[self.output_dir],
+                               debounce=config.WATCH_DEBOUNCE,
+                               poll_interval=config.WATCH_POLL_INTERVAL)
+        print(f"\n👀 Surveillance du vault ({pattern}, {watcher.mode}) — Ctrl+C pour arrêter")
+
+        try:
+            for changed in watcher.changes():
+                start = time.perf_counter()
+                watched = set(self._vault_notes(pattern))
+                notes = sorted(p for p in (self.vault_path / rel for rel in changed) if p in watched)
+
+                if any(not (self.vault_path / rel).exists() for rel in changed):
+                    manifest.prune(self.vault_path)
+                    if self.citation_index is not None:
+                        self.citation_index.prune(self.vault_path)
+
+                if notes:
+                    print(f"\n🔔 {datetime.now().strftime('%H:%M:%S')} "
+                          f"{', '.join(p.relative_to(self.vault_path).as_posix() for p in notes)}")
+                    self._index_watched(self.process_notes(notes, manifest))
+                    print(f"   ⏱️  {time.perf_counter() - start:.1f} s")
+                manifest.save()
+        finally:
+            watcher.close()
+            manifest.save()
+
+    def forget_note(self, filename: str):
+        """
+        Retire de l'index des citations une note relue sans aucune référence
+        (tous ses tags #reflitterature supprimés)
 
-            enriched.append(enriched_ref)
+        Args:
+            filename: Nom de la note (avec ou sans .md)
+        """
+        if self.citation_index is None:
+            return
+        if not filename.endswith('.md'):
+            filename += '.md'
+        self.citation_index.replace_file(filename)
+        self.citation_index.commit()
 
-        return enriched
+    def _index_watched(self, results: Iterable[Dict]):
+        """Mode --watch : indexe les notes traitées et affiche les références enrichies, en flux"""
+        index = self.citation_index
+        if index is not None:
+            index.start_run()
 
-    def save_results(self, results: List[Dict], source_file: str):
+        try:
+            for result in results:
+                if index is not None:
+                    index.add(result)
+                api = result['api_result']
+                target = f"→ {api['doi'] or api['url']}" if api else "⚠️  aucun DOI"
+                print(f"   {result['file']}:{result['line']}  {result['raw_text'][:60]}  {target}")
+        finally:
+            if index is not None:
+                index.commit()
+
+    def save_results(self, results: Iterable[Dict], source_file: str) -> Dict:
         """
-        Sauvegarde les résultats dans le dossier de sortie
+        Sauvegarde les résultats dans le dossier de sortie, en flux
+
+        Chaque référence est écrite dès qu'elle arrive : `results` peut être
+        le générateur iter_enriched, la mémoire reste constante. Les références
+        sont aussi ajoutées à l'index des citations (notes ré-indexées en entier).
 
         Args:
-            results: Résultats enrichis
+            results: Résultats enrichis (liste ou flux)
             source_file: Nom du fichier source
+
+        Returns:
+            Bilan : {'total': références écrites, 'with_doi': références avec DOI}
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         base_name = Path(source_file).stem
+        prefix = self.output_dir / f"{base_name}_{timestamp}"
 
-        # JSON
+        writers = []
         if config.OUTPUT_FORMAT in ['json', 'both']:
-            json_file = self.output_dir / f"{base_name}_{timestamp}.json"
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
-            print(f"\n💾 Résultats JSON: {json_file}")
-
-        # Markdown
+            json_writer = JsonLinesWriter if config.JSON_OUTPUT == 'lines' else JsonArrayWriter
+            writers.append(json_writer(Path(f"{prefix}{json_writer.suffix}")))
         if config.OUTPUT_FORMAT in ['markdown', 'both']:
-            md_file = self.output_dir / f"{base_name}_{timestamp}_report.md"
-            with open(md_file, 'w', encoding='utf-8') as f:
-                f.write(f"# Rapport d'enrichissement bibliographique\n\n")
-                f.write(f"**Fichier source**: {source_file}\n")
-                f.write(f"**Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"**Références trouvées**: {len(results)}\n\n")
-                f.write("---\n\n")
-
-                for i, ref in enumerate(results, 1):
-                    f.write(f"## Référence {i}\n\n")
-                    f.write(f"**Ligne {ref['line']}**: {ref['raw_text']}\n\n")
-
-                    if ref['full_reference']:
-                        f.write(f"**Référence complète**:\n> {ref['full_reference']}\n\n")
+            writers.append(MarkdownReportWriter(
+                Path(f"{prefix}{MarkdownReportWriter.suffix}"), source_file,
+                config.MIN_CONFIDENCE_SCORE,
+                lambda r: self.dedup_key(r['raw_text'], r['full_reference'])
+            ))
+        reports = ReportWriters(writers, config.CONTEXT_STORAGE)
 
-                    meta = ref['extracted_metadata']
-                    f.write(f"**Métadonnées extraites**:\n")
-                    f.write(f"- Auteur: {meta['author']}\n")
-                    f.write(f"- Titre: {meta['title']}\n")
-                    f.write(f"- Année: {meta['year']}\n\n")
+        index = self.citation_index
+        if index is not None:
+            index.start_run()
 
-                    if ref['api_result']:
-                        api = ref['api_result']
-                        f.write(f"**Résultat API ({api['source']})**:\n")
-                        f.write(f"- DOI: `{api['doi']}`\n")
-                        f.write(f"- URL: {api['url']}\n")
-                        f.write(f"- Score de confiance: {api['confidence']:.2%}\n\n")
-                    else:
-                        f.write(f"⚠️ *Aucun DOI trouvé*\n\n")
-
-                    f.write("---\n\n")
+        try:
+            for result in results:
+                with self.metrics.timer('save'):
+                    reports.write(result)
+                    if index is not None:
+                        index.add(result)
+        finally:
+            reports.close()
+            if index is not None:
+                index.commit()
+
+        for path in reports.paths:
+            icon = '📄 Rapport Markdown' if path.suffix == '.md' else '💾 Résultats JSON'
+            print(f"\n{icon}: {path}")
+
+        self.save_metrics(base_name, timestamp)
+        return {'total': reports.count, 'with_doi': reports.with_doi}
+
+    def collect_metrics(self) -> Dict:
+        """
+        Complète les métriques avec l'état des caches, du client HTTP et des reprises
 
-            print(f"📄 Rapport Markdown: {md_file}")
+        Returns:
+            Instantané des métriques (voir Metrics.snapshot)
+        """
+        for name, cache in (('llm', self.llm_cache), ('http', self.http.cache)):
+            lookups = cache.hits + cache.misses
+            self.metrics.set_gauge('cache_hits', cache.hits, name)
+            self.metrics.set_gauge('cache_misses', cache.misses, name)
+            self.metrics.set_gauge('cache_hit_ratio', round(cache.hits / lookups, 4) if lookups else 0.0, name)
+        self.metrics.set_gauge('http_requests_sent',
+                               self.http.requests_sent + self.async_http_stats['requests_sent'])
+        self.metrics.set_gauge('http_revalidated',
+                               self.http.revalidated + self.async_http_stats['revalidated'])
+        self.metrics.set_gauge('api_retries', self.http.limiter.retries)
+        self.metrics.set_gauge('unique_references', self.last_unique_count)
+        return self.metrics.snapshot()
+
+    def save_metrics(self, base_name: str, timestamp: str):
+        """
+        Exporte les métriques à côté des résultats (formats de METRICS_FORMATS)
 
+        Args:
+            base_name: Nom de base des fichiers de résultats
+            timestamp: Horodatage des fichiers de résultats
+        """
+        if not config.METRICS_FORMATS:
+            return
+        self.collect_metrics()
+        prefix = self.output_dir / f"{base_name}_{timestamp}"
+
+        if 'json' in config.METRICS_FORMATS:
+            self.metrics.write_json(Path(f"{prefix}_metrics.json"))
+        if 'prometheus' in config.METRICS_FORMATS:
+            self.metrics.write_prometheus(Path(f"{prefix}_metrics.prom"))
+        if 'trace' in config.METRICS_FORMATS:
+            self.metrics.write_chrome_trace(Path(f"{prefix}_trace.json"))
+        print(f"📊 Métriques: {prefix}_metrics.* ({', '.join(config.METRICS_FORMATS)})")
 
 def main():
     """Point d'entrée principal du script"""
 
+    # Sous-commande : interroger l'index des citations sans lancer l'enrichissement
+    if sys.argv[1:2] == ['query']:
+        if not config.CITATION_INDEX_FILE:
+            print("❌ Index des citations désactivé (CITATION_INDEX_FILE dans config.py)")
+            sys.exit(1)
+        output_dir = Path(config.VAULT_PATH).resolve() / config.OUTPUT_DIR
+        citation_index.main(sys.argv[2:], output_dir / config.CITATION_INDEX_FILE)
+        return
+
     print("=" * 60)
     print("📚 ENRICHISSEUR BIBLIOGRAPHIQUE POUR OBSIDIAN")
     print("=" * 60)
@@ -505,37 +1747,121 @@ def main():
     # Vérifier les arguments
     if len(sys.argv) < 2:
         print("\n❌ Usage: python agent.py <nom_du_fichier.md>")
+        print("          python agent.py --vault [motif]")
+        print("          python agent.py --watch [motif]")
+        print("          python agent.py --serve")
+        print("          python agent.py query --author Habermas --year 1992")
         print("\nExemple: python agent.py '1.2 The impact of digitalisation on intellectual life.md'")
         print("\n💡 Astuce: Utilisez des guillemets si le nom contient des espaces!")
         sys.exit(1)
 
-    # Joindre tous les arguments (pour gérer les noms avec espaces même sans guillemets)
-    target_file = ' '.join(sys.argv[1:])
+    parser = argparse.ArgumentParser(description="Enrichit les tags #reflitterature d'une note Obsidian")
+    parser.add_argument('file', nargs='*', help="Nom du fichier .md à traiter")
+    parser.add_argument('--vault', nargs='?', const='**/*.md', metavar='GLOB',
+                        help="Traite tout le vault (ou les notes du motif GLOB), "
+                             "en ignorant les notes inchangées")
+    parser.add_argument('--watch', nargs='?', const='**/*.md', metavar='GLOB',
+                        help="Surveille le vault (ou les notes du motif GLOB) et enrichit "
+                             "chaque note dès son enregistrement")
+    parser.add_argument('--serve', action='store_true',
+                        help="Lance le démon HTTP/JSON local (SERVER_HOST:SERVER_PORT)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="N'utilise pas les caches (extractions LLM, réponses API)")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Ignore les caches existants et les met à jour")
+    parser.add_argument('--async-api', action='store_true',
+                        help="Lance toutes les recherches DOI en parallèle (asyncio)")
+    parser.add_argument('--offline', action='store_true',
+                        help="Aucun appel API : DOI résolus avec l'index local (OFFLINE_INDEX_FILE)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reprend une exécution interrompue (références déjà journalisées ignorées)")
+    args = parser.parse_args()
+
+    if not args.file and args.vault is None and args.watch is None and not args.serve:
+        parser.error("indiquez un fichier .md, --vault, --watch ou --serve")
 
     # Initialiser l'agent
-    enricher = BiblioEnricher()
+    enricher = BiblioEnricher(use_cache=not args.no_cache, refresh_cache=args.refresh,
+                              async_api=args.async_api, offline=args.offline)
 
-    # Scanner le fichier
-    references = enricher.scan_file(target_file)
-
-    if not references:
-        print("\n✓ Aucune référence #reflitterature trouvée dans ce fichier.")
-        sys.exit(0)
+    if args.watch is not None:
+        # Mode surveillance : processus résident, caches et modèle gardés chauds
+        try:
+            enricher.watch(args.watch)
+        except KeyboardInterrupt:
+            print("\n\n👋 Surveillance arrêtée.")
+        return
 
-    # Traiter les références
-    enriched = enricher.process_references(references)
+    if args.serve:
+        # Démon : une requête = un passage du pipeline, sans démarrage de processus
+        try:
+            server.serve(enricher, config.SERVER_HOST, config.SERVER_PORT, config.SERVER_WORKERS)
+        except KeyboardInterrupt:
+            print("\n\n👋 Démon arrêté.")
+        return
 
-    # Sauvegarder les résultats
-    enricher.save_results(enriched, target_file)
+    # Joindre tous les arguments (pour gérer les noms avec espaces même sans guillemets)
+    target_file = 'vault' if args.vault is not None else ' '.join(args.file)
+
+    # Journal de reprise : chaque référence terminée y est écrite aussitôt
+    journal_path = enricher.output_dir / f"{Path(target_file).stem}{config.JOURNAL_SUFFIX}"
+    if args.resume and not journal_path.exists():
+        print(f"\n⚠️  Aucun journal à reprendre ({journal_path.name}), traitement complet")
+    journal = Journal(journal_path, resume=args.resume, fsync=config.JOURNAL_FSYNC)
+
+    try:
+        if args.vault is not None:
+            # Mode batch : tout le vault en un seul passage
+            enriched = enricher.process_vault(args.vault, journal)
+            first = next(enriched, None)
+
+            if first is None:
+                journal.close(remove=True)
+                print("\n✓ Aucune référence dans les notes modifiées depuis le dernier passage.")
+                sys.exit(0)
+            enriched = chain([first], enriched)
+        else:
+            # Scanner le fichier en flux : l'enrichissement démarre dès la première référence
+            references = enricher.iter_references(target_file)
+            first = next(references, None)
+
+            if first is None:
+                enricher.forget_note(target_file)
+                journal.close(remove=True)
+                print("\n✓ Aucune référence #reflitterature trouvée dans ce fichier.")
+                sys.exit(0)
+
+            # Traiter les références, chaque résultat part aussitôt dans les rapports
+            enriched = enricher.stream_references(chain([first], references), journal)
+
+        # Sauvegarder les résultats
+        stats = enricher.save_results(enriched, target_file)
+    except KeyboardInterrupt:
+        journal.close()
+        print(f"\n\n⏸️  Interrompu. Reprendre avec --resume (journal: {journal_path.name})")
+        sys.exit(130)
+    except Exception:
+        journal.close()
+        print(f"\n⏸️  Erreur. Reprendre avec --resume (journal: {journal_path.name})")
+        raise
+
+    # Rapports écrits : le journal n'est plus nécessaire
+    journal.close(remove=True)
 
     # Résumé
     print("\n" + "=" * 60)
     print("✅ TRAITEMENT TERMINÉ")
     print("=" * 60)
-    with_doi = sum(1 for r in enriched if r['api_result'])
-    print(f"Références traitées: {len(enriched)}")
-    print(f"DOI trouvés: {with_doi}/{len(enriched)}")
-    print(f"Taux de réussite: {with_doi/len(enriched)*100:.1f}%" if enriched else "N/A")
+    total, with_doi = stats['total'], stats['with_doi']
+    print(f"Références traitées: {total}")
+    print(f"Références uniques enrichies: {enricher.last_unique_count}")
+    print(f"DOI trouvés: {with_doi}/{total}")
+    print(f"Taux de réussite: {with_doi/total*100:.1f}%" if total else "N/A")
+
+    paths = enricher.path_counts
+    print(f"Extraction: {paths['identifier']} par identifiant, {paths['parser']} par règles, "
+          f"{paths['cache']} depuis le cache, "
+          f"{paths['llm']} par LLM, {paths['llm_error']} échec(s) LLM")
 
 
 if __name__ == "__main__":
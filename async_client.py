@@ -0,0 +1,118 @@
+"""
+Client HTTP asynchrone pour les APIs bibliographiques (OpenAlex, CrossRef)
+Permet de garder des centaines de requêtes en vol dans une seule boucle asyncio,
+avec un plafond de requêtes simultanées par hôte
+"""
+
+import asyncio
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from cache import HttpCache
+from http_client import loads, revalidation_headers
+from ratelimit import RateLimiter
+
+
+class AsyncHttpClient:
+    """Client httpx asynchrone, avec sémaphore par hôte et cache partagé avec HttpClient"""
+
+    def __init__(self, cache: HttpCache, limiter: RateLimiter, host_limits: Dict[str, int],
+                 default_host_limit: int = 5, timeout: float = 10,
+                 default_ttl: Optional[float] = None):
+        """
+        Args:
+            cache: Cache persistant des réponses (le même que le client synchrone)
+            limiter: Débit, reprises et disjoncteur par API (partagé avec le client synchrone)
+            host_limits: Requêtes simultanées maximum par hôte (ex: {'api.crossref.org': 5})
+            default_host_limit: Limite pour les hôtes absents de host_limits
+            timeout: Timeout des requêtes (secondes)
+            default_ttl: Durée de fraîcheur par défaut des réponses (secondes)
+        """
+        self.cache = cache
+        self.limiter = limiter
+        self.host_limits = host_limits
+        self.default_host_limit = default_host_limit
+        self.timeout = timeout
+        self.default_ttl = default_ttl
+        self.requests_sent = 0
+        self.revalidated = 0
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self) -> 'AsyncHttpClient':
+        max_connections = max([self.default_host_limit, *self.host_limits.values()])
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=max_connections * max(1, len(self.host_limits)),
+                                max_keepalive_connections=max_connections)
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        """Sémaphore de l'hôte de l'URL (créée à la première requête)"""
+        host = urlparse(url).hostname or ''
+        if host not in self._semaphores:
+            limit = self.host_limits.get(host, self.default_host_limit)
+            self._semaphores[host] = asyncio.Semaphore(limit)
+        return self._semaphores[host]
+
+    async def get_json(self, url: str, params: Optional[Dict] = None,
+                       headers: Optional[Dict] = None, ttl: Optional[float] = None,
+                       api: str = 'default') -> Dict:
+        """
+        GET avec cache et reprises, équivalent asynchrone de HttpClient.get_json
+
+        Le cache SQLite (verrou partagé avec les threads du client synchrone)
+        est lu et écrit dans un thread, sans bloquer la boucle.
+
+        Raises:
+            httpx.HTTPStatusError: Si le serveur répond par une erreur (après reprises)
+            CircuitOpenError: Si l'API est coupée par le disjoncteur
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+
+        key = HttpCache.make_key(url, params)
+        entry = await asyncio.to_thread(self.cache.get, key)
+        if entry and entry['fresh']:
+            return loads(entry['body'])
+
+        request_headers = revalidation_headers(entry, headers)
+        guard = self.limiter.guard(api)
+        attempt = 0
+        while True:
+            await asyncio.sleep(guard.before_request())
+            try:
+                async with self._semaphore(url):
+                    response = await self._client.get(url, params=params, headers=request_headers)
+                self.requests_sent += 1
+            except httpx.TransportError:
+                delay = guard.on_error(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = guard.on_response(response.status_code, response.headers, attempt)
+                if delay is None:
+                    break
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if response.status_code == 304 and entry:
+            self.revalidated += 1
+            await asyncio.to_thread(self.cache.touch, key, ttl)
+            return loads(entry['body'])
+
+        response.raise_for_status()
+
+        body = response.text
+        await asyncio.to_thread(self.cache.set, key, url, body,
+                                etag=response.headers.get('ETag'),
+                                last_modified=response.headers.get('Last-Modified'),
+                                ttl=ttl)
+        return loads(body)
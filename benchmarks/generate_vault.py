@@ -0,0 +1,167 @@
+"""
+Génération de vaults synthétiques pour les benchmarks
+Notes avec tags %% #reflitterature %%, bruit OCR, citations répétées,
+et fichier bibliographie de 1k à 50k entrées
+"""
+
+import argparse
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from stub_servers import fake_doi
+
+SURNAMES = [
+    'Habermas', 'Raymond', 'Lessig', 'Anderson', 'Rainie', 'Castells', 'Benkler',
+    'Stallman', 'Bourdieu', 'Latour', 'Foucault', 'Arendt', 'Turkle', 'Zuboff',
+    'Morozov', 'Shirky', 'Jenkins', 'Boyd', 'Tufekci', 'Floridi', 'Stiegler',
+    'Cardon', 'Flichy', 'Musiani', 'Mounier', 'Doueihi', 'Vitali-Rosati', 'Lévy',
+]
+GIVEN_NAMES = ['Jürgen', 'Eric', 'Lawrence', 'Janna', 'Manuel', 'Yochai', 'Richard',
+               'Pierre', 'Bruno', 'Michel', 'Hannah', 'Sherry', 'Shoshana', 'Evgeny',
+               'Clay', 'Henry', 'Danah', 'Zeynep', 'Luciano', 'Bernard', 'Dominique']
+TITLE_WORDS = [
+    'digital', 'public', 'sphere', 'culture', 'network', 'society', 'knowledge',
+    'information', 'power', 'commons', 'platform', 'surveillance', 'capitalism',
+    'memory', 'writing', 'reading', 'media', 'politics', 'technology', 'freedom',
+    'open', 'source', 'transformation', 'communication', 'identity', 'archive',
+    'humanities', 'publishing', 'internet', 'governance', 'labour', 'attention',
+]
+# Syllabes ajoutées aux noms pour les grosses bibliographies (lettres seulement,
+# comme les noms reconnus dans les citations)
+SYLLABLES = ['ba', 'ko', 'ri', 'mel', 'son', 'dor', 'vic', 'tan', 'lu', 'gen', 'mar', 'pel']
+PUBLISHERS = ['MIT Press', 'Polity', 'Yale University Press', 'Seuil', 'La Découverte',
+              'Oxford University Press', 'Presses de Sciences Po', "O'Reilly"]
+
+# Substitutions typiques de l'OCR
+OCR_CONFUSIONS = {'l': '1', 'o': '0', 'e': 'c', 'rn': 'm', 'i': 'í', 'a': 'à', 's': '5'}
+
+FILLER = ("Ce paragraphe développe l'argument principal de la section et discute "
+          "les implications pour les pratiques savantes contemporaines.")
+
+
+def make_entries(count: int, rng: random.Random) -> List[Dict]:
+    """Entrées bibliographiques uniques (auteur, année, titre, éditeur)"""
+    entries = []
+    seen = set()
+    while len(entries) < count:
+        surname = rng.choice(SURNAMES)
+        # Noms suffixés pour dépasser la liste de base sur les grosses bibliographies
+        if len(entries) >= len(SURNAMES) * 10:
+            surname = f"{surname}{rng.choice(SYLLABLES)}{rng.choice(SYLLABLES)}"
+        year = rng.randint(1950, 2024)
+        title = ' '.join(rng.sample(TITLE_WORDS, rng.randint(3, 7))).capitalize()
+        if (surname, year, title) in seen:
+            continue
+        seen.add((surname, year, title))
+        entries.append({
+            'author': f"{surname}, {rng.choice(GIVEN_NAMES)}",
+            'surname': surname,
+            'year': year,
+            'title': title,
+            'publisher': rng.choice(PUBLISHERS),
+        })
+    return entries
+
+
+def ocr_noise(text: str, rate: float, rng: random.Random) -> str:
+    """Applique des confusions OCR à une fraction `rate` des caractères concernés"""
+    if rate <= 0:
+        return text
+    out = []
+    i = 0
+    while i < len(text):
+        pair = text[i:i + 2]
+        if pair in OCR_CONFUSIONS and rng.random() < rate:
+            out.append(OCR_CONFUSIONS[pair])
+            i += 2
+            continue
+        char = text[i]
+        out.append(OCR_CONFUSIONS[char] if char in OCR_CONFUSIONS and rng.random() < rate else char)
+        i += 1
+    return ''.join(out)
+
+
+def generate_vault(root: Path, notes: int = 10, tags_per_note: int = 20,
+                   bib_entries: int = 1000, ocr_rate: float = 0.0,
+                   repeat_ratio: float = 0.2, unknown_ratio: float = 0.1,
+                   doi_ratio: float = 0.0,
+                   biblio_file: str = "4.4 Bibliographic references.md",
+                   seed: int = 42) -> Dict:
+    """
+    Crée un vault synthétique
+
+    Args:
+        root: Dossier du vault (créé si besoin)
+        notes: Nombre de notes
+        tags_per_note: Tags #reflitterature par note
+        bib_entries: Nombre d'entrées dans la bibliographie
+        ocr_rate: Taux de confusion OCR appliqué aux citations (0 à 1)
+        repeat_ratio: Proportion de citations qui reprennent une citation déjà faite
+        unknown_ratio: Proportion de citations absentes de la bibliographie
+        doi_ratio: Proportion d'entrées bibliographiques portant déjà leur DOI
+        biblio_file: Nom du fichier bibliographie (config.BIBLIO_FILE)
+        seed: Graine aléatoire (vault reproductible)
+
+    Returns:
+        Description du vault généré (chemins, nombre de tags)
+    """
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+
+    entries = make_entries(bib_entries, rng)
+    with open(root / biblio_file, 'w', encoding='utf-8') as f:
+        f.write("# Bibliographie\n\n")
+        for e in entries:
+            doi = f" https://doi.org/{fake_doi(e['title'])}" if rng.random() < doi_ratio else ''
+            f.write(f"{e['author']}. {e['year']}. {e['title']}. {e['publisher']}.{doi}\n\n")
+
+    cited: List[str] = []
+    note_paths = []
+    for n in range(notes):
+        lines = [f"---\ntitle: Note {n}\n---\n", f"# Note de synthèse {n}\n", ""]
+        for _ in range(tags_per_note):
+            if cited and rng.random() < repeat_ratio:
+                citation = rng.choice(cited)
+            elif rng.random() < unknown_ratio:
+                citation = f"{rng.choice(SURNAMES)}x {rng.randint(1950, 2024)}"
+            else:
+                e = rng.choice(entries)
+                citation = ocr_noise(f"{e['surname']} {e['year']}", ocr_rate, rng)
+            cited.append(citation)
+            lines.append(FILLER)
+            lines.append(f"Comme le montre ==({citation})== %% #reflitterature "
+                         f"{ocr_noise(rng.choice(TITLE_WORDS), ocr_rate, rng)} %% dans ce contexte.")
+            lines.append("")
+
+        path = root / f"note_{n:04d}.md"
+        path.write_text('\n'.join(lines), encoding='utf-8')
+        note_paths.append(path)
+
+    return {
+        'root': root,
+        'notes': note_paths,
+        'tags': notes * tags_per_note,
+        'bib_entries': bib_entries,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un vault Obsidian synthétique")
+    parser.add_argument('root', type=Path, help="Dossier du vault à créer")
+    parser.add_argument('--notes', type=int, default=10)
+    parser.add_argument('--tags', type=int, default=20, help="Tags par note")
+    parser.add_argument('--bib-entries', type=int, default=1000)
+    parser.add_argument('--ocr', type=float, default=0.0, help="Taux de bruit OCR (0 à 1)")
+    parser.add_argument('--doi', type=float, default=0.0, help="Proportion d'entrées avec DOI (0 à 1)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    vault = generate_vault(args.root, args.notes, args.tags, args.bib_entries,
+                           args.ocr, doi_ratio=args.doi, seed=args.seed)
+    print(f"✅ {len(vault['notes'])} note(s), {vault['tags']} tag(s), "
+          f"{vault['bib_entries']} entrée(s) bibliographiques dans {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Benchmark reproductible de l'enrichisseur
+Génère un vault synthétique, démarre les stubs Ollama/OpenAlex/CrossRef et
+mesure le scan, la recherche en bibliographie et le pipeline complet
+(débit, p50/p95 par référence, pic de mémoire)
+
+Exemple :
+    python benchmarks/run_benchmark.py --notes 20 --tags 50 --bib-entries 10000 \\
+        --latency-llm 0.05 --latency-api 0.02 --error-rate 0.02 --json bench.json
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_vault import generate_vault  # noqa: E402
+from stub_servers import StubServer  # noqa: E402
+
+
+def install_config(vault: Path, stub_url: str, args: argparse.Namespace):
+    """
+    Charge config.example.py comme module `config`, pointé sur le vault et les stubs
+
+    À appeler avant d'importer agent : les modules lisent `config` à l'import.
+    """
+    spec = importlib.util.spec_from_file_location('config', ROOT / 'config.example.py')
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+
+    config.VAULT_PATH = str(vault)
+    config.OLLAMA_URL = stub_url
+    config.OPENALEX_URL = f"{stub_url}/openalex"
+    config.CROSSREF_URL = f"{stub_url}/crossref"
+    config.OPENALEX_EMAIL = None
+    config.CROSSREF_EMAIL = None
+    config.API_RATE_LIMITS = {}  # Le stub n'impose pas de quota
+    config.API_BACKOFF_BASE = 0.01
+    config.API_BACKOFF_MAX = 0.1
+    config.OFFLINE_INDEX_FILE = None
+    config.METRICS_FORMATS = []
+    config.HTTP_WORKERS = args.http_workers
+    config.BULK_LOOKUP_SIZE = args.bulk_size
+    config.API_STRUCTURED_QUERIES = not args.free_text
+    config.LLM_WORKERS = args.llm_workers
+    config.LLM_BATCH_SIZE = args.llm_batch_size
+    config.OLLAMA_NUM_PARALLEL = args.ollama_parallel
+    sys.modules['config'] = config
+
+    os.environ.setdefault('TQDM_DISABLE', '1')
+
+
+def peak_rss_mb() -> float:
+    """Pic de mémoire résidente du processus (Mo)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run(args: argparse.Namespace, vault_dir: Path) -> Dict:
+    vault = generate_vault(vault_dir, args.notes, args.tags, args.bib_entries,
+                           args.ocr, doi_ratio=args.doi, seed=args.seed)
+
+    latency = {'ollama': args.latency_llm, 'openalex': args.latency_api, 'crossref': args.latency_api}
+    with StubServer(latency, args.jitter, args.error_rate, args.seed) as stub:
+        install_config(vault_dir, stub.url, args)
+        from agent import BiblioEnricher
+
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet:
+            enricher = BiblioEnricher(vault_path=str(vault_dir), use_cache=False,
+                                      async_api=args.async_api)
+
+            # 1. Scan des notes
+            start = time.perf_counter()
+            references = []
+            for path in vault['notes']:
+                references.extend(enricher.iter_references(path.name))
+            scan_s = time.perf_counter() - start
+
+            # 2. Bibliographie : construction de l'index puis recherches
+            start = time.perf_counter()
+            enricher.search_in_bibliography('')
+            index_s = time.perf_counter() - start
+            start = time.perf_counter()
+            found = sum(1 for ref in references if enricher.search_in_bibliography(ref['raw_text']))
+            lookup_s = time.perf_counter() - start
+
+            # 3. Pipeline complet (règles, LLM, APIs)
+            start = time.perf_counter()
+            enriched = enricher.process_references(references)
+            pipeline_s = time.perf_counter() - start
+
+        stages = enricher.collect_metrics()['stages']
+        per_ref = stages.get('reference', {})
+        with_doi = sum(1 for r in enriched if r['api_result'] and r['api_result']['doi'])
+
+        return {
+            'parameters': {k: v for k, v in vars(args).items() if k not in ('json', 'keep', 'verbose')},
+            'references': len(references),
+            'unique_references': enricher.last_unique_count,
+            'scan': {'seconds': round(scan_s, 4), 'refs_per_s': round(len(references) / scan_s, 1)},
+            'bibliography': {
+                'index_build_s': round(index_s, 4),
+                'lookups_per_s': round(len(references) / lookup_s, 1) if lookup_s else None,
+                'found': found,
+            },
+            'pipeline': {
+                'seconds': round(pipeline_s, 3),
+                'refs_per_s': round(len(enriched) / pipeline_s, 1),
+                'p50_ms': round(per_ref.get('p50_s', 0) * 1000, 1),
+                'p95_ms': round(per_ref.get('p95_s', 0) * 1000, 1),
+                'with_doi': with_doi,
+            },
+            'stages': {name: {'count': s['count'], 'mean_ms': round(s.get('mean_s', 0) * 1000, 2),
+                              'p95_ms': round(s.get('p95_s', 0) * 1000, 2), 'errors': s['errors']}
+                       for name, s in stages.items()},
+            'paths': dict(enricher.path_counts),
+            'stub_requests': dict(stub.requests),
+            'stub_errors': stub.errors,
+            'stub_kb': round(stub.bytes_sent / 1024, 1),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+
+
+def print_report(report: Dict):
+    p = report['pipeline']
+    print(f"Références: {report['references']} ({report['unique_references']} unique(s))")
+    print(f"Scan:          {report['scan']['refs_per_s']:>10} réf/s ({report['scan']['seconds']} s)")
+    print(f"Bibliographie: {report['bibliography']['lookups_per_s']:>10} recherches/s "
+          f"(index: {report['bibliography']['index_build_s']} s, trouvées: {report['bibliography']['found']})")
+    print(f"Pipeline:      {p['refs_per_s']:>10} réf/s ({p['seconds']} s) "
+          f"p50 {p['p50_ms']} ms, p95 {p['p95_ms']} ms, DOI {p['with_doi']}/{report['references']}")
+    print(f"Pic RSS:       {report['peak_rss_mb']:>10} Mo")
+    print("\nÉtape          appels   moyenne    p95   erreurs")
+    for name, s in report['stages'].items():
+        print(f"{name:<14} {s['count']:>6} {s['mean_ms']:>8.2f}ms {s['p95_ms']:>7.1f}ms {s['errors']:>6}")
+    print(f"\nRequêtes stub: {report['stub_requests']}, erreurs injectées: {report['stub_errors']}, "
+          f"{report['stub_kb']} Ko servis")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'enrichisseur sur un vault synthétique")
+    parser.add_argument('--notes', type=int, default=10)
+    parser.add_argument('--tags', type=int, default=20, help="Tags par note")
+    parser.add_argument('--bib-entries', type=int, default=1000)
+    parser.add_argument('--ocr', type=float, default=0.0, help="Taux de bruit OCR (0 à 1)")
+    parser.add_argument('--doi', type=float, default=0.0, help="Proportion d'entrées avec DOI (0 à 1)")
+    parser.add_argument('--latency-llm', type=float, default=0.05, help="Latence Ollama (s)")
+    parser.add_argument('--latency-api', type=float, default=0.02, help="Latence OpenAlex/CrossRef (s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Variation de latence (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Proportion de 503 injectées")
+    parser.add_argument('--http-workers', type=int, default=4)
+    parser.add_argument('--bulk-size', type=int, default=50, help="Identifiants par requête groupée")
+    parser.add_argument('--llm-workers', type=int, default=1)
+    parser.add_argument('--llm-batch-size', type=int, default=8)
+    parser.add_argument('--ollama-parallel', type=int, default=1, help="OLLAMA_NUM_PARALLEL")
+    parser.add_argument('--async-api', action='store_true')
+    parser.add_argument('--free-text', action='store_true', help="Recherche plein texte seule")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', type=Path, help="Écrit le rapport en JSON")
+    parser.add_argument('--keep', type=Path, help="Génère le vault dans ce dossier (conservé)")
+    parser.add_argument('--verbose', action='store_true', help="Affiche la sortie de l'enrichisseur")
+    args = parser.parse_args()
+
+    if args.keep:
+        report = run(args, args.keep)
+    else:
+        with tempfile.TemporaryDirectory(prefix='biblio-bench-') as tmp:
+            report = run(args, Path(tmp))
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
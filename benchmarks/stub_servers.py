@@ -0,0 +1,320 @@
+"""
+Serveur local imitant Ollama, OpenAlex et CrossRef pour les benchmarks
+Latence configurable par service et injection d'erreurs (503 + Retry-After)
+
+Routes :
+    GET  /api/tags                 Ollama : modèles installés
+    POST /api/generate             Ollama : préchargement du modèle (prompt vide)
+    POST /api/chat                 Ollama : extraction (objet, ou {"references": [...]})
+    GET  /openalex/works           OpenAlex : recherche (?search=), filtres de recherche
+                                   (title.search, raw_author_name.search, publication_year)
+                                   ou filtre d'identifiants (?filter=doi:a|b)
+    GET  /openalex/works/<id>      OpenAlex : notice (doi:...)
+    GET  /crossref/works           CrossRef : recherche (?query= ou ?query.bibliographic=
+                                   &query.author=, filtre from/until-pub-date) ou filtre
+                                   d'identifiants (?filter=doi:a,doi:b)
+    GET  /crossref/works/<doi>     CrossRef : notice
+
+Les notices complètes imitent le volume des vraies (résumé, concepts,
+références citées) ; le paramètre select les réduit aux champs demandés.
+
+Seuls les DOI du préfixe fictif (fake_doi) sont connus des notices et filtres.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+YEAR_PATTERN = re.compile(r'\b((?:19|20)\d{2})\b')
+SURNAME_PATTERN = re.compile(r"\b([A-ZÀ-Ý][\w'\-]+)")
+# Références numérotées d'un prompt groupé : "[3] texte"
+NUMBERED_PATTERN = re.compile(r'^\[(\d+)\]\s*(.+)$', re.M)
+SINGLE_PATTERN = re.compile(r'^Référence:\s*(.+)$', re.M)
+
+DECOY_WORDS = ['theory', 'practice', 'history', 'review', 'essays', 'studies', 'handbook']
+# Champs volumineux des notices complètes, absents avec select=
+OPENALEX_BULK = {
+    'abstract_inverted_index': {f"word{i}": [i, i + 150] for i in range(150)},
+    'concepts': [{'id': f"https://openalex.org/C{i}", 'display_name': f"Concept {i}",
+                  'level': i % 4, 'score': 0.5} for i in range(15)],
+    'locations': [{'is_oa': False, 'landing_page_url': f"https://example.org/{i}",
+                   'source': {'display_name': f"Source {i}"}} for i in range(3)],
+}
+CROSSREF_BULK = {
+    'reference': [{'key': f"ref{i}", 'unstructured': f"Reference {i}. Some Title. 2001."}
+                  for i in range(40)],
+    'license': [{'URL': 'https://example.org/license', 'content-version': 'vor'}],
+}
+
+
+FAKE_DOI_PREFIX = '10.5555/'
+
+
+def fake_doi(title: str) -> str:
+    """DOI déterministe dérivé du titre"""
+    return f"{FAKE_DOI_PREFIX}{hashlib.sha1(title.lower().encode('utf-8')).hexdigest()[:12]}"
+
+
+def known_work(doi: str) -> Optional[Dict]:
+    """Notice d'un DOI fictif (titre inconnu du stub), None pour un autre DOI"""
+    doi = doi.lower()
+    if not doi.startswith(FAKE_DOI_PREFIX):
+        return None
+    return {'doi': doi, 'title': f"Work {doi[len(FAKE_DOI_PREFIX):]}", 'author': 'Anonymous', 'year': 2000}
+
+
+def extract_fields(text: str) -> Dict:
+    """Auteur, titre et année devinés d'une référence (imitation naïve du LLM)"""
+    years = YEAR_PATTERN.findall(text)
+    surnames = SURNAME_PATTERN.findall(text)
+    year = years[0] if years else 'Unknown'
+    # Référence complète "Nom, Prénom. Année. Titre. Éditeur." : le titre suit l'année
+    parts = [p.strip() for p in text.split('.') if p.strip()]
+    title = parts[2] if len(parts) > 2 and parts[1] == year else text
+    return {
+        'author': surnames[0] if surnames else 'Unknown',
+        'title': title,
+        'year': year,
+        'confidence': 0.9 if surnames and years else 0.3,
+    }
+
+
+def project(record: Dict, select: Optional[str], bulk: Dict) -> Dict:
+    """Notice complète (champs volumineux compris), ou réduite aux champs de select"""
+    if not select:
+        return {**record, **bulk}
+    fields = select.split(',')
+    return {k: v for k, v in record.items() if k in fields}
+
+
+def search_terms(query: str):
+    """Titre, auteur et année d'une requête libre "titre auteur année" """
+    words = query.split()
+    year = words[-1] if words and words[-1].isdigit() else None
+    author = words[-2] if year and len(words) > 1 else None
+    title = ' '.join(words[:-2]) if year and len(words) > 2 else query
+    return title, author, int(year) if year else None
+
+
+class StubServer:
+    """Serveur HTTP local (port libre choisi automatiquement), dans un thread"""
+
+    def __init__(self, latency: Optional[Dict[str, float]] = None, jitter: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 42):
+        """
+        Args:
+            latency: Latence moyenne par service, en secondes
+                     ({'ollama': 0.05, 'openalex': 0.02, 'crossref': 0.03})
+            jitter: Variation aléatoire ajoutée à la latence (0 à jitter secondes)
+            error_rate: Proportion de réponses 503 (hors /api/tags)
+            seed: Graine aléatoire (latences et erreurs reproductibles)
+        """
+        self.latency = latency or {}
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = {'ollama': 0, 'openalex': 0, 'crossref': 0}
+        self.errors = 0
+        self.bytes_sent = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _delay(self, service: str) -> Optional[float]:
+        """Latence simulée, ou None si la requête doit échouer"""
+        with self._lock:
+            self.requests[service] += 1
+            if self._rng.random() < self.error_rate:
+                self.errors += 1
+                return None
+            return self.latency.get(service, 0.0) + self._rng.uniform(0, self.jitter)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+                if url.path == '/api/tags':
+                    return self._json({'models': [{'name': 'llama3.1:8b', 'model': 'llama3.1:8b'}]})
+                if url.path.startswith('/openalex/works'):
+                    return self._respond('openalex', lambda: stub._openalex(url.path, query))
+                if url.path.startswith('/crossref/works'):
+                    return self._respond('crossref', lambda: stub._crossref(url.path, query))
+                self._json({'error': 'not found'}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                path = urlparse(self.path).path
+                if path == '/api/chat':
+                    return self._respond('ollama', lambda: stub._chat(body))
+                if path == '/api/generate':
+                    return self._json({'model': body.get('model'), 'response': '', 'done': True})
+                self._json({'error': 'not found'}, 404)
+
+            def _respond(self, service: str, build):
+                delay = stub._delay(service)
+                if delay is None:
+                    return self._json({'error': 'injected failure'}, 503, {'Retry-After': '0'})
+                time.sleep(delay)
+                payload = build()
+                if payload is None:
+                    return self._json({'error': 'not found'}, 404)
+                self._json(payload)
+
+            def _json(self, payload, status: int = 200, headers: Optional[Dict] = None):
+                data = json.dumps(payload).encode('utf-8')
+                with stub._lock:
+                    stub.bytes_sent += len(data)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def _chat(self, body: Dict) -> Dict:
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+        numbered = NUMBERED_PATTERN.findall(prompt)
+        if numbered:
+            content = [{'id': int(i), **extract_fields(text)} for i, text in numbered]
+            if body.get('format'):  # JSON ou schéma : un objet, pas un tableau
+                content = {'references': content}
+        else:
+            single = SINGLE_PATTERN.search(prompt)
+            content = extract_fields(single.group(1) if single else prompt)
+        return {
+            'model': body.get('model'),
+            'message': {'role': 'assistant', 'content': json.dumps(content, ensure_ascii=False)},
+            'done': True,
+        }
+
+    def _works(self, title: str, author: Optional[str], year: Optional[int],
+               author_filter: Optional[str] = None, years: Optional[tuple] = None) -> List[Dict]:
+        """
+        Jusqu'à cinq notices : la bonne (dérivée de la requête) et quatre leurres,
+        le premier leurre en tête en recherche libre (pertinence imparfaite).
+        Les filtres auteur / années écartent les leurres qui ne correspondent pas.
+        """
+        match = {'title': title, 'author': author or author_filter or 'Anonymous', 'year': year}
+        decoys = [{'title': f"{title} {word}", 'author': 'Other', 'year': 1999}
+                  for word in DECOY_WORDS[:4]]
+        works = [decoys[0], match] + decoys[1:]
+        if author_filter:
+            works = [w for w in works if w['author'].lower() == author_filter.lower()]
+        if years:
+            works = [w for w in works if w['year'] is None or years[0] <= w['year'] <= years[1]]
+        return works
+
+    def _openalex(self, path: str, query: Dict) -> Optional[Dict]:
+        def work(w):
+            doi = w.get('doi') or fake_doi(w['title'])
+            return project({
+                'id': f"https://openalex.org/W{int(doi[-8:], 16)}",
+                'doi': f"https://doi.org/{doi}",
+                'title': w['title'],
+                'publication_year': w['year'],
+                'authorships': [{'author': {'display_name': w['author']}}],
+            }, query.get('select'), OPENALEX_BULK)
+
+        if path.rstrip('/') == '/openalex/works':
+            if query.get('filter', '').startswith('doi:'):
+                works = [known_work(doi) for doi in query['filter'][len('doi:'):].split('|')]
+                results = [work(w) for w in works if w]
+                return {'meta': {'count': len(results)}, 'results': results}
+            if 'filter' in query:
+                filters = dict(f.split(':', 1) for f in query['filter'].split(',') if ':' in f)
+                years = None
+                if 'publication_year' in filters:
+                    start, _, end = filters['publication_year'].partition('-')
+                    years = (int(start), int(end or start))
+                works = self._works(filters.get('title.search', ''), None, years and (years[0] + years[1]) // 2,
+                                    filters.get('raw_author_name.search'), years)
+            else:
+                works = self._works(*search_terms(query.get('search', '')))
+            return {'meta': {'count': len(works)}, 'results': [work(w) for w in works]}
+
+        # Notice par identifiant : /openalex/works/doi:10.5555/...
+        work_path = path[len('/openalex/works/'):]
+        w = known_work(work_path[len('doi:'):]) if work_path.startswith('doi:') else None
+        return work(w) if w else None
+
+    def _crossref(self, path: str, query: Dict) -> Optional[Dict]:
+        def item(w):
+            return project({
+                'DOI': w.get('doi') or fake_doi(w['title']),
+                'title': [w['title']],
+                'author': [{'family': w['author'], 'given': ''}],
+                'published-print': {'date-parts': [[w['year']]]},
+            }, query.get('select'), CROSSREF_BULK)
+
+        if path.rstrip('/') == '/crossref/works':
+            filters = [f.split(':', 1) for f in query.get('filter', '').split(',') if ':' in f]
+            dois = [value for name, value in filters if name == 'doi']
+            if dois:
+                works = [known_work(doi) for doi in dois]
+                return {'message': {'items': [item(w) for w in works if w]}}
+            if 'query.bibliographic' in query:
+                dates = dict(filters)
+                years = None
+                if 'from-pub-date' in dates:
+                    years = (int(dates['from-pub-date'][:4]),
+                             int(dates.get('until-pub-date', dates['from-pub-date'])[:4]))
+                works = self._works(query['query.bibliographic'], None,
+                                    years and (years[0] + years[1]) // 2,
+                                    query.get('query.author'), years)
+            elif 'query' in query:
+                works = self._works(*search_terms(query['query']))
+            else:
+                works = []
+            return {'message': {'items': [item(w) for w in works]}}
+
+        w = known_work(path[len('/crossref/works/'):])
+        return {'message': item(w)} if w else None
+
+
+if __name__ == "__main__":
+    with StubServer(latency={'ollama': 0.05, 'openalex': 0.02, 'crossref': 0.03}) as server:
+        print(f"Stubs Ollama/OpenAlex/CrossRef sur {server.url} (Ctrl+C pour arrêter)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
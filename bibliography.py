@@ -0,0 +1,163 @@
+"""
+Index de la bibliographie locale
+Parse le fichier bibliographie une seule fois et indexe les entrées par mot
+normalisé : l'index présélectionne les entrées, le score reste celui de la
+recherche ligne à ligne (auteurs et années contenus dans la ligne)
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# Mots à l'intérieur d'une ligne de bibliographie
+WORD_PATTERN = re.compile(r'\w+')
+
+# Citations : années (mot entier) et noms d'auteur (mots commençant par une
+# majuscule, majuscules internes comprises : McLuhan, DeLanda, DiMaggio)
+CITATION_YEAR_PATTERN = re.compile(r'\b((?:19|20)\d{2})\b')
+CITATION_AUTHOR_PATTERN = re.compile(r'\b([A-Z][a-zà-ÿ]+(?:[A-Z][a-zà-ÿ]+)*)')
+
+# Mots capitalisés qui ne sont pas des noms d'auteur
+STOPWORDS = {'and', 'et', 'the', 'de', 'du', 'la', 'le'}
+
+
+def normalize_token(word: str) -> str:
+    """
+    Normalise un mot pour l'index (minuscules, sans accents)
+
+    Args:
+        word: Mot à normaliser
+
+    Returns:
+        Forme normalisée du mot
+    """
+    decomposed = unicodedata.normalize('NFKD', word)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def normalize_key(text: str) -> str:
+    """
+    Forme canonique d'un texte pour comparer des références
+    (minuscules, sans accents ni ponctuation, espaces normalisés)
+
+    Args:
+        text: Texte de la référence
+
+    Returns:
+        Mots normalisés séparés par un espace
+    """
+    return ' '.join(normalize_token(w) for w in WORD_PATTERN.findall(text))
+
+
+def parse_citation(ref_text: str) -> tuple:
+    """
+    Extrait les auteurs et années d'une citation courte
+
+    Args:
+        ref_text: Citation (format: "Auteur Année" ou "Auteur et Auteur Année")
+
+    Returns:
+        Tuple (auteurs, années), doublons conservés
+    """
+    years = CITATION_YEAR_PATTERN.findall(ref_text)
+    authors = [a for a in CITATION_AUTHOR_PATTERN.findall(ref_text)
+               if a.lower() not in STOPWORDS]
+    return authors, years
+
+
+class BibliographyIndex:
+    """Bibliographie parsée avec index inversé mot normalisé → lignes"""
+
+    def __init__(self, lines: List[str]):
+        """
+        Construit l'index à partir des lignes du fichier bibliographie
+
+        Args:
+            lines: Lignes du fichier (sans retour à la ligne)
+        """
+        self.lines = lines
+        self.by_word: Dict[str, List[int]] = defaultdict(list)
+        # Terme cherché → lignes dont un mot le contient (voir _lines_containing)
+        self._term_cache: Dict[str, Set[int]] = {}
+
+        for i, line in enumerate(lines):
+            for word in {normalize_token(w) for w in WORD_PATTERN.findall(line)}:
+                self.by_word[word].append(i)
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'BibliographyIndex':
+        """
+        Charge et indexe un fichier bibliographie
+
+        Args:
+            path: Chemin du fichier bibliographie
+
+        Returns:
+            Index de la bibliographie
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read().split('\n'))
+
+    def full_reference(self, line_index: int) -> str:
+        """Reconstitue la référence complète (ligne + lignes suivantes non vides)"""
+        full_ref = self.lines[line_index]
+        j = line_index + 1
+        while j < len(self.lines) and self.lines[j].strip():
+            full_ref += ' ' + self.lines[j].strip()
+            j += 1
+        return full_ref.strip()
+
+    def search(self, ref_text: str) -> Optional[str]:
+        """
+        Cherche la meilleure entrée pour une citation courte
+
+        Seules les lignes dont un mot contient un auteur ou une année de la
+        citation sont évaluées. Score = auteurs contenus dans la ligne +
+        années contenues dans la ligne, minimum 2 correspondances.
+
+        Args:
+            ref_text: Texte de la référence à chercher
+
+        Returns:
+            La référence complète si trouvée, None sinon
+        """
+        authors, years = parse_citation(ref_text)
+        if not (authors and years):
+            return None
+
+        candidates = set()
+        for term in set(authors + years):
+            candidates |= self._lines_containing(term)
+
+        best_line = None
+        max_matches = 0
+
+        # Ordre du fichier : à score égal, la première ligne l'emporte
+        for i in sorted(candidates):
+            line = self.lines[i]
+            matches = sum(1 for author in authors if author in line)
+            matches += sum(1 for year in years if year in line)
+
+            if matches > max_matches:
+                max_matches = matches
+                best_line = i
+
+        if best_line is None or max_matches < 2:
+            return None
+        return self.full_reference(best_line)
+
+    def _lines_containing(self, term: str) -> Set[int]:
+        """
+        Lignes dont un mot contient le terme (surensemble des lignes contenant
+        le terme : auteurs et années sont faits de caractères de mot)
+        """
+        key = normalize_token(term)
+        if key not in self._term_cache:
+            lines = set()
+            for word, ids in self.by_word.items():
+                if key in word:
+                    lines.update(ids)
+            self._term_cache[key] = lines
+        return self._term_cache[key]
@@ -0,0 +1,324 @@
+"""
+Caches persistants (SQLite) de l'enrichisseur bibliographique
+Évite de refaire les appels coûteux d'une exécution à l'autre
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+
+class _SQLiteCache:
+    """Base commune : connexion SQLite partagée entre threads, protégée par un verrou"""
+
+    # Nombre d'écritures entre deux passes d'éviction
+    EVICT_EVERY = 100
+
+    def __init__(self, db_path: Path, max_entries: int, enabled: bool = True,
+                 refresh: bool = False):
+        """
+        Ouvre (ou crée) le cache
+
+        Args:
+            db_path: Fichier SQLite du cache
+            max_entries: Nombre maximum d'entrées conservées
+            enabled: False pour désactiver complètement le cache (--no-cache)
+            refresh: True pour ignorer les entrées existantes et les réécrire (--refresh)
+        """
+        self.enabled = enabled
+        self.refresh = refresh
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if not enabled:
+            return
+
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._create_schema()
+        self._conn.commit()
+        self.evict()
+
+    def _create_schema(self):
+        raise NotImplementedError
+
+    def evict(self):
+        raise NotImplementedError
+
+    def _count_write(self):
+        """Déclenche une éviction toutes les EVICT_EVERY écritures"""
+        with self._lock:
+            self._writes += 1
+            evict_now = self._writes % self.EVICT_EVERY == 0
+        if evict_now:
+            self.evict()
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class LLMCache(_SQLiteCache):
+    """Cache adressé par contenu des métadonnées extraites par le LLM"""
+
+    def __init__(self, db_path: Path, max_entries: int, max_age_days: float,
+                 enabled: bool = True, refresh: bool = False):
+        """
+        Ouvre (ou crée) le cache
+
+        Args:
+            db_path: Fichier SQLite du cache
+            max_entries: Nombre maximum d'entrées conservées
+            max_age_days: Âge maximum d'une entrée (en jours)
+            enabled: False pour désactiver complètement le cache (--no-cache)
+            refresh: True pour ignorer les entrées existantes et les réécrire (--refresh)
+        """
+        self.max_age = max_age_days * 86400
+        super().__init__(db_path, max_entries, enabled, refresh)
+
+    def _create_schema(self):
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)"
+        )
+
+    @staticmethod
+    def make_key(prompt: str, model: str, prompt_version: str) -> str:
+        """
+        Calcule la clé de cache d'un appel LLM
+
+        Args:
+            prompt: Texte complet du prompt
+            model: Nom du modèle Ollama
+            prompt_version: Version du gabarit de prompt
+
+        Returns:
+            Empreinte SHA-256 hexadécimale
+        """
+        payload = '\x00'.join([model, str(prompt_version), prompt])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retourne la valeur en cache, ou None si absente, expirée ou en mode refresh"""
+        if not self.enabled or self.refresh:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            now = time.time()
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict, model: str, prompt_version: str):
+        """Enregistre une valeur dans le cache"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, model, prompt_version, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, str(prompt_version),
+                 json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._conn.commit()
+
+        self._count_write()
+
+    def evict(self):
+        """Supprime les entrées trop anciennes puis les moins récemment utilisées"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?",
+                (time.time() - self.max_age,)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    "SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+
+class HttpCache(_SQLiteCache):
+    """Cache persistant des réponses HTTP des APIs bibliographiques"""
+
+    # Paramètres sans effet sur la réponse, exclus de la clé
+    IGNORED_PARAMS = {'mailto'}
+
+    def _create_schema(self):
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                expires_at REAL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_http_cache_stored ON http_cache(stored_at)"
+        )
+
+    @classmethod
+    def make_key(cls, url: str, params: Optional[Dict] = None) -> str:
+        """
+        Calcule la clé de cache d'une requête GET
+
+        Les paramètres sont normalisés (ordre, espaces, casse des noms)
+        pour que deux requêtes équivalentes partagent la même entrée.
+
+        Args:
+            url: URL sans paramètres
+            params: Paramètres de la requête
+
+        Returns:
+            Empreinte SHA-256 hexadécimale
+        """
+        normalized = sorted(
+            (str(k).lower(), ' '.join(str(v).split()))
+            for k, v in (params or {}).items()
+            if v is not None and str(k).lower() not in cls.IGNORED_PARAMS
+        )
+        payload = url.rstrip('/') + '?' + urlencode(normalized)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Retourne l'entrée en cache (corps, validateurs, fraîcheur)
+
+        Returns:
+            Dictionnaire {body, etag, last_modified, fresh} ou None.
+            En mode refresh, l'entrée n'est jamais fraîche mais ses
+            validateurs restent utilisables pour une revalidation.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM http_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        body, etag, last_modified, expires_at = row
+        fresh = not self.refresh and (expires_at is None or expires_at > time.time())
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        return {
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': fresh
+        }
+
+    def set(self, key: str, url: str, body: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, ttl: Optional[float] = None):
+        """
+        Enregistre une réponse
+
+        Args:
+            key: Clé calculée par make_key
+            url: URL interrogée (informatif)
+            body: Corps de la réponse
+            etag, last_modified: Validateurs HTTP renvoyés par le serveur
+            ttl: Durée de fraîcheur en secondes (None ou inf = n'expire jamais)
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        expires_at = self._expiry(now, ttl)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache "
+                "(key, url, body, etag, last_modified, stored_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body, etag, last_modified, now, expires_at)
+            )
+            self._conn.commit()
+
+        self._count_write()
+
+    @staticmethod
+    def _expiry(now: float, ttl: Optional[float]) -> Optional[float]:
+        """Date d'expiration d'une entrée (None = n'expire jamais)"""
+        if ttl is None or ttl == float('inf'):
+            return None
+        return now + ttl
+
+    def touch(self, key: str, ttl: Optional[float] = None):
+        """Prolonge une entrée revalidée par le serveur (réponse 304)"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        expires_at = self._expiry(now, ttl)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE http_cache SET stored_at = ?, expires_at = ? WHERE key = ?",
+                (now, expires_at, key)
+            )
+            self._conn.commit()
+
+    def evict(self):
+        """Supprime les entrées les plus anciennes au-delà de max_entries"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM http_cache WHERE key IN ("
+                    "SELECT key FROM http_cache ORDER BY stored_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
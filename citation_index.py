@@ -0,0 +1,352 @@
+"""
+Index des citations du vault
+Base SQLite alimentée à chaque exécution : occurrences (note, ligne, citation),
+œuvres résolues (DOI, titre, auteurs, année) et lien entre les deux, pour
+répondre sans relancer l'enrichissement à « où est-ce que je cite Habermas 1992,
+et avec quel DOI ? »
+
+Interrogation :
+    python agent.py query --author Habermas --year 1992
+    python citation_index.py results/citation_index.db --doi 10.7551/mitpress/2253.001.0001
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ranking import author_surname, normalize_doi
+
+# Année ou intervalle d'années ("1992", "1990-1995")
+YEAR_RANGE_PATTERN = re.compile(r'^\s*(\d{4})\s*(?:-\s*(\d{4}))?\s*$')
+
+
+def parse_year(year) -> Optional[int]:
+    """Année sur 4 chiffres, None si inconnue"""
+    match = re.match(r'\d{4}', str(year or ''))
+    return int(match.group()) if match else None
+
+
+class CitationIndex:
+    """Index persistant des citations du vault"""
+
+    # Occurrences écrites entre deux commits
+    COMMIT_EVERY = 500
+
+    def __init__(self, db_path: Path):
+        """
+        Ouvre (ou crée) l'index
+
+        Args:
+            db_path: Fichier SQLite de l'index
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._create_schema()
+        self._conn.commit()
+        # Notes déjà vidées pendant l'exécution en cours (voir add)
+        self._files_seen = set()
+        self._pending = 0
+
+    def _create_schema(self):
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS works (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                doi TEXT,
+                title TEXT,
+                authors TEXT,
+                first_author TEXT,
+                year INTEGER,
+                source TEXT,
+                url TEXT
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS occurrences (
+                id INTEGER PRIMARY KEY,
+                file TEXT NOT NULL,
+                line INTEGER NOT NULL,
+                raw_text TEXT NOT NULL,
+                comment TEXT,
+                full_reference TEXT,
+                author TEXT,
+                title TEXT,
+                year INTEGER,
+                author_key TEXT,
+                year_key INTEGER,
+                work_id INTEGER REFERENCES works(id),
+                confidence REAL,
+                indexed_at REAL NOT NULL,
+                UNIQUE(file, line)
+            )
+        """)
+        for statement in (
+            "CREATE INDEX IF NOT EXISTS idx_works_doi ON works(doi)",
+            "CREATE INDEX IF NOT EXISTS idx_works_author_year ON works(first_author, year)",
+            "CREATE INDEX IF NOT EXISTS idx_occurrences_author_year ON occurrences(author_key, year_key)",
+            "CREATE INDEX IF NOT EXISTS idx_occurrences_year ON occurrences(year_key)",
+            "CREATE INDEX IF NOT EXISTS idx_occurrences_work ON occurrences(work_id)",
+        ):
+            self._conn.execute(statement)
+
+    def start_run(self):
+        """Début d'une exécution : chaque note rencontrée sera ré-indexée entièrement"""
+        self._files_seen = set()
+
+    def replace_file(self, file: str):
+        """
+        Retire les anciennes occurrences d'une note relue
+
+        À appeler pour chaque note scannée, avant d'indexer ses références et
+        même si elle n'en a plus aucune : une note dont tous les tags ont été
+        retirés sort ainsi de l'index (ses œuvres orphelines partent au
+        prochain commit).
+
+        Args:
+            file: Note, relative au vault
+        """
+        with self._lock:
+            self._files_seen.add(file)
+            self._conn.execute("DELETE FROM occurrences WHERE file = ?", (file,))
+
+    def add(self, result: Dict):
+        """
+        Indexe une référence enrichie
+
+        À la première référence d'une note pendant l'exécution, les anciennes
+        occurrences de cette note sont supprimées (comme replace_file) : les
+        rapports contiennent toujours toutes les références d'une note traitée.
+
+        Args:
+            result: Référence enrichie (voir BiblioEnricher.iter_enriched)
+        """
+        meta = result.get('extracted_metadata') or {}
+        api = result.get('api_result')
+
+        with self._lock:
+            if result['file'] not in self._files_seen:
+                self._files_seen.add(result['file'])
+                self._conn.execute("DELETE FROM occurrences WHERE file = ?", (result['file'],))
+
+            work_id = self._upsert_work(api) if api else None
+            # Clés de recherche : celles de l'œuvre résolue, sinon celles extraites
+            first_author = api['authors'][0] if api and api.get('authors') else meta.get('author')
+            year = parse_year(api.get('year')) if api and api.get('year') else parse_year(meta.get('year'))
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO occurrences "
+                "(file, line, raw_text, comment, full_reference, author, title, year, "
+                " author_key, year_key, work_id, confidence, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (result['file'], result['line'], result['raw_text'], result.get('comment'),
+                 result.get('full_reference'), meta.get('author'), meta.get('title'),
+                 parse_year(meta.get('year')), author_surname(first_author) or None, year,
+                 work_id, api['confidence'] if api else None, time.time())
+            )
+
+            self._pending += 1
+            if self._pending >= self.COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+
+    def _upsert_work(self, api: Dict) -> int:
+        """Crée ou met à jour l'œuvre résolue ; retourne son identifiant"""
+        doi = normalize_doi(api.get('doi')) or None
+        key = doi or api.get('url') or f"{api.get('title')}|{api.get('year')}"
+        authors = api.get('authors') or []
+        self._conn.execute(
+            "INSERT INTO works (key, doi, title, authors, first_author, year, source, url) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET title = excluded.title, authors = excluded.authors, "
+            "first_author = excluded.first_author, year = excluded.year, "
+            "source = excluded.source, url = excluded.url",
+            (key, doi, api.get('title'), json.dumps(authors, ensure_ascii=False),
+             author_surname(authors[0]) if authors else None, parse_year(api.get('year')),
+             api.get('source'), api.get('url'))
+        )
+        return self._conn.execute("SELECT id FROM works WHERE key = ?", (key,)).fetchone()[0]
+
+    def prune(self, vault_path: Path):
+        """Retire les occurrences des notes qui n'existent plus dans le vault, et leurs œuvres"""
+        with self._lock:
+            indexed = [row[0] for row in self._conn.execute("SELECT DISTINCT file FROM occurrences")]
+            self._conn.executemany("DELETE FROM occurrences WHERE file = ?",
+                                   [(f,) for f in indexed if not (vault_path / f).exists()])
+            self._drop_orphan_works()
+            self._conn.commit()
+
+    def commit(self):
+        """Écrit les occurrences en attente et retire les œuvres plus citées"""
+        with self._lock:
+            self._drop_orphan_works()
+            self._conn.commit()
+            self._pending = 0
+
+    def _drop_orphan_works(self):
+        self._conn.execute(
+            "DELETE FROM works WHERE id NOT IN "
+            "(SELECT work_id FROM occurrences WHERE work_id IS NOT NULL)"
+        )
+
+    def query(self, author: Optional[str] = None, year: Optional[str] = None,
+              doi: Optional[str] = None, title: Optional[str] = None,
+              file: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Occurrences correspondant à tous les critères donnés
+
+        Args:
+            author: Nom de l'auteur (premier auteur de l'œuvre, ou auteur extrait)
+            year: Année ou intervalle ("1992", "1990-1995")
+            doi: DOI de l'œuvre résolue
+            title: Fragment du titre (œuvre ou métadonnées extraites)
+            file: Motif de note (glob, ex: "Chapitre 1/*")
+            limit: Nombre maximum de résultats
+
+        Returns:
+            Occurrences triées par note et ligne, avec l'œuvre liée (ou None)
+
+        Raises:
+            ValueError: Si l'année n'est pas au format attendu
+        """
+        where, params = [], []
+        if author:
+            where.append("o.author_key = ?")
+            params.append(author_surname(author))
+        if year:
+            start, end = self._year_bounds(year)
+            where.append("o.year_key BETWEEN ? AND ?")
+            params.extend([start, end])
+        if doi:
+            where.append("w.doi = ?")
+            params.append(normalize_doi(doi))
+        if title:
+            where.append("(w.title LIKE ? OR o.title LIKE ?)")
+            params.extend([f"%{title}%"] * 2)
+        if file:
+            where.append("o.file GLOB ?")
+            params.append(file)
+
+        sql = ("SELECT o.file, o.line, o.raw_text, o.comment, o.author, o.title, o.year, o.confidence, "
+               "w.doi, w.title, w.authors, w.year, w.source, w.url "
+               "FROM occurrences o LEFT JOIN works w ON w.id = o.work_id")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY o.file, o.line"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [
+            {
+                'file': r[0], 'line': r[1], 'raw_text': r[2], 'comment': r[3],
+                'extracted': {'author': r[4], 'title': r[5], 'year': r[6]},
+                'confidence': r[7],
+                'work': None if r[8] is None and r[9] is None else {
+                    'doi': r[8], 'title': r[9], 'authors': json.loads(r[10] or '[]'),
+                    'year': r[11], 'source': r[12], 'url': r[13]
+                },
+            }
+            for r in rows
+        ]
+
+    @staticmethod
+    def _year_bounds(year: str) -> Tuple[int, int]:
+        match = YEAR_RANGE_PATTERN.match(str(year))
+        if not match:
+            raise ValueError(f"Année invalide: {year} (attendu: 1992 ou 1990-1995)")
+        start = int(match.group(1))
+        return start, int(match.group(2) or start)
+
+    def stats(self) -> Dict[str, int]:
+        """Nombre de notes, d'occurrences, d'occurrences résolues et d'œuvres"""
+        with self._lock:
+            files, occurrences, resolved = self._conn.execute(
+                "SELECT COUNT(DISTINCT file), COUNT(*), COUNT(work_id) FROM occurrences"
+            ).fetchone()
+            works = self._conn.execute("SELECT COUNT(*) FROM works").fetchone()[0]
+        return {'files': files, 'occurrences': occurrences, 'resolved': resolved, 'works': works}
+
+    def close(self):
+        if self._files_seen:
+            self.commit()
+        self._conn.close()
+
+
+def format_occurrence(occurrence: Dict) -> str:
+    """Ligne de résultat : note:ligne, citation, œuvre résolue"""
+    text = f"{occurrence['file']}:{occurrence['line']}  {occurrence['raw_text']}"
+    work = occurrence['work']
+    if work is None:
+        return f"{text}\n    ⚠️  non résolue"
+    authors = ', '.join(a for a in work['authors'][:2] if a)
+    return f"{text}\n    → {work['doi'] or work['url']}  {authors} ({work['year']}) {work['title']}"
+
+
+def main(argv: Optional[List[str]] = None, db_path: Optional[Path] = None):
+    """
+    Interroge l'index des citations
+
+    Args:
+        argv: Arguments de la ligne de commande (par défaut sys.argv[1:])
+        db_path: Index à interroger ; si None, il est lu en premier argument
+    """
+    parser = argparse.ArgumentParser(description="Cherche dans l'index des citations du vault")
+    if db_path is None:
+        parser.add_argument('db', type=Path, help="Fichier SQLite de l'index (CITATION_INDEX_FILE)")
+    parser.add_argument('--author', help="Auteur (nom de famille)")
+    parser.add_argument('--year', help="Année ou intervalle (1992, 1990-1995)")
+    parser.add_argument('--doi', help="DOI de l'œuvre")
+    parser.add_argument('--title', help="Fragment du titre")
+    parser.add_argument('--file', help="Motif de note (glob)")
+    parser.add_argument('--limit', type=int, help="Nombre maximum de résultats")
+    parser.add_argument('--json', action='store_true', help="Sortie JSON")
+    parser.add_argument('--stats', action='store_true', help="Affiche seulement le contenu de l'index")
+    args = parser.parse_args(argv)
+
+    db_path = db_path or args.db
+    if not db_path.exists():
+        print(f"❌ Index des citations introuvable: {db_path}")
+        print("   Il est créé par agent.py (CITATION_INDEX_FILE dans config.py)")
+        sys.exit(1)
+
+    index = CitationIndex(db_path)
+    try:
+        if args.stats:
+            stats = index.stats()
+            print(json.dumps(stats) if args.json else
+                  f"📇 {stats['occurrences']} occurrence(s) dans {stats['files']} note(s), "
+                  f"{stats['resolved']} résolue(s), {stats['works']} œuvre(s)")
+            return
+
+        start = time.perf_counter()
+        try:
+            results = index.query(args.author, args.year, args.doi, args.title, args.file, args.limit)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    finally:
+        index.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    for occurrence in results:
+        print(format_occurrence(occurrence))
+    works = {(o['work']['doi'] or o['work']['url']) for o in results if o['work']}
+    print(f"\n{len(results)} occurrence(s), {len(works)} œuvre(s) ({elapsed_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
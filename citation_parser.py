@@ -0,0 +1,131 @@
+"""
+Parseur déterministe de références bibliographiques (APA, Chicago)
+Voie rapide : extrait auteur, titre et année sans appel au LLM
+"""
+
+import re
+from typing import Dict, Optional
+
+YEAR = r'(?P<year>(?:1[5-9]|20)\d{2})[a-z]?'
+
+# APA : Habermas, J. (1992). The structural transformation of the public sphere. MIT Press.
+APA_PATTERN = re.compile(
+    r'^(?P<authors>[^()]+?)\s*\(' + YEAR + r'\)\.\s+(?P<title>.+?[.?!])(?:\s|$)'
+)
+
+# Chicago auteur-date : Habermas, Jürgen. 1992. The Structural Transformation... Cambridge: MIT Press.
+CHICAGO_DATE_PATTERN = re.compile(
+    r'^(?P<authors>[^()]+?(?:\s*\([^)]*\))?)\.\s+' + YEAR + r'\.\s+(?P<title>.+?[.?!])(?:\s|$)'
+)
+
+# Chicago notes-bibliographie : Habermas, Jürgen. The Structural Transformation... Cambridge: MIT Press, 1992.
+CHICAGO_NOTES_PATTERN = re.compile(
+    r'^(?P<authors>[^.()]+?)\.\s+(?P<title>[^.]+?[.?!])\s+.*?\b' + YEAR + r'\.?\s*$'
+)
+
+# Titre d'article entre guillemets
+QUOTED_TITLE_PATTERN = re.compile(r'^[“"«]\s*(?P<title>.+?)\s*[”"»]')
+
+AUTHOR_SEPARATOR_PATTERN = re.compile(r'\s*(?:;|&|\band\b|\bet\b|\bund\b)\s*')
+INITIALS_PATTERN = re.compile(r'^(?:[A-ZÀ-Ý]\.\s*-?)+$')
+NAME_PATTERN = re.compile(r"^[A-ZÀ-Ý][\w'’\-]+(?:\s+[\w'’\-.]+){0,3}$")
+# Mentions d'éditeur : "Dupont, Jean (dir.)", "Smith, J., ed."
+EDITOR_PATTERN = re.compile(r'\s*[,(]?\s*\b(?:eds?|dir|hrsg|coord)\b\.?\)?', re.I)
+# Caractères typiques du bruit OCR
+OCR_NOISE_PATTERN = re.compile(r'[|{}\[\]<>@#~^]')
+
+# Confiance de base selon le format reconnu
+PATTERNS = [
+    ('apa', APA_PATTERN, 0.95),
+    ('chicago-date', CHICAGO_DATE_PATTERN, 0.95),
+    ('chicago-notes', CHICAGO_NOTES_PATTERN, 0.8),
+]
+
+
+def parse_reference(text: str) -> Optional[Dict]:
+    """
+    Tente d'extraire auteur, titre et année d'une référence bien formée
+
+    Args:
+        text: Référence complète (ex: entrée de la bibliographie)
+
+    Returns:
+        Métadonnées au même format que le LLM (author, title, year, confidence)
+        plus 'format', ou None si aucun format n'est reconnu
+    """
+    text = ' '.join(text.split()).lstrip('-*• ')
+    if not text:
+        return None
+
+    for name, pattern, base_confidence in PATTERNS:
+        match = pattern.match(text)
+        if not match:
+            continue
+
+        author = _first_author(match.group('authors'))
+        title = _clean_title(match.group('title'))
+        if not author or not title:
+            continue
+
+        confidence = base_confidence - _penalty(author, title)
+        return {
+            'author': author,
+            'title': title,
+            'year': match.group('year'),
+            'confidence': round(max(confidence, 0.0), 2),
+            'format': name
+        }
+
+    return None
+
+
+def _first_author(authors: str) -> Optional[str]:
+    """Premier auteur au format 'Nom, Prénom'"""
+    authors = authors.strip().rstrip(',.')
+    authors = EDITOR_PATTERN.sub('', authors)
+
+    parts = [p.strip() for p in authors.split(',')]
+    if len(parts) >= 2 and parts[0] and (' ' not in parts[0] or NAME_PATTERN.match(parts[0])):
+        surname = parts[0]
+        given = AUTHOR_SEPARATOR_PATTERN.split(parts[1])[0].strip().rstrip('.')
+        if not NAME_PATTERN.match(surname):
+            return None
+        return f"{surname}, {given}" if given else surname
+
+    # "Jürgen Habermas and ..." : prénom nom
+    first = AUTHOR_SEPARATOR_PATTERN.split(authors)[0].strip()
+    if not NAME_PATTERN.match(first):
+        return None
+    words = first.split()
+    if len(words) == 1:
+        return words[0]
+    return f"{words[-1]}, {' '.join(words[:-1])}"
+
+
+def _clean_title(title: str) -> Optional[str]:
+    """Nettoie le titre (guillemets, ponctuation finale)"""
+    title = title.strip()
+    quoted = QUOTED_TITLE_PATTERN.match(title)
+    if quoted:
+        title = quoted.group('title')
+    title = title.strip(' .,"“”«»')
+    return title or None
+
+
+def _penalty(author: str, title: str) -> float:
+    """Réduit la confiance pour les résultats suspects (titre court, bruit OCR)"""
+    penalty = 0.0
+
+    if len(title.split()) < 2:
+        penalty += 0.25
+    if INITIALS_PATTERN.match(author.split(',')[0]):
+        penalty += 0.3
+
+    # Bruit OCR : proportion élevée de caractères non alphabétiques
+    letters = sum(c.isalpha() for c in title)
+    if letters / max(len(title), 1) < 0.7:
+        penalty += 0.3
+    if OCR_NOISE_PATTERN.search(title + author):
+        penalty += 0.2
+
+    return penalty
@@ -17,6 +17,25 @@ OLLAMA_URL = "http://localhost:11434"
 # Modèle LLM à utiliser (assurez-vous de l'avoir téléchargé avec 'ollama pull')
 OLLAMA_MODEL = "llama3.1:8b"
 
+# Durée de maintien du modèle en mémoire après chaque appel ("30m", "2h", -1 = toujours) :
+# le modèle est préchargé au démarrage et n'est pas déchargé entre deux références
+OLLAMA_KEEP_ALIVE = "30m"
+
+# Requêtes simultanées envoyées à Ollama : à aligner sur la variable
+# d'environnement OLLAMA_NUM_PARALLEL du serveur (au-delà, elles attendent en file)
+OLLAMA_NUM_PARALLEL = 1
+
+# Taille du contexte (tokens) ; None pour la valeur par défaut du modèle.
+# Doit couvrir LLM_BATCH_TOKEN_BUDGET plus la réponse
+OLLAMA_NUM_CTX = 4096
+
+# Format de réponse : "schema" (sortie structurée, Ollama >= 0.5),
+# "json" (JSON libre) ou None (texte)
+OLLAMA_FORMAT = "schema"
+
+# Timeout d'un appel à Ollama (secondes, None pour aucun)
+OLLAMA_TIMEOUT = 120
+
 # ===== APIS EXTERNES =====
 # OpenAlex : API gratuite, pas de clé nécessaire par défaut
 # Mais vous pouvez vous inscrire pour des quotas plus élevés
@@ -28,6 +47,31 @@ OPENALEX_EMAIL = None  # Optionnel : votre email pour être poli avec l'API
 CROSSREF_EMAIL = None  # Optionnel
 # Exemple : CROSSREF_EMAIL = "votre.email@exemple.com"
 
+# URLs de base des APIs (modifiables pour pointer vers un serveur de test local)
+OPENALEX_URL = "https://api.openalex.org"
+CROSSREF_URL = "https://api.crossref.org"
+
+# Session HTTP : connexions persistantes par hôte et timeout (secondes)
+HTTP_POOL_SIZE = 10
+HTTP_TIMEOUT = 10
+
+# Débit maximum par API (token bucket) : requêtes/seconde et rafale maximum
+# Les limites annoncées par les APIs (X-Rate-Limit-*) ne peuvent que les réduire
+API_RATE_LIMITS = {
+    "openalex": {"rate": 10, "burst": 10},
+    "crossref": {"rate": 5, "burst": 5},
+}
+
+# Reprises sur 429 / 5xx / erreurs réseau : backoff exponentiel avec jitter (secondes)
+# Retry-After est toujours respecté
+API_MAX_RETRIES = 4
+API_BACKOFF_BASE = 0.5
+API_BACKOFF_MAX = 30
+
+# Disjoncteur : après N échecs consécutifs, l'API n'est plus appelée pendant X secondes
+CIRCUIT_BREAKER_THRESHOLD = 5
+CIRCUIT_BREAKER_COOLDOWN = 60
+
 # ===== PARAMETRES DE RECHERCHE =====
 # Nombre de lignes de contexte autour d'une référence
 CONTEXT_LINES = 3
@@ -35,9 +79,122 @@ CONTEXT_LINES = 3
 # Score de confiance minimum pour afficher un résultat (0.0 à 1.0)
 MIN_CONFIDENCE_SCORE = 0.5
 
+# Classement des candidats OpenAlex + CrossRef : poids de chaque critère (somme = 1)
+RANKING_WEIGHTS = {
+    'title': 0.55,   # Similarité du titre
+    'author': 0.2,   # Premier auteur (ou co-auteur)
+    'year': 0.15,    # Année exacte (ou à un an près)
+    'doi': 0.1,      # DOI connu ou renvoyé par les deux sources
+}
+
+# Voie rapide : les références bien formées (APA, Chicago) sont parsées sans LLM
+# si la confiance du parseur atteint ce seuil (mettre 1.1 pour toujours utiliser le LLM)
+PARSER_MIN_CONFIDENCE = 0.85
+
+# Recherches structurées : filtres titre / auteur / intervalle d'années
+# (OpenAlex title.search, CrossRef query.bibliographic), recherche libre en repli.
+# False pour revenir à la seule recherche plein texte
+API_STRUCTURED_QUERIES = True
+# Écart toléré entre l'année extraite et l'année de publication (rééditions)
+API_YEAR_TOLERANCE = 1
+
+# Index DOI local (hors ligne), construit avec :
+#   python doi_index.py <dumps OpenAlex/CrossRef .jsonl[.gz]> -o doi_index.db
+# Chemin relatif au dossier de sortie, ou absolu ; None pour désactiver
+OFFLINE_INDEX_FILE = None
+# Un résultat local au moins aussi fiable évite les appels API
+# (avec --offline, le résultat local est toujours utilisé)
+OFFLINE_INDEX_MIN_CONFIDENCE = 0.8
+
+# Résolution des identifiants déjà connus (DOI, ISBN, OpenAlex) : jusqu'à N
+# identifiants par requête (filtres OU ; 50 au plus pour OpenAlex)
+BULK_LOOKUP_SIZE = 50
+
+# ===== CONCURRENCE =====
+# Les références traversent un pipeline bibliographie → LLM → APIs ;
+# chaque étape a ses propres workers
+# Workers LLM : les lots d'un worker partent déjà en parallèle (OLLAMA_NUM_PARALLEL)
+LLM_WORKERS = 1
+# Workers HTTP (OpenAlex/CrossRef)
+HTTP_WORKERS = 4
+# Taille maximale des files d'attente entre deux étapes
+PIPELINE_QUEUE_SIZE = 32
+
+# Extraction LLM groupée : jusqu'à N références par prompt (1 = une par appel),
+# dans la limite d'un budget de tokens par prompt (à garder sous num_ctx du modèle)
+LLM_BATCH_SIZE = 8
+LLM_BATCH_TOKEN_BUDGET = 2048
+
+# Mode asynchrone (--async-api) : requêtes simultanées maximum par hôte
+# (respecter les limites du "polite pool" de chaque API)
+ASYNC_HOST_LIMITS = {
+    "api.openalex.org": 10,
+    "api.crossref.org": 5,
+}
+ASYNC_DEFAULT_HOST_LIMIT = 5
+
 # ===== SORTIE =====
 # Dossier pour sauvegarder les résultats
 OUTPUT_DIR = "results"
 
 # Format de sortie : 'json', 'markdown', ou 'both'
 OUTPUT_FORMAT = "both"
+
+# Rapport JSON : "array" (tableau JSON, .json) ou "lines" (JSON Lines, .jsonl)
+# Dans les deux cas les références sont écrites au fil de l'enrichissement
+JSON_OUTPUT = "array"
+
+# Contexte des références dans le rapport JSON : "inline" (texte copié) ou
+# "reference" (fichier + plage de lignes de la note, sans le texte : rapports plus légers)
+CONTEXT_STORAGE = "inline"
+
+# Métriques exportées avec les résultats (latence par étape, caches, reprises, erreurs) :
+# 'json', 'prometheus' (format texte), 'trace' (Chrome Trace Event, à ouvrir dans
+# Perfetto ou chrome://tracing) ; liste vide pour désactiver
+METRICS_FORMATS = ['json']
+
+# Index des citations du vault (SQLite dans OUTPUT_DIR), mis à jour à chaque
+# exécution et interrogé avec : python agent.py query --author Habermas --year 1992
+# None pour désactiver
+CITATION_INDEX_FILE = "citation_index.db"
+
+# Journal de reprise (--resume) : <nom du fichier><suffixe> dans OUTPUT_DIR,
+# supprimé une fois les rapports écrits
+JOURNAL_SUFFIX = ".journal.jsonl"
+# Forcer l'écriture sur disque après chaque référence (une seule référence perdue en cas de crash)
+JOURNAL_FSYNC = True
+
+# Mode --vault : manifeste des notes déjà traitées (dans OUTPUT_DIR)
+VAULT_MANIFEST_FILE = "vault_manifest.json"
+
+# Mode --watch : enregistrements regroupés s'ils sont séparés de moins de
+# WATCH_DEBOUNCE secondes (sauvegarde automatique d'Obsidian) ; sans
+# inotify_simple, le vault est scruté toutes les WATCH_POLL_INTERVAL secondes.
+# Avec OLLAMA_KEEP_ALIVE = -1, le modèle reste chargé toute la session
+WATCH_DEBOUNCE = 2.0
+WATCH_POLL_INTERVAL = 1.0
+
+# Mode --serve : démon HTTP/JSON local (POST /scan, POST /enrich, GET /metrics).
+# L'API n'est pas authentifiée : garder une adresse locale
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+# Passages du pipeline simultanés (chacun lance ses threads LLM et HTTP) ;
+# les requêtes suivantes attendent leur tour
+SERVER_WORKERS = 2
+
+# ===== CACHE =====
+# Cache persistant des extractions LLM (fichier SQLite dans OUTPUT_DIR)
+# Désactivable ponctuellement avec --no-cache, recalculable avec --refresh
+LLM_CACHE_ENABLED = True
+LLM_CACHE_FILE = "llm_cache.sqlite"
+
+# Éviction : nombre maximum d'entrées et âge maximum (en jours)
+LLM_CACHE_MAX_ENTRIES = 50000
+LLM_CACHE_MAX_AGE_DAYS = 180
+
+# Cache persistant des réponses OpenAlex/CrossRef (fichier SQLite dans OUTPUT_DIR)
+# Une réponse périmée est revalidée auprès de l'API (ETag / Last-Modified)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_FILE = "http_cache.sqlite"
+HTTP_CACHE_TTL_HOURS = 24 * 7
+HTTP_CACHE_MAX_ENTRIES = 100000
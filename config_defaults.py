@@ -0,0 +1,44 @@
+"""
+Valeurs par défaut des réglages de config.py
+Un config.py copié d'une ancienne version de config.example.py reste
+utilisable : les réglages ajoutés depuis prennent la valeur de
+config.example.py, seule source des valeurs par défaut
+"""
+
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+from typing import Dict
+
+EXAMPLE_FILE = Path(__file__).resolve().parent / 'config.example.py'
+
+# Réglages propres à chaque installation (premier config.example.py) : à renseigner,
+# jamais complétés automatiquement
+REQUIRED = {
+    'VAULT_PATH', 'BIBLIO_FILE', 'OLLAMA_URL', 'OLLAMA_MODEL', 'OPENALEX_EMAIL',
+    'CROSSREF_EMAIL', 'CONTEXT_LINES', 'MIN_CONFIDENCE_SCORE', 'OUTPUT_DIR', 'OUTPUT_FORMAT',
+}
+
+
+def load_defaults(path: Path = EXAMPLE_FILE) -> Dict[str, object]:
+    """
+    Lit les réglages de config.example.py
+
+    Args:
+        path: Modèle de configuration
+
+    Returns:
+        Réglages (noms en majuscules) hors réglages à renseigner (REQUIRED)
+    """
+    spec = importlib.util.spec_from_file_location('config_example', path)
+    example = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(example)
+    return {name: value for name, value in vars(example).items()
+            if name.isupper() and name not in REQUIRED}
+
+
+def apply(config: ModuleType):
+    """Ajoute au module config les réglages absents (valeurs de config.example.py)"""
+    for name, value in load_defaults().items():
+        if not hasattr(config, name):
+            setattr(config, name, value)
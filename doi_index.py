@@ -0,0 +1,263 @@
+"""
+Index DOI local (hors ligne)
+Construit une base SQLite FTS5 compacte à partir d'un extrait de snapshot
+OpenAlex ou de dump CrossRef (JSONL, éventuellement gzip), puis résout
+les références sans appel réseau
+
+Construction :
+    python doi_index.py works_part_000.gz crossref_slice.jsonl -o doi_index.db
+"""
+
+import argparse
+import gzip
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bibliography import normalize_key
+from ranking import author_surname, normalize_doi
+
+# Lignes insérées par transaction lors de la construction
+BUILD_BATCH_SIZE = 5000
+
+# Mots trop fréquents pour discriminer une recherche de titre
+TITLE_STOPWORDS = {
+    'the', 'and', 'for', 'with', 'from', 'des', 'les', 'une', 'dans', 'pour',
+    'sur', 'par', 'der', 'die', 'das', 'und', 'von',
+}
+# Nombre maximum de mots du titre envoyés à FTS5 (les plus longs, donc les plus rares)
+MAX_QUERY_TOKENS = 6
+
+
+def open_dump(path: Path):
+    """Ouvre un fichier de dump en texte (gzip détecté par l'extension)"""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def parse_record(record: Dict) -> Optional[Tuple[str, str, List[str], Optional[int], str]]:
+    """
+    Extrait DOI, titre, auteurs, année et source d'une notice OpenAlex ou CrossRef
+
+    Returns:
+        (doi, titre, auteurs, année, source), ou None si la notice n'a ni DOI ni titre
+    """
+    if 'DOI' in record:
+        # CrossRef
+        doi = record.get('DOI')
+        title = ' '.join(record.get('title') or [])
+        authors = [f"{a.get('family', '')}, {a.get('given', '')}".strip(', ')
+                   for a in record.get('author', [])]
+        date = (record.get('published-print') or record.get('issued') or {}).get('date-parts')
+        year = date[0][0] if date and date[0] else None
+        source = 'CrossRef'
+    else:
+        # OpenAlex
+        doi = record.get('doi')
+        title = record.get('title') or record.get('display_name') or ''
+        authors = [a.get('author', {}).get('display_name') or ''
+                   for a in record.get('authorships', [])]
+        year = record.get('publication_year')
+        source = 'OpenAlex'
+
+    doi = normalize_doi(doi)
+    if not doi or not title:
+        return None
+    return doi, title, authors, year, source
+
+
+def iter_records(paths: Iterable[Path]) -> Iterator[Tuple[str, str, List[str], Optional[int], str]]:
+    """Notices valides de tous les dumps (lignes illisibles ignorées)"""
+    for path in paths:
+        with open_dump(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                parsed = parse_record(record)
+                if parsed:
+                    yield parsed
+
+
+def build_index(paths: List[Path], db_path: Path) -> int:
+    """
+    Construit (ou complète) l'index à partir de dumps JSONL
+
+    Args:
+        paths: Fichiers de dump OpenAlex (works) ou CrossRef (items), .jsonl ou .gz
+        db_path: Fichier SQLite de l'index
+
+    Returns:
+        Nombre de notices dans l'index
+    """
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript("""
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+        CREATE TABLE IF NOT EXISTS works (
+            id INTEGER PRIMARY KEY,
+            doi TEXT NOT NULL UNIQUE,
+            title TEXT NOT NULL,
+            authors TEXT NOT NULL,
+            first_author TEXT NOT NULL,
+            year INTEGER,
+            source TEXT NOT NULL
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS works_fts USING fts5(
+            title, first_author,
+            content='works', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+    """)
+
+    batch = []
+    for doi, title, authors, year, source in iter_records(paths):
+        surname = author_surname(authors[0]) if authors else ''
+        batch.append((doi, title, json.dumps(authors, ensure_ascii=False), surname, year, source))
+        if len(batch) >= BUILD_BATCH_SIZE:
+            _insert(conn, batch)
+            batch = []
+    if batch:
+        _insert(conn, batch)
+
+    # Index plein texte reconstruit d'un bloc, puis compacté
+    conn.execute("INSERT INTO works_fts(works_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO works_fts(works_fts) VALUES ('optimize')")
+    conn.commit()
+    conn.execute("VACUUM")
+
+    count = conn.execute("SELECT COUNT(*) FROM works").fetchone()[0]
+    conn.close()
+    return count
+
+
+def _insert(conn: sqlite3.Connection, batch: List[Tuple]):
+    """Insère un lot de notices (un DOI déjà présent est conservé)"""
+    conn.executemany(
+        "INSERT OR IGNORE INTO works (doi, title, authors, first_author, year, source) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        batch
+    )
+    conn.commit()
+
+
+class OfflineIndex:
+    """Résolution de références dans l'index local, en lecture seule"""
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: Fichier SQLite construit par build_index
+
+        Raises:
+            FileNotFoundError: Si l'index n'existe pas
+        """
+        if not db_path.exists():
+            raise FileNotFoundError(f"Index DOI local introuvable: {db_path}")
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro",
+                                     uri=True, check_same_thread=False)
+        self.lookups = 0
+
+    def candidates(self, author: str, title: str, year: str, limit: int = 5) -> List[Dict]:
+        """
+        Candidats pour une référence, au format des résultats API
+
+        Recherche plein texte sur les mots les plus discriminants du titre,
+        classement BM25 ; le nom du premier auteur départage les ex aequo.
+
+        Args:
+            author, title, year: Métadonnées extraites
+            limit: Nombre maximum de candidats
+
+        Returns:
+            Liste de candidats (source, doi, title, authors, year, url)
+        """
+        query = self._fts_query(title)
+        if not query:
+            return []
+
+        surname = author_surname(author)
+        with self._lock:
+            self.lookups += 1
+            rows = self._conn.execute(
+                """
+                SELECT w.doi, w.title, w.authors, w.year, w.source
+                FROM works_fts JOIN works w ON w.id = works_fts.rowid
+                WHERE works_fts MATCH ?
+                ORDER BY bm25(works_fts) - (w.first_author = ?) * 5
+                LIMIT ?
+                """,
+                (query, surname, limit)
+            ).fetchall()
+
+        return [self._row_to_candidate(row) for row in rows]
+
+    def lookup_doi(self, doi: str) -> Optional[Dict]:
+        """Notice exacte d'un DOI, ou None s'il n'est pas dans l'index"""
+        with self._lock:
+            self.lookups += 1
+            row = self._conn.execute(
+                "SELECT doi, title, authors, year, source FROM works WHERE doi = ?",
+                (normalize_doi(doi),)
+            ).fetchone()
+        return self._row_to_candidate(row) if row else None
+
+    @staticmethod
+    def _fts_query(title: str) -> str:
+        """Requête FTS5 : mots significatifs du titre, entre guillemets, reliés par OR"""
+        tokens = [t for t in dict.fromkeys(normalize_key(title or '').split())
+                  if len(t) > 2 and t not in TITLE_STOPWORDS]
+        tokens = sorted(tokens, key=len, reverse=True)[:MAX_QUERY_TOKENS]
+        return ' OR '.join(f'title:"{t}"' for t in tokens)
+
+    @staticmethod
+    def _row_to_candidate(row: Tuple) -> Dict:
+        doi, title, authors, year, source = row
+        return {
+            'source': f"Local ({source})",
+            'doi': doi,
+            'title': title,
+            'authors': json.loads(authors),
+            'year': year,
+            'url': f"https://doi.org/{doi}"
+        }
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Construit l'index DOI local à partir de dumps OpenAlex/CrossRef (JSONL)"
+    )
+    parser.add_argument('dumps', nargs='+', type=Path,
+                        help="Fichiers de dump (.jsonl ou .jsonl.gz, une notice par ligne)")
+    parser.add_argument('-o', '--output', type=Path, default=Path('doi_index.db'),
+                        help="Fichier SQLite de l'index (complété s'il existe)")
+    args = parser.parse_args()
+
+    missing = [p for p in args.dumps if not p.exists()]
+    if missing:
+        print(f"❌ Fichier(s) introuvable(s): {', '.join(map(str, missing))}")
+        sys.exit(1)
+
+    print(f"📚 Construction de l'index: {args.output}")
+    count = build_index(args.dumps, args.output)
+    size = args.output.stat().st_size / 1e6
+    print(f"✅ {count} notice(s) indexée(s) ({size:.1f} Mo)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Client HTTP partagé pour les APIs bibliographiques (OpenAlex, CrossRef)
+Session à connexions persistantes + cache de réponses avec revalidation
+"""
+
+import json
+import time
+from typing import Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cache import HttpCache
+from ratelimit import RateLimiter
+
+# Décodeur JSON plus rapide si disponible (pip install orjson), sinon module standard
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(body: Union[str, bytes]):
+    """Décode un corps JSON (orjson si installé)"""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def revalidation_headers(entry: Optional[Dict], headers: Optional[Dict] = None) -> Dict:
+    """
+    Ajoute les en-têtes de revalidation conditionnelle d'une entrée périmée
+
+    Args:
+        entry: Entrée du cache (ou None)
+        headers: En-têtes de la requête
+
+    Returns:
+        Nouveau dictionnaire d'en-têtes
+    """
+    request_headers = dict(headers or {})
+    if entry:
+        if entry['etag']:
+            request_headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            request_headers['If-Modified-Since'] = entry['last_modified']
+    return request_headers
+
+
+class HttpClient:
+    """Session HTTP poolée avec cache persistant des réponses JSON"""
+
+    # TTL des réponses qui ne changent jamais (ex: recherche par identifiant)
+    NEVER_EXPIRES = float('inf')
+
+    def __init__(self, cache: HttpCache, limiter: RateLimiter, pool_size: int = 10,
+                 timeout: float = 10, default_ttl: Optional[float] = None):
+        """
+        Initialise la session
+
+        Args:
+            cache: Cache persistant des réponses
+            limiter: Débit, reprises et disjoncteur par API
+            pool_size: Nombre de connexions gardées ouvertes par hôte
+            timeout: Timeout des requêtes (secondes)
+            default_ttl: Durée de fraîcheur par défaut des réponses (secondes)
+        """
+        self.cache = cache
+        self.limiter = limiter
+        self.timeout = timeout
+        self.default_ttl = default_ttl
+        self.requests_sent = 0
+        self.revalidated = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get_json(self, url: str, params: Optional[Dict] = None,
+                 headers: Optional[Dict] = None, ttl: Optional[float] = None,
+                 api: str = 'default') -> Dict:
+        """
+        GET avec cache : réponse fraîche servie localement, réponse périmée
+        revalidée par ETag / Last-Modified. Les appels réseau respectent le
+        débit de l'API et sont retentés (429, 5xx, erreurs réseau).
+
+        Args:
+            url: URL sans paramètres
+            params: Paramètres de la requête
+            headers: En-têtes supplémentaires
+            ttl: Durée de fraîcheur (secondes, NEVER_EXPIRES = permanent).
+                 Par défaut : default_ttl
+            api: Nom de l'API (clé de config.API_RATE_LIMITS)
+
+        Returns:
+            Corps JSON décodé
+
+        Raises:
+            requests.HTTPError: Si le serveur répond par une erreur (après reprises)
+            CircuitOpenError: Si l'API est coupée par le disjoncteur
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+
+        key = HttpCache.make_key(url, params)
+        entry = self.cache.get(key)
+        if entry and entry['fresh']:
+            return loads(entry['body'])
+
+        request_headers = revalidation_headers(entry, headers)
+        guard = self.limiter.guard(api)
+        attempt = 0
+        while True:
+            time.sleep(guard.before_request())
+            try:
+                response = self.session.get(url, params=params, headers=request_headers,
+                                            timeout=self.timeout)
+                self.requests_sent += 1
+            except (requests.ConnectionError, requests.Timeout):
+                delay = guard.on_error(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = guard.on_response(response.status_code, response.headers, attempt)
+                if delay is None:
+                    break
+            time.sleep(delay)
+            attempt += 1
+
+        if response.status_code == 304 and entry:
+            self.revalidated += 1
+            self.cache.touch(key, ttl)
+            return loads(entry['body'])
+
+        response.raise_for_status()
+
+        body = response.text
+        self.cache.set(key, url, body,
+                       etag=response.headers.get('ETag'),
+                       last_modified=response.headers.get('Last-Modified'),
+                       ttl=ttl)
+        return loads(body)
+
+    def cached_json(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """Réponse fraîche en cache pour cette requête, sans appel réseau (None sinon)"""
+        entry = self.cache.get(HttpCache.make_key(url, params))
+        if entry and entry['fresh']:
+            return loads(entry['body'])
+        return None
+
+    def store_json(self, url: str, params: Optional[Dict], payload: Dict,
+                   ttl: Optional[float] = None):
+        """
+        Enregistre une réponse obtenue par une autre requête, comme si elle venait
+        de `url` (ex: notice extraite d'une requête groupée, sous la clé de la
+        requête individuelle)
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        self.cache.set(HttpCache.make_key(url, params), url, json.dumps(payload), ttl=ttl)
+
+    def close(self):
+        """Ferme la session et le cache"""
+        self.session.close()
+        self.cache.close()
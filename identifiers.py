@@ -0,0 +1,91 @@
+"""
+Détection d'identifiants dans les références (DOI, ISBN, OpenAlex)
+Une référence qui porte déjà un identifiant est résolue par une requête
+exacte, sans LLM ni recherche plein texte
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+# DOI nu ou dans une URL (https://doi.org/10.1000/xyz, doi:10.1000/xyz) ; s'arrête
+# aux marqueurs Markdown (==, **, `) et à une parenthèse fermante suivie d'un
+# caractère étranger au DOI ("(Foo 2001, doi:10.1/abc)==")
+DOI_PATTERN = re.compile(
+    r'\b(10\.\d{4,9}/(?:(?!==|\*\*|\)(?![\w\-.;()/:]))[^\s"<>\]|`])+)', re.I
+)
+# ISBN annoncé (ISBN, ISBN-10, ISBN-13), chiffres séparés par des tirets ou espaces
+ISBN_PATTERN = re.compile(r'\bISBN(?:-1[03])?[:\s]*((?:[0-9][\s-]?){9}[0-9Xx](?:[\s-]?[0-9]){0,3})')
+# Notice OpenAlex (https://openalex.org/W2741809807)
+OPENALEX_PATTERN = re.compile(r'\bopenalex\.org/(?:works/)?(W\d+)\b', re.I)
+
+# Ponctuation finale qui n'appartient pas au DOI
+DOI_TRAILING = '.,;:)\'’”»'
+
+
+def find_doi(text: str) -> Optional[str]:
+    """Premier DOI du texte (minuscules, sans ponctuation finale)"""
+    match = DOI_PATTERN.search(text)
+    if not match:
+        return None
+    doi = match.group(1).rstrip(DOI_TRAILING)
+    # Parenthèse ouvrante dans le DOI lui-même : ne pas couper la fermante
+    if doi.count('(') > doi.count(')') and text[match.start(1) + len(doi):].startswith(')'):
+        doi += ')'
+    return doi.lower()
+
+
+def find_isbn(text: str) -> Optional[str]:
+    """Premier ISBN valide du texte (clé de contrôle vérifiée), sans séparateurs"""
+    for match in ISBN_PATTERN.finditer(text):
+        digits = re.sub(r'[\s-]', '', match.group(1)).upper()
+        # Le motif peut déborder sur les chiffres qui suivent un ISBN-10
+        for candidate in (digits, digits[:13], digits[:10]):
+            if is_valid_isbn(candidate):
+                return candidate
+    return None
+
+
+def is_valid_isbn(isbn: str) -> bool:
+    """Vérifie la clé de contrôle d'un ISBN-10 ou ISBN-13"""
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == 'X'):
+        total = sum((10 - i) * int(c) for i, c in enumerate(isbn[:9]))
+        total += 10 if isbn[9] == 'X' else int(isbn[9])
+        return total % 11 == 0
+    if len(isbn) == 13 and isbn.isdigit() and isbn[:3] in ('978', '979'):
+        total = sum(int(c) * (1 if i % 2 == 0 else 3) for i, c in enumerate(isbn))
+        return total % 10 == 0
+    return False
+
+
+def find_identifiers(texts: Iterable[Optional[str]]) -> List[Dict[str, str]]:
+    """
+    Identifiants trouvés dans les textes, par ordre de priorité
+
+    Les textes sont parcourus dans l'ordre donné (ex: citation, référence
+    complète, contexte) ; pour chacun : DOI, puis OpenAlex, puis ISBN.
+
+    Args:
+        texts: Textes à analyser (None ignorés)
+
+    Returns:
+        Liste de {'type': 'doi' | 'openalex' | 'isbn', 'value': ...}, sans doublon
+    """
+    found = []
+    for text in texts:
+        if not text:
+            continue
+        doi = find_doi(text)
+        if doi:
+            found.append({'type': 'doi', 'value': doi})
+        openalex = OPENALEX_PATTERN.search(text)
+        if openalex:
+            found.append({'type': 'openalex', 'value': openalex.group(1).upper()})
+        isbn = find_isbn(text)
+        if isbn:
+            found.append({'type': 'isbn', 'value': isbn})
+
+    unique = []
+    for identifier in found:
+        if identifier not in unique:
+            unique.append(identifier)
+    return unique
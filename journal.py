@@ -0,0 +1,103 @@
+"""
+Journal de reprise des exécutions longues
+Chaque référence enrichie est ajoutée (JSONL, fsync) dès qu'elle est terminée :
+après une interruption, --resume repart de la dernière référence écrite
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+JOURNAL_VERSION = 1
+
+
+def journal_key(ref: Dict) -> str:
+    """
+    Clé stable d'une occurrence : fichier, ligne et empreinte du texte de la ligne
+
+    Une ligne modifiée depuis l'interruption change de clé et sera ré-enrichie.
+    """
+    digest = hashlib.sha1(ref['line_text'].encode('utf-8')).hexdigest()[:16]
+    return f"{ref['file']}:{ref['line']}:{digest}"
+
+
+class Journal:
+    """Journal JSONL en ajout seul des références enrichies"""
+
+    def __init__(self, path: Path, resume: bool = False, fsync: bool = True):
+        """
+        Ouvre le journal
+
+        Args:
+            path: Fichier JSONL du journal
+            resume: True pour reprendre les entrées existantes, False pour repartir de zéro
+            fsync: True pour forcer l'écriture sur disque après chaque référence
+        """
+        self.path = path
+        self.fsync = fsync
+        self.completed: Dict[str, Dict] = {}
+
+        if resume and path.exists():
+            self.completed = self._load(path)
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        if self._file.tell() == 0:
+            self._write({'version': JOURNAL_VERSION})
+        elif not self._ends_with_newline(path):
+            # Terminer la ligne tronquée pour ne pas la coller à la suivante
+            self._write_raw('\n')
+
+    @staticmethod
+    def _load(path: Path) -> Dict[str, Dict]:
+        """Entrées du journal ; une dernière ligne tronquée (arrêt brutal) est ignorée"""
+        completed = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if 'key' in record:
+                    completed[record['key']] = record['result']
+        return completed
+
+    @staticmethod
+    def _ends_with_newline(path: Path) -> bool:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def get(self, ref: Dict) -> Optional[Dict]:
+        """Résultat journalisé d'une occurrence, ou None si elle reste à traiter"""
+        return self.completed.get(journal_key(ref))
+
+    def append(self, result: Dict):
+        """
+        Ajoute une référence enrichie au journal
+
+        Le contexte n'est pas conservé : à la reprise il vient du nouveau scan.
+        """
+        entry = {k: v for k, v in result.items() if k != 'context'}
+        self._write({'key': journal_key(result), 'result': entry})
+
+    def _write(self, record: Dict):
+        # json.dumps échappe les retours à la ligne : un enregistrement = une ligne
+        self._write_raw(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def _write_raw(self, text: str):
+        self._file.write(text)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self, remove: bool = False):
+        """
+        Ferme le journal
+
+        Args:
+            remove: True pour supprimer le fichier (exécution terminée et rapports écrits)
+        """
+        self._file.close()
+        if remove:
+            self.path.unlink(missing_ok=True)
@@ -0,0 +1,121 @@
+"""
+Manifeste du vault pour le mode batch incrémental
+Mémorise l'état de chaque note (mtime, taille, empreinte) et les
+résultats de ses références pour ne ré-enrichir que ce qui a changé
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier (lu par blocs)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def reference_key(ref: Dict) -> str:
+    """
+    Clé stable d'une référence, indépendante de son numéro de ligne
+
+    Args:
+        ref: Référence issue de scan_file
+
+    Returns:
+        Empreinte du texte de la ligne et du commentaire du tag
+    """
+    payload = f"{ref['line_text']}\x00{ref['comment']}"
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class VaultManifest:
+    """État des notes du vault au dernier passage"""
+
+    def __init__(self, path: Path):
+        """
+        Charge le manifeste (vide s'il n'existe pas ou est illisible)
+
+        Args:
+            path: Fichier JSON du manifeste
+        """
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.files = data.get('files', {})
+            except (OSError, ValueError):
+                print(f"⚠️  Manifeste illisible, reconstruction complète: {path}")
+
+    def check(self, rel_path: str, path: Path) -> Optional[str]:
+        """
+        Détermine si une note a changé depuis le dernier passage
+
+        mtime et taille identiques : note inchangée sans la relire.
+        Sinon le contenu est haché et comparé.
+
+        Args:
+            rel_path: Chemin relatif au vault (clé du manifeste)
+            path: Chemin absolu de la note
+
+        Returns:
+            None si la note est inchangée, sinon son empreinte SHA-256
+        """
+        stat = path.stat()
+        entry = self.files.get(rel_path)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return None
+
+        sha = file_sha256(path)
+        if entry and entry['sha256'] == sha:
+            # Contenu identique (ex: note simplement touchée) : mémoriser le nouveau mtime
+            entry['mtime_ns'] = stat.st_mtime_ns
+            entry['size'] = stat.st_size
+            return None
+
+        return sha
+
+    def previous_results(self, rel_path: str) -> Dict[str, Dict]:
+        """Résultats du dernier passage, indexés par reference_key"""
+        return self.files.get(rel_path, {}).get('references', {})
+
+    def update(self, rel_path: str, path: Path, sha: str, results: Iterable[Dict]):
+        """
+        Enregistre l'état d'une note après traitement
+
+        Le contexte n'est pas conservé : il est reconstruit au scan suivant.
+        """
+        stat = path.stat()
+        self.files[rel_path] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': sha,
+            'references': {
+                reference_key(r): {k: v for k, v in r.items() if k != 'context'}
+                for r in results
+            }
+        }
+
+    def prune(self, root: Path):
+        """Oublie les notes qui n'existent plus dans le vault"""
+        for rel_path in list(self.files):
+            if not (root / rel_path).exists():
+                del self.files[rel_path]
+
+    def save(self):
+        """Écrit le manifeste de façon atomique"""
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'files': self.files}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
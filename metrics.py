@@ -0,0 +1,228 @@
+"""
+Métriques de l'enrichisseur : latence par étape, compteurs, jauges
+Export JSON, texte Prometheus et trace Chrome (chrome://tracing, Perfetto)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Bornes des histogrammes de latence (secondes)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Préfixe des métriques Prometheus
+PROMETHEUS_PREFIX = 'biblio'
+
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes (format Prometheus)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # dernière case : +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def quantile(self, q: float) -> float:
+        """Quantile estimé par interpolation linéaire dans la case concernée"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bound in enumerate(self.buckets + (self.max,)):
+            if seen + self.counts[i] >= rank and self.counts[i]:
+                upper = min(bound, self.max)
+                lower = max(lower, self.min)
+                return lower + (upper - lower) * (rank - seen) / self.counts[i]
+            seen += self.counts[i]
+            lower = bound
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'total_s': round(self.sum, 6),
+            'mean_s': round(self.sum / self.count, 6) if self.count else 0.0,
+            'min_s': round(self.min, 6) if self.count else 0.0,
+            'p50_s': round(self.quantile(0.5), 6),
+            'p95_s': round(self.quantile(0.95), 6),
+            'p99_s': round(self.quantile(0.99), 6),
+            'max_s': round(self.max, 6),
+        }
+
+
+class Metrics:
+    """Registre thread-safe des métriques d'une exécution"""
+
+    def __init__(self, trace: bool = False, max_trace_events: int = 100000):
+        """
+        Args:
+            trace: True pour conserver les événements de la trace Chrome
+            max_trace_events: Nombre maximum d'événements conservés
+        """
+        self.trace = trace
+        self.max_trace_events = max_trace_events
+        self.stages: Dict[str, Histogram] = {}
+        self.errors = Counter()
+        self.counters = Counter()  # (nom, étiquette) → valeur
+        self.gauges: Dict[Tuple[str, str], float] = {}
+        self.trace_events: List[Dict] = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage: str):
+        """
+        Mesure la durée d'un bloc ; une exception est comptée comme erreur de l'étape
+
+        Exemple :
+            with metrics.timer('llm'):
+                response = ollama.chat(...)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.error(stage)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, start)
+
+    def observe(self, stage: str, duration: float, start: Optional[float] = None):
+        """Enregistre une durée (secondes) pour une étape"""
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = Histogram()
+            self.stages[stage].observe(duration)
+
+            if self.trace and len(self.trace_events) < self.max_trace_events:
+                start = start if start is not None else time.perf_counter() - duration
+                self.trace_events.append({
+                    'name': stage,
+                    'cat': 'stage',
+                    'ph': 'X',
+                    'ts': round((start - self.started) * 1e6, 1),
+                    'dur': round(duration * 1e6, 1),
+                    'pid': os.getpid(),
+                    'tid': threading.get_ident(),
+                })
+
+    def error(self, stage: str):
+        """Compte une erreur pour une étape"""
+        with self._lock:
+            self.errors[stage] += 1
+
+    def incr(self, name: str, label: str = '', value: int = 1):
+        """Incrémente un compteur (ex: incr('extraction_path', 'llm'))"""
+        with self._lock:
+            self.counters[(name, label)] += value
+
+    def set_gauge(self, name: str, value: float, label: str = ''):
+        """Fixe la valeur d'une jauge (ex: taux de succès d'un cache)"""
+        with self._lock:
+            self.gauges[(name, label)] = value
+
+    def count(self, name: str, label: str = '') -> int:
+        """Valeur actuelle d'un compteur"""
+        with self._lock:
+            return self.counters[(name, label)]
+
+    def snapshot(self) -> Dict:
+        """Toutes les métriques sous forme de dictionnaire sérialisable"""
+        with self._lock:
+            stages = {}
+            for name, histogram in self.stages.items():
+                stages[name] = {**histogram.to_dict(), 'errors': self.errors[name]}
+            for name, errors in self.errors.items():
+                stages.setdefault(name, {'count': 0, 'errors': errors})
+
+            return {
+                'wall_time_s': round(time.perf_counter() - self.started, 3),
+                'stages': stages,
+                'counters': _group(self.counters),
+                'gauges': _group(self.gauges),
+            }
+
+    def write_json(self, path: Path):
+        """Exporte les métriques en JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+
+    def to_prometheus(self) -> str:
+        """Métriques au format texte d'exposition Prometheus"""
+        p = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {p}_stage_duration_seconds Durée des étapes d'enrichissement",
+            f"# TYPE {p}_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{p}_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{p}_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{p}_stage_duration_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{p}_stage_duration_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            lines.append(f"# TYPE {p}_stage_errors_total counter")
+            for stage, errors in sorted(self.errors.items()):
+                lines.append(f'{p}_stage_errors_total{{stage="{stage}"}} {errors}')
+
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {p}_{name}_total counter")
+                for (key, label), value in sorted(self.counters.items()):
+                    if key == name:
+                        labels = f'{{label="{label}"}}' if label else ''
+                        lines.append(f"{p}_{name}_total{labels} {value}")
+
+            for name in sorted({name for name, _ in self.gauges}):
+                lines.append(f"# TYPE {p}_{name} gauge")
+                for (key, label), value in sorted(self.gauges.items()):
+                    if key == name:
+                        labels = f'{{label="{label}"}}' if label else ''
+                        lines.append(f"{p}_{name}{labels} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: Path):
+        """Exporte les métriques au format Prometheus (ex: pour node_exporter textfile)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+
+    def write_chrome_trace(self, path: Path):
+        """Exporte la trace au format Chrome Trace Event (à ouvrir dans Perfetto)"""
+        with self._lock:
+            events = list(self.trace_events)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def _group(values: Dict[Tuple[str, str], float]) -> Dict:
+    """{(nom, étiquette): valeur} → {nom: valeur} ou {nom: {étiquette: valeur}}"""
+    grouped: Dict = {}
+    for (name, label), value in sorted(values.items()):
+        if label:
+            grouped.setdefault(name, {})[label] = value
+        else:
+            grouped[name] = value
+    return grouped
@@ -0,0 +1,113 @@
+"""
+Client Ollama de l'enrichisseur
+Modèle préchargé et maintenu en mémoire (keep_alive), sortie JSON structurée,
+réponses courtes (num_predict) et requêtes simultanées plafonnées
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import ollama
+
+METADATA_PROPERTIES = {
+    'author': {'type': 'string'},
+    'title': {'type': 'string'},
+    'year': {'type': 'string'},
+    'confidence': {'type': 'number'},
+}
+
+# Schéma de la réponse pour une référence
+METADATA_SCHEMA = {
+    'type': 'object',
+    'properties': METADATA_PROPERTIES,
+    'required': ['author', 'title', 'year', 'confidence'],
+}
+
+# Schéma de la réponse groupée : {"references": [{"id": 1, ...}, ...]}
+BATCH_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'references': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {'id': {'type': 'integer'}, **METADATA_PROPERTIES},
+                'required': ['id', 'author', 'title', 'year', 'confidence'],
+            },
+        },
+    },
+    'required': ['references'],
+}
+
+
+class OllamaClient:
+    """Client Ollama partagé par les workers LLM"""
+
+    def __init__(self, host: str, model: str, keep_alive: str = "30m",
+                 num_ctx: Optional[int] = None, num_parallel: int = 1,
+                 output_format: Optional[str] = "schema", timeout: Optional[float] = None):
+        """
+        Initialise le client
+
+        Args:
+            host: URL du serveur Ollama
+            model: Modèle à utiliser
+            keep_alive: Durée de maintien du modèle en mémoire après chaque appel
+                        (ex: "30m", -1 pour toujours)
+            num_ctx: Taille du contexte (None pour la valeur du modèle)
+            num_parallel: Requêtes simultanées maximum (OLLAMA_NUM_PARALLEL du serveur)
+            output_format: "schema" (sortie structurée, Ollama >= 0.5),
+                           "json" (JSON libre) ou None
+            timeout: Timeout des requêtes (secondes, None pour aucun)
+        """
+        self.model = model
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.output_format = output_format
+        self._client = ollama.Client(host=host, timeout=timeout)
+        # Au-delà de OLLAMA_NUM_PARALLEL, le serveur met les requêtes en file
+        self._slots = threading.BoundedSemaphore(max(1, num_parallel))
+
+    def installed_models(self) -> List[str]:
+        """Modèles installés sur le serveur (lève une exception si injoignable)"""
+        return [m['model'] or '' for m in self._client.list()['models']]
+
+    def warm_up(self):
+        """
+        Charge le modèle en mémoire sans rien générer
+
+        Le premier appel d'extraction ne paie pas le chargement, et keep_alive
+        évite que le modèle soit déchargé entre deux références.
+        """
+        self._client.generate(model=self.model, prompt='', keep_alive=self.keep_alive)
+
+    def _format(self, schema: Dict):
+        if self.output_format == 'schema':
+            return schema
+        return self.output_format or None
+
+    def chat(self, prompt: str, num_predict: int, batch: bool = False) -> str:
+        """
+        Envoie un prompt et retourne le texte de la réponse
+
+        Args:
+            prompt: Prompt d'extraction
+            num_predict: Nombre maximum de tokens générés
+            batch: True pour une réponse groupée (BATCH_SCHEMA)
+
+        Returns:
+            Texte de la réponse (JSON)
+        """
+        options = {'temperature': 0, 'num_predict': num_predict}
+        if self.num_ctx:
+            options['num_ctx'] = self.num_ctx
+
+        with self._slots:
+            response = self._client.chat(
+                model=self.model,
+                messages=[{'role': 'user', 'content': prompt}],
+                format=self._format(BATCH_SCHEMA if batch else METADATA_SCHEMA),
+                options=options,
+                keep_alive=self.keep_alive,
+            )
+        return response['message']['content'].strip()
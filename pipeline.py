@@ -0,0 +1,203 @@
+"""
+Exécuteur en pipeline pour l'enrichissement des références
+Chaque étape a ses propres workers ; les étapes sont reliées par des files bornées
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+# Marqueur de fin de flux entre deux étapes
+_END = object()
+
+
+class _Failure:
+    """Exception levée par une étape, transportée jusqu'au consommateur"""
+
+    def __init__(self, stage: str, error: BaseException):
+        self.stage = stage
+        self.error = error
+
+
+class Pipeline:
+    """
+    Pipeline à étapes concurrentes
+
+    Les éléments traversent les étapes dans l'ordre ; une étape peut traiter
+    plusieurs éléments en parallèle pendant que les autres étapes avancent.
+    Les résultats sont restitués dans l'ordre d'entrée.
+
+    Une étape groupée reçoit une liste d'éléments (ceux déjà en attente dans
+    sa file, jusqu'à la taille de lot) et retourne la liste des résultats.
+
+    Si le consommateur s'arrête avant la fin (close(), exception), l'entrée
+    n'est plus lue et les workers vident leurs files sans rien traiter.
+    """
+
+    def __init__(self, stages: List[Tuple],
+                 queue_size: int = 32):
+        """
+        Args:
+            stages: Liste de (nom, fonction, nombre de workers[, taille de lot])
+            queue_size: Taille maximale de chaque file entre deux étapes
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+
+    def run(self, items: Iterable) -> Iterator:
+        """
+        Fait passer les éléments dans le pipeline
+
+        Args:
+            items: Éléments d'entrée (liste ou générateur, consommé au fil de l'eau)
+
+        Yields:
+            Résultat de la dernière étape pour chaque élément, dans l'ordre d'entrée
+
+        Raises:
+            L'exception levée par une étape, à la position de l'élément fautif
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        output = queue.Queue()
+        threads = []
+        # Levé quand le consommateur abandonne le flux
+        stop = threading.Event()
+
+        for stage_idx, (name, func, workers, *batch) in enumerate(self.stages):
+            batch_size = batch[0] if batch else 1
+            inbox = queues[stage_idx]
+            outbox = queues[stage_idx + 1] if stage_idx + 1 < len(self.stages) else output
+            next_workers = (max(1, self.stages[stage_idx + 1][2])
+                            if stage_idx + 1 < len(self.stages) else 1)
+            remaining = [max(1, workers)]
+            lock = threading.Lock()
+
+            for _ in range(max(1, workers)):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(name, func, batch_size, inbox, outbox, remaining, lock, next_workers, stop),
+                    name=f"pipeline-{name}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        feed_errors = []
+        feeder = threading.Thread(
+            target=self._feed,
+            args=(items, queues[0], max(1, self.stages[0][2]), feed_errors, stop),
+            name='pipeline-feed', daemon=True
+        )
+        feeder.start()
+
+        # Réordonner les résultats selon l'ordre d'entrée
+        pending = {}
+        next_index = 0
+        try:
+            while True:
+                message = output.get()
+                if message is _END:
+                    break
+                index, value = message
+                pending[index] = value
+                while next_index in pending:
+                    value = pending.pop(next_index)
+                    next_index += 1
+                    if isinstance(value, _Failure):
+                        raise value.error
+                    yield value
+
+            feeder.join()
+            for thread in threads:
+                thread.join()
+        finally:
+            # Arrêt anticipé : plus d'entrée lue, les éléments en file sont abandonnés
+            # (un appel déjà commencé se termine, sans attendre ici)
+            stop.set()
+            pending.clear()
+
+        # Erreur pendant la lecture des entrées (ex: fichier illisible)
+        if feed_errors:
+            raise feed_errors[0]
+
+    @staticmethod
+    def _feed(items: Iterable, inbox: queue.Queue, workers: int, errors: list,
+              stop: threading.Event):
+        """Alimente la première étape puis signale la fin du flux"""
+        try:
+            for index, item in enumerate(items):
+                if stop.is_set():
+                    break
+                inbox.put((index, item))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            for _ in range(workers):
+                inbox.put(_END)
+
+    @staticmethod
+    def _worker(name: str, func: Callable, batch_size: int, inbox: queue.Queue,
+                outbox: queue.Queue, remaining: list, lock: threading.Lock, next_workers: int,
+                stop: threading.Event):
+        """
+        Boucle d'un worker : traite les éléments de sa file jusqu'à la fin du flux
+
+        Après l'arrêt du consommateur, les éléments sont retirés de la file sans
+        être traités ni transmis, jusqu'à la fin du flux.
+        """
+        ended = False
+        while not ended:
+            message = inbox.get()
+            if message is _END:
+                break
+            if stop.is_set():
+                continue
+
+            if batch_size <= 1:
+                index, value = message
+                if not isinstance(value, _Failure):
+                    try:
+                        value = func(value)
+                    except Exception as e:
+                        value = _Failure(name, e)
+                outbox.put((index, value))
+                continue
+
+            # Lot : compléter avec les éléments déjà disponibles, sans attendre
+            batch = [message]
+            while len(batch) < batch_size:
+                try:
+                    message = inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if message is _END:
+                    ended = True
+                    break
+                batch.append(message)
+            if stop.is_set():
+                continue
+
+            for index, value in Pipeline._run_batch(name, func, batch):
+                outbox.put((index, value))
+
+        # Le dernier worker de l'étape propage la fin à l'étape suivante
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(next_workers):
+                outbox.put(_END)
+
+    @staticmethod
+    def _run_batch(name: str, func: Callable, batch: List[Tuple[int, Any]]) -> List[Tuple[int, Any]]:
+        """Applique une fonction groupée ; une exception fait échouer tout le lot"""
+        todo = [(index, value) for index, value in batch if not isinstance(value, _Failure)]
+        done = [(index, value) for index, value in batch if isinstance(value, _Failure)]
+        if not todo:
+            return done
+
+        try:
+            values = func([value for _, value in todo])
+            done.extend((index, value) for (index, _), value in zip(todo, values))
+        except Exception as e:
+            done.extend((index, _Failure(name, e)) for index, _ in todo)
+        return done
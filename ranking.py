@@ -0,0 +1,99 @@
+"""
+Classement des candidats OpenAlex et CrossRef
+Tous les résultats des deux sources sont fusionnés et notés sur le titre,
+l'auteur, l'année et l'accord sur le DOI ; le meilleur est retenu
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from bibliography import normalize_key
+from similarity import TitleMatcher
+
+
+def normalize_doi(doi: Optional[str]) -> str:
+    """DOI sans préfixe d'URL, en minuscules (les DOI sont insensibles à la casse)"""
+    if not doi:
+        return ''
+    doi = doi.strip().lower()
+    for prefix in ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'doi:'):
+        if doi.startswith(prefix):
+            return doi[len(prefix):]
+    return doi
+
+
+def author_surname(author: Optional[str]) -> str:
+    """Nom de famille normalisé ('Habermas, Jürgen' ou 'Jürgen Habermas' → 'habermas')"""
+    if not author:
+        return ''
+    if ',' in author:
+        return normalize_key(author.split(',')[0])
+    words = normalize_key(author).split()
+    return words[-1] if words else ''
+
+
+def author_score(author: Optional[str], candidate_authors: List[Optional[str]]) -> float:
+    """1 si le nom est celui du premier auteur du candidat, 0.8 pour un co-auteur, 0 sinon"""
+    surname = author_surname(author)
+    if not surname or surname == 'unknown':
+        return 0.0
+    for position, name in enumerate(candidate_authors):
+        if name and surname in normalize_key(name).split():
+            return 1.0 if position == 0 else 0.8
+    return 0.0
+
+
+def year_score(year, candidate_year) -> float:
+    """1 pour la même année, 0.5 à un an près (réédition, publication en ligne), 0 sinon"""
+    try:
+        gap = abs(int(str(year)[:4]) - int(str(candidate_year)[:4]))
+    except (TypeError, ValueError):
+        return 0.0
+    if gap == 0:
+        return 1.0
+    return 0.5 if gap == 1 else 0.0
+
+
+def rank_candidates(metadata: Dict, candidates: List[Dict],
+                    weights: Dict[str, float]) -> Optional[Dict]:
+    """
+    Choisit le meilleur candidat parmi les résultats de toutes les sources
+
+    Accord sur le DOI : 1 si le DOI du candidat est celui des métadonnées
+    (identifiant trouvé dans la référence), ou s'il est renvoyé par plusieurs
+    sources ; 0 sinon.
+
+    Args:
+        metadata: Métadonnées extraites (author, title, year, éventuellement doi)
+        candidates: Candidats au format résultat (source, doi, title, authors, year, url)
+        weights: Poids des critères, de somme 1 (RANKING_WEIGHTS dans config.py)
+
+    Returns:
+        Meilleur candidat avec 'confidence' et 'score_breakdown', None si aucun candidat
+    """
+    if not candidates:
+        return None
+
+    title_scores = TitleMatcher(metadata.get('title')).scores(c.get('title') for c in candidates)
+    doi_sources = defaultdict(set)
+    for c in candidates:
+        if c.get('doi'):
+            doi_sources[normalize_doi(c['doi'])].add(c.get('source'))
+    known_doi = normalize_doi(metadata.get('doi'))
+
+    best = None
+    for candidate, title in zip(candidates, title_scores):
+        doi = normalize_doi(candidate.get('doi'))
+        breakdown = {
+            'title': round(title, 3),
+            'author': author_score(metadata.get('author'), candidate.get('authors') or []),
+            'year': year_score(metadata.get('year'), candidate.get('year')),
+            'doi': 1.0 if doi and (doi == known_doi or len(doi_sources[doi]) > 1) else 0.0,
+        }
+        confidence = round(sum(weights[k] * v for k, v in breakdown.items()), 3)
+
+        # Ordre d'entrée (source prioritaire, pertinence API) à score égal
+        if best is None or confidence > best['confidence']:
+            best = {**candidate, 'confidence': confidence, 'score_breakdown': breakdown}
+
+    return best
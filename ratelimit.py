@@ -0,0 +1,264 @@
+"""
+Limitation de débit et reprises pour les APIs bibliographiques
+Token bucket par API, backoff exponentiel avec jitter, disjoncteur
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+# Codes HTTP qui justifient une nouvelle tentative
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """L'API est considérée comme indisponible : requête refusée sans appel réseau"""
+
+
+class TokenBucket:
+    """Token bucket thread-safe : `rate` requêtes/seconde, rafales jusqu'à `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Réserve un jeton
+
+        Returns:
+            Temps d'attente (secondes) avant de pouvoir envoyer la requête.
+            Le jeton est consommé immédiatement : des appels concurrents
+            reçoivent des créneaux successifs au lieu de partir en rafale.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def update_rate(self, rate: float):
+        """Ajuste le débit (ex: limite annoncée par le serveur)"""
+        with self._lock:
+            self.rate = rate
+            self.capacity = max(1.0, min(self.capacity, rate))
+
+    def pause(self, seconds: float):
+        """Suspend les envois pendant `seconds` (quota épuisé côté serveur)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """Disjoncteur : après `threshold` échecs consécutifs, coupe l'API pendant `cooldown` secondes"""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True si une requête peut partir (fermé, ou demi-ouvert après le délai)"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            return time.monotonic() - self.opened_at >= self.cooldown
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                # (Ré)ouverture : en demi-ouvert, un échec relance le délai
+                self.opened_at = time.monotonic()
+
+
+class ApiGuard:
+    """Politique d'accès à une API : débit, reprises et disjoncteur"""
+
+    def __init__(self, name: str, bucket: Optional[TokenBucket], breaker: CircuitBreaker,
+                 max_retries: int, backoff_base: float, backoff_max: float):
+        self.name = name
+        self.bucket = bucket
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+
+    def before_request(self) -> float:
+        """
+        À appeler avant chaque tentative
+
+        Returns:
+            Temps d'attente imposé par le token bucket (secondes)
+
+        Raises:
+            CircuitOpenError: Si le disjoncteur est ouvert
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"API {self.name} indisponible (disjoncteur ouvert)")
+        return self.bucket.reserve() if self.bucket else 0.0
+
+    def on_response(self, status: int, headers: Mapping[str, str], attempt: int) -> Optional[float]:
+        """
+        Analyse une réponse
+
+        Args:
+            status: Code HTTP
+            headers: En-têtes de la réponse
+            attempt: Numéro de la tentative (0 = première)
+
+        Returns:
+            Délai avant nouvelle tentative, ou None si la réponse est définitive
+        """
+        self._observe_rate_headers(headers)
+
+        if status not in RETRY_STATUSES:
+            self.breaker.record_success()
+            return None
+
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            return None
+
+        self.retries += 1
+        retry_after = parse_retry_after(headers.get('Retry-After'))
+        if retry_after is not None and self.bucket:
+            self.bucket.pause(retry_after)
+        return max(retry_after or 0.0, self.backoff(attempt))
+
+    def on_error(self, attempt: int) -> Optional[float]:
+        """
+        Erreur réseau (connexion, timeout)
+
+        Returns:
+            Délai avant nouvelle tentative, ou None s'il faut abandonner
+        """
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            return None
+        self.retries += 1
+        return self.backoff(attempt)
+
+    def backoff(self, attempt: int) -> float:
+        """Backoff exponentiel avec jitter (entre 50 % et 100 % du délai nominal)"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _observe_rate_headers(self, headers: Mapping[str, str]):
+        """Aligne le token bucket sur les limites annoncées par le serveur"""
+        if not self.bucket:
+            return
+
+        # CrossRef : X-Rate-Limit-Limit: 50 / X-Rate-Limit-Interval: 1s
+        limit = headers.get('X-Rate-Limit-Limit') or headers.get('X-RateLimit-Limit')
+        interval = headers.get('X-Rate-Limit-Interval')
+        if limit and interval:
+            try:
+                # On ne dépasse jamais le débit configuré, on peut seulement le réduire
+                rate = float(limit) / parse_interval(interval)
+                if 0 < rate < self.bucket.rate:
+                    self.bucket.update_rate(rate)
+            except (ValueError, ZeroDivisionError):
+                pass
+
+        # Quota épuisé : X-RateLimit-Remaining: 0 / X-RateLimit-Reset: <secondes>
+        remaining = headers.get('X-RateLimit-Remaining') or headers.get('X-Rate-Limit-Remaining')
+        reset = headers.get('X-RateLimit-Reset') or headers.get('X-Rate-Limit-Reset')
+        if remaining is not None and reset is not None:
+            try:
+                if int(remaining) <= 0:
+                    wait = float(reset)
+                    # Certaines APIs renvoient un timestamp absolu
+                    if wait > 10 ** 9:
+                        wait -= time.time()
+                    if wait > 0:
+                        self.bucket.pause(wait)
+            except ValueError:
+                pass
+
+
+class RateLimiter:
+    """Registre des politiques d'accès, une par API"""
+
+    def __init__(self, rate_limits: Dict[str, Dict], max_retries: int, backoff_base: float,
+                 backoff_max: float, breaker_threshold: int, breaker_cooldown: float):
+        """
+        Args:
+            rate_limits: {api: {'rate': requêtes/s, 'burst': rafale max}}
+            max_retries: Nombre maximum de nouvelles tentatives
+            backoff_base: Délai initial du backoff (secondes)
+            backoff_max: Délai maximum du backoff (secondes)
+            breaker_threshold: Échecs consécutifs avant ouverture du disjoncteur
+            breaker_cooldown: Durée d'ouverture du disjoncteur (secondes)
+        """
+        self.rate_limits = rate_limits
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._guards: Dict[str, ApiGuard] = {}
+        self._lock = threading.Lock()
+
+    def guard(self, api: str) -> ApiGuard:
+        """Politique d'accès de l'API (créée au premier appel)"""
+        with self._lock:
+            if api not in self._guards:
+                limits = self.rate_limits.get(api)
+                bucket = None
+                if limits:
+                    bucket = TokenBucket(limits['rate'], limits.get('burst', limits['rate']))
+                self._guards[api] = ApiGuard(
+                    api, bucket,
+                    CircuitBreaker(self.breaker_threshold, self.breaker_cooldown),
+                    self.max_retries, self.backoff_base, self.backoff_max
+                )
+            return self._guards[api]
+
+    @property
+    def retries(self) -> int:
+        """Nombre total de nouvelles tentatives, toutes APIs confondues"""
+        return sum(g.retries for g in self._guards.values())
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convertit un en-tête Retry-After (secondes ou date HTTP) en secondes"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_interval(value: str) -> float:
+    """Convertit une durée de la forme '1s', '500ms', '1m' en secondes"""
+    value = value.strip().lower()
+    if value.endswith('ms'):
+        return float(value[:-2]) / 1000
+    if value.endswith('s'):
+        return float(value[:-1])
+    if value.endswith('m'):
+        return float(value[:-1]) * 60
+    return float(value)
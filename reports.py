@@ -0,0 +1,180 @@
+"""
+Écriture des rapports en flux
+Chaque référence est écrite dès qu'elle est enrichie (JSON Lines, tableau JSON,
+Markdown) : la mémoire ne dépend pas du nombre de références
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+def compact_context(result: Dict) -> Dict:
+    """
+    Remplace le texte du contexte par sa position (fichier + plage de lignes,
+    numérotées à partir de 1, bornes incluses)
+    """
+    if 'context_range' not in result:
+        return result
+    compact = {k: v for k, v in result.items() if k not in ('context', 'context_range')}
+    start, end = result['context_range']
+    compact['context'] = {'file': result['file'], 'start': start, 'end': end}
+    return compact
+
+
+class JsonLinesWriter:
+    """Une référence par ligne (JSON Lines)"""
+
+    suffix = '.jsonl'
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, result: Dict):
+        self._file.write(json.dumps(result, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class JsonArrayWriter:
+    """Tableau JSON écrit élément par élément (même format que json.dump de la liste)"""
+
+    suffix = '.json'
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write('[')
+        self._count = 0
+
+    def write(self, result: Dict):
+        item = json.dumps(result, indent=2, ensure_ascii=False)
+        separator = ',\n' if self._count else '\n'
+        self._file.write(separator + '  ' + item.replace('\n', '\n  '))
+        self._count += 1
+
+    def close(self):
+        self._file.write('\n]' if self._count else ']')
+        self._file.close()
+
+
+class MarkdownReportWriter:
+    """Rapport Markdown : chaque référence est ajoutée dès qu'elle est terminée, résumé à la fin"""
+
+    suffix = '_report.md'
+
+    def __init__(self, path: Path, source_file: str, min_confidence: float,
+                 unique_key: Callable[[Dict], str]):
+        """
+        Args:
+            path: Fichier du rapport
+            source_file: Fichier (ou 'vault') traité
+            min_confidence: Seuil sous lequel un résultat est signalé incertain
+            unique_key: Clé de dédoublonnage d'une référence (pour le résumé)
+        """
+        self.path = path
+        self.min_confidence = min_confidence
+        self.unique_key = unique_key
+        self.count = 0
+        self.with_doi = 0
+        self._unique = set()
+        self._file = open(path, 'w', encoding='utf-8')
+        self._file.write(
+            f"# Rapport d'enrichissement bibliographique\n\n"
+            f"**Fichier source**: {source_file}\n"
+            f"**Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+            f"---\n\n"
+        )
+
+    def write(self, ref: Dict):
+        self.count += 1
+        self._unique.add(self.unique_key(ref))
+        if ref['api_result']:
+            self.with_doi += 1
+
+        # Une seule écriture par référence, visible aussitôt
+        self._file.write(''.join(self._format(self.count, ref)))
+        self._file.flush()
+
+    def _format(self, i: int, ref: Dict) -> Iterator[str]:
+        yield f"## Référence {i}\n\n"
+        yield f"**Ligne {ref['line']}**: {ref['raw_text']}\n\n"
+
+        if ref['full_reference']:
+            yield f"**Référence complète**:\n> {ref['full_reference']}\n\n"
+
+        meta = ref['extracted_metadata']
+        yield "**Métadonnées extraites**:\n"
+        yield f"- Auteur: {meta['author']}\n"
+        yield f"- Titre: {meta['title']}\n"
+        yield f"- Année: {meta['year']}\n\n"
+
+        if ref['api_result']:
+            api = ref['api_result']
+            yield f"**Résultat API ({api['source']})**:\n"
+            yield f"- DOI: `{api['doi']}`\n"
+            yield f"- URL: {api['url']}\n"
+            yield f"- Score de confiance: {api['confidence']:.2%}\n"
+            breakdown = api.get('score_breakdown')
+            if breakdown:
+                yield (f"- Détail: titre {breakdown['title']:.0%}, auteur {breakdown['author']:.0%}, "
+                       f"année {breakdown['year']:.0%}, DOI {breakdown['doi']:.0%}\n")
+            if api['confidence'] < self.min_confidence:
+                yield "- ⚠️ *Correspondance incertaine*\n"
+            yield "\n"
+        else:
+            yield "⚠️ *Aucun DOI trouvé*\n\n"
+
+        yield "---\n\n"
+
+    def close(self):
+        self._file.write(
+            f"## Résumé\n\n"
+            f"**Références trouvées**: {self.count}\n"
+            f"**Références uniques**: {len(self._unique)}\n"
+            f"**DOI trouvés**: {self.with_doi}/{self.count}\n"
+        )
+        self._file.close()
+
+
+class ReportWriters:
+    """Ensemble des rapports d'une exécution, alimentés référence par référence"""
+
+    def __init__(self, writers: List, context_storage: str = 'inline'):
+        """
+        Args:
+            writers: Rapports ouverts (JsonLinesWriter, JsonArrayWriter, MarkdownReportWriter)
+            context_storage: 'inline' (texte du contexte copié) ou 'reference'
+                             (fichier + plage de lignes) dans les rapports JSON
+        """
+        self.writers = writers
+        self.context_storage = context_storage
+        self.count = 0
+        self.with_doi = 0
+
+    def write(self, result: Dict):
+        self.count += 1
+        if result['api_result']:
+            self.with_doi += 1
+
+        compact: Optional[Dict] = None
+        for writer in self.writers:
+            if isinstance(writer, MarkdownReportWriter):
+                writer.write(result)
+                continue
+            if self.context_storage == 'reference':
+                compact = compact or compact_context(result)
+                writer.write(compact)
+            else:
+                writer.write({k: v for k, v in result.items() if k != 'context_range'})
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+
+    @property
+    def paths(self) -> List[Path]:
+        return [writer.path for writer in self.writers]
@@ -0,0 +1,282 @@
+"""
+Démon local d'enrichissement (mode --serve)
+API HTTP/JSON autour d'un BiblioEnricher résident : un plugin Obsidian ou un
+script d'éditeur l'appelle au lieu de relancer agent.py à chaque citation.
+Les requêtes simultanées partagent client Ollama, session HTTP et caches ;
+au plus SERVER_WORKERS passages du pipeline tournent à la fois, et une
+citation déjà en cours d'enrichissement n'est pas relancée (coalescence)
+
+    POST /scan     {"path": "Chapitre 1/1.2 Note.md"}  → {"file", "references": [...]}
+    POST /enrich   {"text": "Habermas (1992)", "context": "..."}  → référence enrichie
+    GET  /metrics  → métriques JSON (?format=prometheus pour le format texte)
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Taille maximale d'un corps de requête (octets)
+MAX_BODY_SIZE = 1 << 20
+JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class RequestError(Exception):
+    """Requête invalide, renvoyée au client avec son code HTTP"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class EnrichmentService:
+    """Enrichissement partagé par les requêtes du démon, avec coalescence"""
+
+    def __init__(self, enricher, workers: int = 2):
+        """
+        Args:
+            enricher: BiblioEnricher résident (index, caches et modèle chargés)
+            workers: Passages du pipeline simultanés ; les requêtes suivantes attendent
+        """
+        self.enricher = enricher
+        self.metrics = enricher.metrics
+        # Chaque passage lance ses propres threads (LLM, HTTP) : leur nombre reste borné
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='enrich')
+        # Clé de dédoublonnage → résultat attendu par les requêtes concurrentes
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+
+    def enrich(self, refs: List[Dict]) -> List[Dict]:
+        """
+        Enrichit des références en un seul passage du pipeline
+
+        Une référence identique (même clé que BiblioEnricher.dedup_key) déjà
+        en cours pour une autre requête n'est pas relancée : son résultat
+        est attendu puis recopié avec la position de l'occurrence.
+
+        Args:
+            refs: Références (voir BiblioEnricher.iter_references)
+
+        Returns:
+            Références enrichies, dans l'ordre
+        """
+        # Référence complète cherchée une seule fois : reprise par le pipeline (voir _unique_jobs)
+        refs = [{**ref, 'full_reference': self.enricher.search_in_bibliography(ref['raw_text'])}
+                for ref in refs]
+        keys = [self.enricher.dedup_key(ref['raw_text'], ref['full_reference']) for ref in refs]
+        owned: Dict[str, Tuple[Dict, Future]] = {}
+        waits: List[Future] = []
+        with self._lock:
+            for ref, key in zip(refs, keys):
+                future = self._in_flight.get(key)
+                if future is None:
+                    future = Future()
+                    self._in_flight[key] = future
+                    owned[key] = (ref, future)
+                elif key not in owned:
+                    self.metrics.incr('coalesced_references')
+                waits.append(future)
+
+        try:
+            if owned:
+                jobs = list(owned.values())
+                self._executor.submit(self._run, jobs).result()
+        except Exception as e:
+            for _, future in owned.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for _, future in owned.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("enrichissement interrompu"))
+            with self._lock:
+                for key in owned:
+                    del self._in_flight[key]
+
+        return [self._public({**future.result(), **ref}) for ref, future in zip(refs, waits)]
+
+    def _run(self, jobs: List[Tuple[Dict, Future]]):
+        for (_, future), result in zip(jobs, self.enricher.iter_enriched([ref for ref, _ in jobs])):
+            future.set_result(result)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    @staticmethod
+    def _public(result: Dict) -> Dict:
+        return {k: v for k, v in result.items() if k != 'context_range'}
+
+    def scan(self, path: str) -> Dict:
+        """
+        Enrichit toutes les références d'une note et met à jour l'index des citations
+
+        Args:
+            path: Chemin de la note, relatif au vault (ou absolu dans le vault)
+        """
+        vault_path = self.enricher.vault_path
+        note = Path(path) if Path(path).is_absolute() else vault_path / path
+        note = note.resolve()
+        if note.suffix != '.md':
+            note = note.with_name(note.name + '.md')
+        if vault_path not in note.parents or not note.is_file():
+            raise RequestError(404, f"note introuvable dans le vault: {path}")
+
+        rel_path = note.relative_to(vault_path).as_posix()
+        results = self.enrich(self.enricher.scan_file(rel_path))
+
+        index = self.enricher.citation_index
+        if index is not None:
+            with self._index_lock:
+                index.start_run()
+                # Même sans référence restante : les anciennes occurrences de la note sont retirées
+                index.replace_file(rel_path)
+                for result in results:
+                    index.add(result)
+                index.commit()
+        return {'file': rel_path, 'references': results}
+
+    def enrich_text(self, text: str, context: Optional[str] = None,
+                    file: str = '', line: int = 0) -> Dict:
+        """
+        Enrichit une citation isolée (texte brut, ex: "Habermas (1992)")
+
+        Args:
+            text: Citation
+            context: Texte autour de la citation (DOI ou ISBN éventuels)
+            file: Note d'origine (facultatif, recopié dans le résultat)
+            line: Ligne d'origine (facultatif)
+        """
+        text = text.strip()
+        if not text:
+            raise RequestError(400, "citation vide")
+        ref = {
+            'file': file,
+            'line': line,
+            'raw_text': text,
+            'comment': text,
+            'context': context or text,
+            'line_text': text,
+        }
+        return self.enrich([ref])[0]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routage des requêtes vers EnrichmentService"""
+
+    server_version = 'BiblioEnricher/1.0'
+    service: EnrichmentService = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/metrics':
+            return self._handle(lambda: self._not_found(url.path), 'unknown')
+        if parse_qs(url.query).get('format', ['json'])[0] == 'prometheus':
+            def prometheus():
+                self.service.enricher.collect_metrics()
+                return self.service.metrics.to_prometheus()
+            return self._handle(prometheus, 'metrics', PROMETHEUS_CONTENT_TYPE)
+        self._handle(self.service.enricher.collect_metrics, 'metrics')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == '/scan':
+            self._handle(lambda: self.service.scan(self._field(self._body(), 'path')), 'scan')
+        elif url.path == '/enrich':
+            def enrich():
+                body = self._body()
+                line = body.get('line', 0)
+                if not isinstance(line, int):
+                    raise RequestError(400, "champ 'line' : entier attendu")
+                return self.service.enrich_text(self._field(body, 'text'), body.get('context'),
+                                                file=body.get('file', ''), line=line)
+            self._handle(enrich, 'enrich')
+        else:
+            self._handle(lambda: self._not_found(url.path), 'unknown')
+
+    @staticmethod
+    def _not_found(path: str):
+        raise RequestError(404, f"route inconnue: {path}")
+
+    def _body(self) -> Dict:
+        header = self.headers.get('Content-Length') or '0'
+        if not header.strip().isdigit():
+            raise RequestError(400, f"Content-Length invalide: {header}")
+        # Taille vérifiée avant toute lecture du corps
+        length = int(header)
+        if length > MAX_BODY_SIZE:
+            raise RequestError(413, "requête trop volumineuse")
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise RequestError(400, "JSON invalide")
+        if not isinstance(body, dict):
+            raise RequestError(400, "objet JSON attendu")
+        return body
+
+    @staticmethod
+    def _field(body: Dict, name: str) -> str:
+        value = body.get(name)
+        if not isinstance(value, str):
+            raise RequestError(400, f"champ '{name}' manquant")
+        return value
+
+    def _handle(self, func, endpoint: str, content_type: Optional[str] = None):
+        """
+        Exécute la requête et mesure sa latence (étape server_<route>)
+
+        La réponse est en JSON, sauf si content_type est donné : func rend
+        alors le texte à envoyer tel quel (les erreurs restent en JSON).
+        """
+        metrics = self.service.metrics
+        start = time.perf_counter()
+        try:
+            status, payload = 200, func()
+        except RequestError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            metrics.error(f"server_{endpoint}")
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        metrics.observe(f"server_{endpoint}", time.perf_counter() - start, start)
+        metrics.incr('server_requests', str(status))
+        if status == 200 and content_type:
+            return self._send(status, payload.encode('utf-8'), content_type)
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'), JSON_CONTENT_TYPE)
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"   {self.address_string()} {format % args}")
+
+
+def serve(enricher, host: str = '127.0.0.1', port: int = 8765, workers: int = 2):
+    """
+    Lance le démon jusqu'à Ctrl+C
+
+    Args:
+        enricher: BiblioEnricher résident
+        host: Adresse d'écoute (locale par défaut : l'API n'est pas authentifiée)
+        port: Port d'écoute
+        workers: Passages du pipeline simultanés (voir EnrichmentService)
+    """
+    service = EnrichmentService(enricher, workers)
+    handler = type('Handler', (_Handler,), {'service': service})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    print(f"\n🛰️  Démon d'enrichissement sur http://{host}:{port} — Ctrl+C pour arrêter")
+    print("   POST /scan, POST /enrich, GET /metrics")
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+        service.close()
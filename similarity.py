@@ -0,0 +1,84 @@
+"""
+Similarité de titres pour le choix du meilleur résultat API
+Tokens normalisés (accents, ponctuation) et n-grammes de caractères,
+tolérants aux erreurs d'OCR
+"""
+
+from typing import FrozenSet, Iterable, List, Optional
+
+from bibliography import normalize_key
+
+# Taille des n-grammes de caractères
+NGRAM_SIZE = 3
+
+# Poids respectifs des tokens et des n-grammes dans le score final
+TOKEN_WEIGHT = 0.5
+NGRAM_WEIGHT = 0.5
+
+
+class NormalizedTitle:
+    """Titre pré-normalisé : tokens et n-grammes calculés une seule fois"""
+
+    __slots__ = ('text', 'tokens', 'ngrams')
+
+    def __init__(self, title: Optional[str]):
+        self.text = normalize_key(title or '')
+        self.tokens: FrozenSet[str] = frozenset(self.text.split())
+        self.ngrams: FrozenSet[str] = _ngrams(self.text)
+
+
+def _ngrams(text: str) -> FrozenSet[str]:
+    """N-grammes de caractères, mots bordés d'espaces ('_ab', 'abc', 'bc_')"""
+    if not text:
+        return frozenset()
+    padded = f" {text} "
+    if len(padded) <= NGRAM_SIZE:
+        return frozenset((padded,))
+    return frozenset(padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+
+class TitleMatcher:
+    """Compare un titre de référence à des titres candidats"""
+
+    def __init__(self, title: Optional[str]):
+        """
+        Args:
+            title: Titre extrait de la référence (normalisé une fois pour toutes)
+        """
+        self.query = NormalizedTitle(title)
+
+    def score(self, candidate: Optional[str]) -> float:
+        """
+        Similarité entre le titre de la référence et un candidat
+
+        Moyenne pondérée de deux ratios :
+        - tokens : mots communs / mots distincts (ordre et ponctuation ignorés)
+        - n-grammes : coefficient de Dice sur les trigrammes de caractères,
+          qui reste élevé malgré une lettre mal reconnue
+
+        Returns:
+            Score entre 0 et 1
+        """
+        return self._score(NormalizedTitle(candidate))
+
+    def scores(self, candidates: Iterable[Optional[str]]) -> List[float]:
+        """Scores de tous les candidats en un appel (même ordre que l'entrée)"""
+        return [self._score(NormalizedTitle(c)) for c in candidates]
+
+    def _score(self, other: NormalizedTitle) -> float:
+        query = self.query
+        if not query.tokens or not other.tokens:
+            return 0.0
+        if query.text == other.text:
+            return 1.0
+
+        token_ratio = len(query.tokens & other.tokens) / len(query.tokens | other.tokens)
+        ngram_ratio = (2 * len(query.ngrams & other.ngrams)
+                       / (len(query.ngrams) + len(other.ngrams)))
+
+        return TOKEN_WEIGHT * token_ratio + NGRAM_WEIGHT * ngram_ratio
+
+
+def title_similarity(title1: Optional[str], title2: Optional[str]) -> float:
+    """Similarité entre deux titres (voir TitleMatcher.score)"""
+    return TitleMatcher(title1).score(title2)
@@ -0,0 +1,20 @@
+"""Configuration pytest : modules du projet importables depuis tests/"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Sans config.py local, les modules lisent le modèle de configuration
+# (Ollama pointé sur un port fermé : aucun appel ne part des tests)
+try:
+    import config  # noqa: F401
+except ImportError:
+    spec = importlib.util.spec_from_file_location('config', ROOT / 'config.example.py')
+    config = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(config)
+    config.OLLAMA_URL = 'http://127.0.0.1:9'
+    config.OLLAMA_TIMEOUT = 1
+    sys.modules['config'] = config
@@ -0,0 +1,82 @@
+"""Tests du client HTTP asynchrone et de la recherche DOI en mode --async-api"""
+
+import asyncio
+import threading
+
+import httpx
+
+import async_client
+from async_client import AsyncHttpClient
+from cache import HttpCache
+from ratelimit import RateLimiter
+
+OPENALEX_WORK = {'id': 'https://openalex.org/W1', 'doi': 'https://doi.org/10.5555/h', 'publication_year': 1992,
+                 'title': 'The Structural Transformation of the Public Sphere',
+                 'authorships': [{'author': {'display_name': 'Jürgen Habermas'}}]}
+CROSSREF_ITEM = {'DOI': '10.5555/h', 'title': ['The Structural Transformation of the Public Sphere'],
+                 'author': [{'family': 'Habermas', 'given': 'Jürgen'}], 'issued': {'date-parts': [[1992]]}}
+
+
+class ThreadRecordingCache(HttpCache):
+    """Cache qui note le thread de chaque accès"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def set(self, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        return super().set(*args, **kwargs)
+
+
+def test_cache_is_used_outside_the_event_loop(tmp_path, monkeypatch):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={'results': []}))
+    client_class = httpx.AsyncClient
+    monkeypatch.setattr(async_client.httpx, 'AsyncClient',
+                        lambda **options: client_class(transport=transport, **options))
+    cache = ThreadRecordingCache(tmp_path / 'http.sqlite', max_entries=10)
+    limiter = RateLimiter({}, max_retries=0, backoff_base=0, backoff_max=0,
+                          breaker_threshold=5, breaker_cooldown=60)
+
+    async def fetch_twice():
+        async with AsyncHttpClient(cache, limiter, host_limits={}, default_ttl=3600) as client:
+            first = await client.get_json('https://api.openalex.org/works', params={'search': 'x'})
+            second = await client.get_json('https://api.openalex.org/works', params={'search': 'x'})
+            return threading.get_ident(), first, second, client.requests_sent
+
+    loop_thread, first, second, sent = asyncio.run(fetch_twice())
+    assert first == second == {'results': []}
+    assert sent == 1
+    assert cache.threads and loop_thread not in cache.threads
+
+
+def test_sync_and_async_searches_share_one_path(tmp_path, monkeypatch):
+    from agent import BiblioEnricher
+
+    def answer(api, params):
+        if api == 'openalex':
+            # Requête structurée vide : la recherche libre prend le relais
+            return {'results': [OPENALEX_WORK] if 'search' in params else []}
+        return {'message': {'items': [CROSSREF_ITEM]}}
+
+    async def get_json_async(self, url, params=None, headers=None, ttl=None, api='default'):
+        return answer(api, params)
+
+    enricher = BiblioEnricher(vault_path=str(tmp_path))
+    monkeypatch.setattr(enricher.http, 'get_json',
+                        lambda url, params=None, headers=None, ttl=None, api='default': answer(api, params))
+    monkeypatch.setattr(AsyncHttpClient, 'get_json', get_json_async)
+    metadata = {'author': 'Habermas, Jürgen', 'title': 'The Structural Transformation of the Public Sphere',
+                'year': '1992'}
+
+    sync_result = enricher._resolve_api(metadata)
+    sync_fallbacks = enricher.metrics.count('search_fallback', 'openalex')
+    [async_result] = enricher.lookup_all_async([metadata])
+
+    assert async_result == sync_result
+    assert sync_result['doi'] == '10.5555/h' and sync_result['score_breakdown']['doi'] == 1.0
+    assert enricher.metrics.count('search_fallback', 'openalex') == 2 * sync_fallbacks == 2
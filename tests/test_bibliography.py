@@ -0,0 +1,86 @@
+"""Tests de l'index de la bibliographie"""
+
+import pytest
+
+from bibliography import BibliographyIndex, parse_citation
+
+BIBLIOGRAPHY = """# Bibliographie
+
+DeLanda, Manuel. 2006. A New Philosophy of Society. London: Continuum.
+
+DiMaggio, Paul, and Walter W. Powell. 1983. The Iron Cage Revisited.
+American Sociological Review 48 (2): 147-160.
+
+Habermas, Jürgen. 1992. The Structural Transformation of the Public Sphere.
+Cambridge: MIT Press.
+
+Habermasian readings, ed. Smith. 2001. Oxford.
+
+McCarthy, Thomas. 1964. The Critical Theory of Jürgen Habermas.
+
+McLuhan, Marshall. 1964. Understanding Media. New York: McGraw-Hill.
+"""
+
+
+def test_search_returns_the_full_multiline_entry():
+    index = BibliographyIndex(BIBLIOGRAPHY.split('\n'))
+    assert index.search('Habermas 1992') == (
+        'Habermas, Jürgen. 1992. The Structural Transformation of the Public Sphere. '
+        'Cambridge: MIT Press.'
+    )
+
+
+def test_search_needs_an_author_and_a_year():
+    index = BibliographyIndex(BIBLIOGRAPHY.split('\n'))
+    assert index.search('Unknown 1999') is None
+    assert index.search('Habermas') is None
+    assert index.search('1992') is None
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / 'biblio.md'
+    path.write_text(BIBLIOGRAPHY, encoding='utf-8')
+    assert BibliographyIndex.from_file(path).search('Smith 2001').startswith('Habermasian readings')
+
+
+def baseline_search(lines, ref_text):
+    """Recherche ligne à ligne d'origine (auteurs et années contenus dans la ligne)"""
+    authors, years = parse_citation(ref_text)
+    if not (authors and years):
+        return None
+    best, max_matches = None, 0
+    for i, line in enumerate(lines):
+        matches = sum(1 for a in authors if a in line) + sum(1 for y in years if y in line)
+        if matches > max_matches:
+            max_matches = matches
+            full_ref, j = line, i + 1
+            while j < len(lines) and lines[j].strip():
+                full_ref += ' ' + lines[j].strip()
+                j += 1
+            best = full_ref.strip()
+    return best if max_matches >= 2 else None
+
+
+@pytest.mark.parametrize('citation, author', [
+    ('McLuhan 1964', 'McLuhan'),
+    ('DeLanda (2006)', 'DeLanda'),
+    ('DiMaggio and Powell 1983', 'DiMaggio'),
+    ('Habermas 1992', 'Habermas'),
+])
+def test_camel_case_surnames(citation, author):
+    full_ref = BibliographyIndex(BIBLIOGRAPHY.split('\n')).search(citation)
+    assert full_ref is not None and full_ref.startswith(author)
+
+
+@pytest.mark.parametrize('citation', [
+    'McLuhan 1964', 'McCarthy 1964', 'DeLanda 2006', 'DiMaggio and Powell 1983',
+    'Habermas 1992', 'Habermas 2001', 'Habermas 1964', 'Smith 2001',
+    'Habermas 2021, Habermas 1992', 'Unknown 1999', 'Habermas',
+])
+def test_search_matches_baseline(citation):
+    lines = BIBLIOGRAPHY.split('\n')
+    assert BibliographyIndex(lines).search(citation) == baseline_search(lines, citation)
+
+
+def test_parse_citation_keeps_internal_capitals():
+    assert parse_citation('DiMaggio and Powell 1983') == (['DiMaggio', 'Powell'], ['1983'])
@@ -0,0 +1,102 @@
+"""Tests de la résolution groupée des identifiants (OpenAlex, CrossRef)"""
+
+import pytest
+
+import config
+
+OPENALEX_WORKS = [
+    {'id': 'https://openalex.org/W1', 'doi': 'https://doi.org/10.5555/A', 'title': 'Titre A',
+     'publication_year': 2001, 'authorships': [{'author': {'display_name': 'Anne Auteur'}}]},
+    {'id': 'https://openalex.org/W2', 'doi': 'https://doi.org/10.5555/b', 'title': 'Titre B',
+     'publication_year': 2002, 'authorships': []},
+    {'id': 'https://openalex.org/W3', 'doi': None, 'title': 'Titre W3',
+     'publication_year': 2003, 'authorships': []},
+]
+CROSSREF_ITEMS = [
+    {'DOI': '10.5555/C', 'title': ['Titre C'], 'author': [{'family': 'Cé', 'given': 'Claire'}],
+     'issued': {'date-parts': [[2004]]}, 'ISBN': ['978-0-262-58108-0']},
+    {'DOI': '10.5555/d', 'title': ['Titre D'], 'issued': {'date-parts': [[2005]]},
+     'ISBN': ['0-262-58108-6']},
+]
+
+
+class FakeApis:
+    """Réponses des filtres OU d'OpenAlex et de CrossRef, champs limités par select="""
+
+    def __init__(self):
+        self.requests = []
+
+    def get_json(self, url, params=None, headers=None, ttl=None, api='default'):
+        params = params or {}
+        self.requests.append((api, params['filter']))
+        if api == 'openalex':
+            field, values = params['filter'].split(':', 1)
+            values = values.lower().split('|')
+            if field == 'doi':
+                found = [w for w in OPENALEX_WORKS if (w['doi'] or '').lower()[16:] in values]
+            else:
+                found = [w for w in OPENALEX_WORKS if w['id'].rsplit('/', 1)[-1].lower() in values]
+            return {'results': self._select(reversed(found), params)}
+
+        wanted = {tuple(f.split(':', 1)) for f in params['filter'].split(',')}
+        found = [item for item in CROSSREF_ITEMS
+                 if ('doi', item['DOI'].lower()) in wanted
+                 or any(('isbn', isbn.replace('-', '')) in wanted for isbn in item['ISBN'])]
+        return {'message': {'items': self._select(found, params)}}
+
+    @staticmethod
+    def _select(records, params):
+        fields = params.get('select', '').split(',') if params.get('select') else None
+        return [{k: v for k, v in r.items() if fields is None or k in fields} for r in records]
+
+
+@pytest.fixture
+def enricher(tmp_path, monkeypatch):
+    from agent import BiblioEnricher
+
+    enricher = BiblioEnricher(vault_path=str(tmp_path))
+    apis = FakeApis()
+    monkeypatch.setattr(enricher.http, 'get_json', apis.get_json)
+    enricher.apis = apis
+    return enricher
+
+
+def test_bulk_answers_are_mapped_back_to_each_identifier(enricher):
+    identifiers = [{'type': 'doi', 'value': v} for v in ('10.5555/a', '10.5555/b', '10.5555/c', '10.5555/d')]
+    identifiers += [{'type': 'openalex', 'value': 'W3'}, {'type': 'openalex', 'value': 'W2'},
+                    {'type': 'doi', 'value': '10.5555/inconnu'}]
+
+    resolved = enricher.resolve_identifiers(identifiers)
+
+    assert {key: r['title'] for key, r in resolved.items()} == {
+        ('doi', '10.5555/a'): 'Titre A', ('doi', '10.5555/b'): 'Titre B',
+        ('doi', '10.5555/c'): 'Titre C', ('doi', '10.5555/d'): 'Titre D',
+        ('openalex', 'W3'): 'Titre W3', ('openalex', 'W2'): 'Titre B',
+    }
+    assert resolved[('doi', '10.5555/c')]['authors'] == ['Cé, Claire']
+    assert all(r['confidence'] == 1.0 for r in resolved.values())
+    # Un lot par API et par type d'identifiant
+    assert sorted(api for api, _ in enricher.apis.requests) == ['crossref', 'openalex', 'openalex']
+
+
+def test_bulk_answers_are_cached_per_identifier(enricher, monkeypatch):
+    monkeypatch.setattr(config, 'BULK_LOOKUP_SIZE', 2)
+    identifiers = [{'type': 'doi', 'value': v} for v in ('10.5555/a', '10.5555/b')]
+    first = enricher.resolve_identifiers(identifiers)
+    sent = len(enricher.apis.requests)
+
+    # Autre découpage, mêmes notices : servies par le cache sans requête
+    assert enricher.resolve_identifiers(identifiers[1:]) == {('doi', '10.5555/b'): first[('doi', '10.5555/b')]}
+    assert len(enricher.apis.requests) == sent
+
+
+def test_multi_isbn_batch_is_mapped_back(enricher):
+    identifiers = [{'type': 'isbn', 'value': '9780262581080'}, {'type': 'isbn', 'value': '0262581086'},
+                   {'type': 'isbn', 'value': '9999999999'}]
+
+    resolved = enricher.resolve_identifiers(identifiers)
+
+    assert {key: r['title'] for key, r in resolved.items()} == {
+        ('isbn', '9780262581080'): 'Titre C', ('isbn', '0262581086'): 'Titre D',
+    }
+    assert enricher.apis.requests == [('crossref', 'isbn:9780262581080,isbn:0262581086,isbn:9999999999')]
@@ -0,0 +1,63 @@
+"""Tests des caches persistants"""
+
+import itertools
+
+import cache
+from cache import HttpCache, LLMCache
+
+
+def test_llm_cache_roundtrip_and_refresh(tmp_path):
+    path = tmp_path / 'llm.sqlite'
+    key = LLMCache.make_key('prompt', 'llama3.1:8b', '2')
+    llm_cache = LLMCache(path, max_entries=10, max_age_days=1)
+    assert llm_cache.get(key) is None
+    llm_cache.set(key, {'author': 'Habermas'}, 'llama3.1:8b', '2')
+    assert llm_cache.get(key) == {'author': 'Habermas'}
+    assert (llm_cache.hits, llm_cache.misses) == (1, 1)
+    llm_cache.close()
+
+    refreshed = LLMCache(path, max_entries=10, max_age_days=1, refresh=True)
+    assert refreshed.get(key) is None
+    refreshed.close()
+
+
+def test_llm_cache_key_depends_on_model_and_prompt_version():
+    keys = {LLMCache.make_key('prompt', model, version)
+            for model in ('a', 'b') for version in ('1', '2')}
+    assert len(keys) == 4
+
+
+def test_llm_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    # Horloge strictement croissante : un accès par seconde
+    clock = itertools.count(1_000_000)
+    monkeypatch.setattr(cache.time, 'time', lambda: next(clock))
+
+    llm_cache = LLMCache(tmp_path / 'llm.sqlite', max_entries=2, max_age_days=1)
+    for i in range(3):
+        llm_cache.set(str(i), {'i': i}, 'm', '1')
+    llm_cache.get('0')
+    llm_cache.evict()
+    assert [k for k in ('0', '1', '2') if llm_cache.get(k) is not None] == ['0', '2']
+    llm_cache.close()
+
+
+def test_http_cache_key_ignores_param_order_spacing_and_mailto():
+    key = HttpCache.make_key('https://api.openalex.org/works/',
+                             {'search': 'public  sphere', 'per_page': 5, 'mailto': 'a@b.fr'})
+    assert key == HttpCache.make_key('https://api.openalex.org/works',
+                                     {'PER_PAGE': 5, 'search': 'public sphere'})
+    assert key != HttpCache.make_key('https://api.openalex.org/works', {'search': 'public'})
+
+
+def test_http_cache_stale_entry_keeps_validators_until_touched(tmp_path):
+    http_cache = HttpCache(tmp_path / 'http.sqlite', max_entries=10)
+    http_cache.set('k', 'https://api.crossref.org/works', '{}', etag='"v1"', ttl=-1)
+    entry = http_cache.get('k')
+    assert entry['fresh'] is False
+    assert (entry['body'], entry['etag']) == ('{}', '"v1"')
+
+    http_cache.touch('k', ttl=60)
+    assert http_cache.get('k')['fresh'] is True
+    http_cache.set('forever', 'https://api.crossref.org/works', '{}', ttl=float('inf'))
+    assert http_cache.get('forever')['fresh'] is True
+    http_cache.close()
@@ -0,0 +1,105 @@
+"""Tests de l'index des citations"""
+
+from citation_index import CitationIndex
+
+
+def make_result(file: str, line: int, author: str, year: str, doi: str) -> dict:
+    return {
+        'file': file, 'line': line, 'raw_text': f'{author} {year}', 'comment': '',
+        'full_reference': None,
+        'extracted_metadata': {'author': author, 'title': 'Titre', 'year': year, 'confidence': 0.9},
+        'api_result': {'source': 'openalex', 'doi': doi, 'title': 'Titre', 'authors': [author],
+                       'year': int(year), 'url': f'https://doi.org/{doi}', 'confidence': 0.9},
+    }
+
+
+def test_query_by_author_year_doi_and_file(tmp_path):
+    index = CitationIndex(tmp_path / 'index.db')
+    index.start_run()
+    index.add(make_result('Chapitre 1/a.md', 1, 'Habermas', '1992', '10.5555/habermas'))
+    index.add(make_result('Chapitre 2/b.md', 3, 'Latour', '1987', '10.5555/latour'))
+    unresolved = make_result('Chapitre 2/b.md', 5, 'Bourdieu', '1979', '')
+    unresolved['api_result'] = None
+    index.add(unresolved)
+    index.commit()
+
+    assert [o['line'] for o in index.query(author='Habermas, Jürgen')] == [1]
+    assert [o['line'] for o in index.query(year='1980-1995')] == [1, 3]
+    assert index.query(doi='https://doi.org/10.5555/LATOUR')[0]['work']['title'] == 'Titre'
+    assert [o['line'] for o in index.query(file='Chapitre 2/*')] == [3, 5]
+    assert index.query(author='Bourdieu', year='1979')[0]['work'] is None
+    assert index.stats() == {'files': 2, 'occurrences': 3, 'resolved': 2, 'works': 2}
+    index.close()
+
+
+def test_prune_removes_deleted_notes_and_their_works(tmp_path):
+    vault = tmp_path / 'vault'
+    vault.mkdir()
+    (vault / 'a.md').write_text('a', encoding='utf-8')
+    (vault / 'b.md').write_text('b', encoding='utf-8')
+
+    index = CitationIndex(tmp_path / 'index.db')
+    index.start_run()
+    index.add(make_result('a.md', 1, 'Habermas', '1992', '10.5555/habermas'))
+    index.add(make_result('b.md', 3, 'Latour', '1987', '10.5555/latour'))
+    index.add(make_result('b.md', 5, 'Habermas', '1992', '10.5555/habermas'))
+    index.commit()
+    assert index.stats() == {'files': 2, 'occurrences': 3, 'resolved': 3, 'works': 2}
+
+    (vault / 'b.md').unlink()
+    index.prune(vault)
+    assert index.stats() == {'files': 1, 'occurrences': 1, 'resolved': 1, 'works': 1}
+    assert index.query(doi='10.5555/latour') == []
+    assert [o['line'] for o in index.query(author='Habermas', year='1992')] == [1]
+    index.close()
+
+
+def test_new_run_replaces_a_note_occurrences(tmp_path):
+    index = CitationIndex(tmp_path / 'index.db')
+    index.start_run()
+    index.add(make_result('a.md', 1, 'Habermas', '1992', '10.5555/habermas'))
+    index.commit()
+
+    index.start_run()
+    index.add(make_result('a.md', 2, 'Latour', '1987', '10.5555/latour'))
+    index.commit()
+    assert index.stats()['works'] == 1
+    assert [o['line'] for o in index.query(file='a.md')] == [2]
+    index.close()
+
+
+def test_replace_file_drops_a_note_without_references(tmp_path):
+    index = CitationIndex(tmp_path / 'index.db')
+    index.start_run()
+    index.add(make_result('a.md', 1, 'Habermas', '1992', '10.5555/habermas'))
+    index.add(make_result('b.md', 3, 'Latour', '1987', '10.5555/latour'))
+    index.commit()
+
+    # Tous les tags de a.md retirés : la note est relue sans aucune référence
+    index.start_run()
+    index.replace_file('a.md')
+    index.commit()
+    assert index.stats() == {'files': 1, 'occurrences': 1, 'resolved': 1, 'works': 1}
+    assert index.query(author='Habermas') == []
+    index.close()
+
+
+def test_vault_pass_clears_a_note_whose_tags_were_all_removed(tmp_path):
+    from agent import BiblioEnricher
+
+    enricher = BiblioEnricher(vault_path=str(tmp_path))
+    index = enricher.citation_index
+    index.start_run()
+    index.add(make_result('a.md', 1, 'Habermas', '1992', '10.5555/habermas'))
+    index.commit()
+    (tmp_path / 'a.md').write_text('Plus aucune citation.\n', encoding='utf-8')
+
+    assert list(enricher.process_vault()) == []
+    assert index.stats() == {'files': 0, 'occurrences': 0, 'resolved': 0, 'works': 0}
+
+    # Fichier seul (agent.py note) relu sans référence : même nettoyage
+    index.start_run()
+    index.add(make_result('b.md', 2, 'Latour', '1987', '10.5555/latour'))
+    index.commit()
+    enricher.forget_note('b')
+    assert index.stats()['occurrences'] == 0
@@ -0,0 +1,42 @@
+"""Tests du parseur déterministe de références (voie rapide sans LLM)"""
+
+import pytest
+
+from citation_parser import parse_reference
+
+
+@pytest.mark.parametrize('text, author, title, year, fmt', [
+    ('Habermas, J. (1992). The structural transformation of the public sphere. MIT Press.',
+     'Habermas, J', 'The structural transformation of the public sphere', '1992', 'apa'),
+    ('Habermas, Jürgen. 1992. The Structural Transformation of the Public Sphere. '
+     'Cambridge: MIT Press.',
+     'Habermas, Jürgen', 'The Structural Transformation of the Public Sphere', '1992', 'chicago-date'),
+    ('Latour, Bruno. Science in Action. Cambridge: Harvard University Press, 1987.',
+     'Latour, Bruno', 'Science in Action', '1987', 'chicago-notes'),
+    ('DiMaggio, Paul, and Walter W. Powell. 1983. "The Iron Cage Revisited." '
+     'American Sociological Review 48 (2): 147-160.',
+     'DiMaggio, Paul', 'The Iron Cage Revisited', '1983', 'chicago-date'),
+])
+def test_well_formed_references(text, author, title, year, fmt):
+    metadata = parse_reference(text)
+    assert (metadata['author'], metadata['title'], metadata['year'], metadata['format']) == \
+        (author, title, year, fmt)
+    assert metadata['confidence'] >= 0.8
+
+
+def test_multiline_entry_and_list_marker_are_normalized():
+    metadata = parse_reference('- Habermas, J. (1992).\n  The structural transformation\n  of the public sphere.')
+    assert metadata['title'] == 'The structural transformation of the public sphere'
+
+
+@pytest.mark.parametrize('text', ['Habermas 1992', 'voir chapitre 3', ''])
+def test_unrecognized_text_goes_to_the_llm(text):
+    assert parse_reference(text) is None
+
+
+def test_suspicious_results_lose_confidence():
+    clean = parse_reference('Habermas, J. (1992). The structural transformation of the public sphere.')
+    noisy = parse_reference('Habermas, J. (1992). Th3 str|uct#ral tr@nsf0rm. MIT.')
+    short = parse_reference('Habermas, J. (1992). Faktizität. MIT.')
+    assert noisy['confidence'] < clean['confidence']
+    assert short['confidence'] < clean['confidence']
@@ -0,0 +1,26 @@
+"""Tests des valeurs par défaut de la configuration"""
+
+from types import ModuleType
+
+import pytest
+
+import config_defaults
+
+
+def test_defaults_come_from_the_example():
+    defaults = config_defaults.load_defaults()
+    assert defaults['RANKING_WEIGHTS'] == {'title': 0.55, 'author': 0.2, 'year': 0.15, 'doi': 0.1}
+    assert sum(defaults['RANKING_WEIGHTS'].values()) == pytest.approx(1.0)
+    # Réglages à renseigner : jamais complétés automatiquement
+    assert not config_defaults.REQUIRED & set(defaults)
+
+
+def test_apply_completes_old_config_without_overriding():
+    old = ModuleType('config')
+    old.VAULT_PATH = '..'
+    old.HTTP_WORKERS = 2
+    config_defaults.apply(old)
+    assert old.HTTP_WORKERS == 2
+    assert old.METRICS_FORMATS == ['json']
+    assert not hasattr(old, 'OLLAMA_MODEL')
+    assert all(hasattr(old, name) for name in config_defaults.load_defaults())
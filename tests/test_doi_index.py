@@ -0,0 +1,61 @@
+"""Tests de l'index DOI local"""
+
+import gzip
+import json
+
+import pytest
+
+from doi_index import OfflineIndex, build_index, parse_record
+
+OPENALEX_WORK = {
+    'doi': 'https://doi.org/10.7551/MITPRESS/2253.001.0001',
+    'title': 'The Structural Transformation of the Public Sphere',
+    'authorships': [{'author': {'display_name': 'Jürgen Habermas'}}],
+    'publication_year': 1992,
+}
+CROSSREF_ITEM = {
+    'DOI': '10.5555/latour',
+    'title': ['Science in Action'],
+    'author': [{'family': 'Latour', 'given': 'Bruno'}],
+    'issued': {'date-parts': [[1987, 1, 1]]},
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    openalex = tmp_path / 'works_part_000.gz'
+    with gzip.open(openalex, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps(OPENALEX_WORK) + '\n')
+    crossref = tmp_path / 'crossref.jsonl'
+    crossref.write_text('\n'.join([json.dumps(CROSSREF_ITEM), '{illisible', '',
+                                   json.dumps({'DOI': '10.5555/sans-titre'})]), encoding='utf-8')
+
+    db_path = tmp_path / 'doi_index.db'
+    assert build_index([openalex, crossref], db_path) == 2
+    offline = OfflineIndex(db_path)
+    yield offline
+    offline.close()
+
+
+def test_candidates_by_title_words(index):
+    candidates = index.candidates('Habermas, Jürgen', 'Structural transformation of the public sphere', '1992')
+    assert [c['doi'] for c in candidates] == ['10.7551/mitpress/2253.001.0001']
+    assert candidates[0]['authors'] == ['Jürgen Habermas']
+    assert candidates[0]['source'] == 'Local (OpenAlex)'
+    assert index.candidates('Latour', 'the and for', '1987') == []
+
+
+def test_lookup_doi_is_case_and_prefix_insensitive(index):
+    found = index.lookup_doi('https://doi.org/10.5555/LATOUR')
+    assert (found['title'], found['year'], found['authors']) == ('Science in Action', 1987, ['Latour, Bruno'])
+    assert index.lookup_doi('10.5555/absent') is None
+
+
+def test_parse_record_skips_works_without_doi_or_title():
+    assert parse_record({'DOI': '10.5555/x'}) is None
+    assert parse_record({'title': 'Sans DOI', 'authorships': []}) is None
+
+
+def test_missing_index(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        OfflineIndex(tmp_path / 'absent.db')
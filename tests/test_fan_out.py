@@ -0,0 +1,47 @@
+"""Tests du dédoublonnage des références et de la recopie des résultats"""
+
+from collections import deque
+
+
+def make_ref(line: int, text: str) -> dict:
+    return {'file': 'note.md', 'line': line, 'raw_text': text, 'comment': text,
+            'context': f'contexte {line}', 'context_range': [line, line], 'line_text': text}
+
+
+def test_duplicates_are_enriched_once_and_fanned_out_in_order(tmp_path):
+    from agent import BiblioEnricher
+
+    enricher = BiblioEnricher(vault_path=str(tmp_path), use_cache=False)
+    refs = [make_ref(1, 'Habermas 1992'), make_ref(5, 'Latour 1987'), make_ref(9, 'habermas, 1992')]
+    occurrences = deque()
+
+    jobs = list(enricher._unique_jobs(iter(refs), occurrences))
+    assert [job['ref']['line'] for job in jobs] == [1, 5]
+    assert enricher.last_unique_count == 2
+
+    unique = [{**job['ref'], 'api_result': {'doi': f"10.5555/{job['ref']['line']}"}} for job in jobs]
+    results = list(enricher._fan_out(iter(unique), occurrences))
+    assert [(r['line'], r['raw_text'], r['api_result']['doi']) for r in results] == [
+        (1, 'Habermas 1992', '10.5555/1'),
+        (5, 'Latour 1987', '10.5555/5'),
+        (9, 'habermas, 1992', '10.5555/1'),
+    ]
+    assert results[2]['context'] == 'contexte 9'
+
+
+def test_fan_out_copies_results_with_each_occurrence_context(tmp_path):
+    from agent import BiblioEnricher
+
+    enricher = BiblioEnricher(vault_path=str(tmp_path), use_cache=False)
+    refs = [make_ref(1, 'Habermas 1992'), make_ref(5, 'Latour 1987'), make_ref(9, 'Habermas 1992')]
+    occurrences = deque((ref, job, 0.0) for ref, job in zip(refs, (0, 1, 0)))
+    unique = [{**refs[0], 'api_result': {'doi': '10.5555/h'}},
+              {**refs[1], 'api_result': None}]
+
+    results = list(enricher._fan_out(iter(unique), occurrences))
+
+    assert results[0] is unique[0]
+    assert [r['line'] for r in results] == [1, 5, 9]
+    assert results[2]['context'] == 'contexte 9'
+    assert results[2]['api_result'] == {'doi': '10.5555/h'}
+    assert not occurrences
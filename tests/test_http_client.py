@@ -0,0 +1,9 @@
+"""Tests du client HTTP partagé"""
+
+import http_client
+
+
+def test_loads_without_orjson(monkeypatch):
+    monkeypatch.setattr(http_client, 'orjson', None)
+    assert http_client.loads(b'{"doi": "10.1/abc", "n": [1, 2]}') == {'doi': '10.1/abc', 'n': [1, 2]}
+    assert http_client.loads('{"title": "Sph\\u00e8re"}') == {'title': 'Sphère'}
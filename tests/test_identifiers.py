@@ -0,0 +1,38 @@
+"""Tests de la détection d'identifiants"""
+
+import pytest
+
+from identifiers import find_doi, find_identifiers, find_isbn
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('==(Foo 2001, https://doi.org/10.5555/ed4070bceffd)==', '10.5555/ed4070bceffd'),
+    ('Voir doi:10.5555/abc.', '10.5555/abc'),
+    ('**10.5555/abc.d**', '10.5555/abc.d'),
+    ('`10.5555/xyz`', '10.5555/xyz'),
+    ('10.5555/abc==suite', '10.5555/abc'),
+    ('(doi:10.5555/abc)', '10.5555/abc'),
+    ('10.1016/0001-8708(79)90001-X', '10.1016/0001-8708(79)90001-x'),
+    ('10.1000/abc(12).', '10.1000/abc(12)'),
+])
+def test_find_doi_boundaries(text, expected):
+    assert find_doi(text) == expected
+
+
+def test_find_identifiers_order_and_dedup():
+    found = find_identifiers([
+        'Habermas 1992, doi:10.7551/mitpress/2253.001.0001',
+        None,
+        'https://openalex.org/W2741809807 ISBN 978-0-262-58108-0 10.7551/mitpress/2253.001.0001',
+    ])
+    assert found == [
+        {'type': 'doi', 'value': '10.7551/mitpress/2253.001.0001'},
+        {'type': 'openalex', 'value': 'W2741809807'},
+        {'type': 'isbn', 'value': '9780262581080'},
+    ]
+
+
+def test_find_isbn_checks_the_check_digit():
+    assert find_isbn('ISBN 0-262-58108-6') == '0262581086'
+    assert find_isbn('ISBN-13: 978-0-262-58108-0') == '9780262581080'
+    assert find_isbn('ISBN 978-0-262-58108-1') is None
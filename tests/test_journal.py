@@ -0,0 +1,53 @@
+"""Tests du journal de reprise"""
+
+import json
+
+from journal import Journal, journal_key
+
+
+def make_ref(line: int, text: str = 'Habermas 1992') -> dict:
+    return {'file': 'note.md', 'line': line, 'raw_text': text, 'line_text': f'==({text})==',
+            'context': 'contexte', 'api_result': None}
+
+
+def test_resume_skips_truncated_line(tmp_path):
+    path = tmp_path / 'note.journal.jsonl'
+    journal = Journal(path, fsync=False)
+    journal.append(make_ref(1))
+    journal.append(make_ref(2))
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"key": "note.md:3:')  # arrêt brutal pendant l'écriture
+
+    resumed = Journal(path, resume=True, fsync=False)
+    assert len(resumed.completed) == 2
+    assert resumed.get(make_ref(1)) is not None
+    assert 'context' not in resumed.get(make_ref(1))
+    # Ligne modifiée depuis l'interruption : à ré-enrichir
+    assert resumed.get(make_ref(1, 'Habermas 1993')) is None
+
+    resumed.append(make_ref(3))
+    resumed.close()
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert json.loads(lines[-1])['key'] == journal_key(make_ref(3))
+
+
+def test_resumed_count_is_per_call(tmp_path, capsys):
+    from agent import BiblioEnricher
+
+    enricher = BiblioEnricher(vault_path=str(tmp_path), use_cache=False)
+    path = tmp_path / 'vault.journal.jsonl'
+    journal = Journal(path, fsync=False)
+    notes = [[make_ref(line) | {'file': name} for line in (1, 2)] for name in ('a.md', 'b.md')]
+    for refs in notes:
+        for ref in refs:
+            journal.append(ref)
+    journal.close()
+
+    journal = Journal(path, resume=True, fsync=False)
+
+    for refs in notes:
+        capsys.readouterr()
+        assert len(list(enricher.stream_references(refs, journal))) == 2
+        assert '2 référence(s) reprise(s)' in capsys.readouterr().out
+    journal.close()
@@ -0,0 +1,49 @@
+"""Tests de l'extraction LLM groupée (découpage des lots, lecture des réponses)"""
+
+import json
+
+import pytest
+
+import config
+
+
+@pytest.fixture
+def enricher(tmp_path):
+    from agent import BiblioEnricher
+
+    return BiblioEnricher(vault_path=str(tmp_path), use_cache=False)
+
+
+def metadata(author: str, **extra) -> dict:
+    return {'author': author, 'title': f'Titre {author}', 'year': '1992', 'confidence': 0.9, **extra}
+
+
+def test_items_are_matched_by_id(enricher):
+    response = json.dumps({'references': [metadata('Latour', id=2), metadata('Habermas', id=1)]})
+    parsed = enricher._parse_batch_response(response, 2)
+    assert parsed == {0: metadata('Habermas'), 1: metadata('Latour')}
+
+
+def test_bare_array_in_fences_is_matched_by_position(enricher):
+    response = '```json\n' + json.dumps([metadata('Habermas'), metadata('Latour')]) + '\n```'
+    parsed = enricher._parse_batch_response(response, 2)
+    assert [parsed[i]['author'] for i in (0, 1)] == ['Habermas', 'Latour']
+
+
+def test_truncated_response_keeps_complete_items(enricher):
+    complete = json.dumps(metadata('Habermas', id=1))
+    response = '{"references": [' + complete + ', {"id": 2, "author": "Lat'
+    assert enricher._parse_batch_response(response, 2) == {0: metadata('Habermas')}
+
+
+def test_invalid_and_out_of_range_items_are_dropped(enricher):
+    response = json.dumps([{'author': 'Habermas'}, metadata('Latour', id=7), metadata('Bourdieu', id=2)])
+    assert enricher._parse_batch_response(response, 2) == {1: metadata('Bourdieu')}
+
+
+def test_batches_respect_size_and_token_budget(enricher, monkeypatch):
+    monkeypatch.setattr(config, 'LLM_BATCH_SIZE', 3)
+    monkeypatch.setattr(config, 'LLM_BATCH_TOKEN_BUDGET', 300)
+    pending = [(i, 'x' * (400 if i == 4 else 40), f'k{i}') for i in range(7)]
+    batches = [[i for i, _, _ in batch] for batch in enricher._split_llm_batches(pending)]
+    assert batches == [[0, 1, 2], [3, 4], [5, 6]]
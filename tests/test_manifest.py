@@ -0,0 +1,86 @@
+"""Tests du manifeste du vault"""
+
+import os
+
+from manifest import VaultManifest, reference_key
+
+
+def make_result(line: int, text: str) -> dict:
+    return {'file': 'note.md', 'line': line, 'raw_text': text, 'line_text': f'==({text})==',
+            'comment': text, 'context': 'contexte', 'api_result': None}
+
+
+def test_unchanged_touched_and_edited_notes(tmp_path):
+    note = tmp_path / 'note.md'
+    note.write_text('Habermas 1992\n', encoding='utf-8')
+    manifest = VaultManifest(tmp_path / 'manifest.json')
+
+    sha = manifest.check('note.md', note)
+    assert sha is not None
+    manifest.update('note.md', note, sha, [make_result(1, 'Habermas 1992')])
+    manifest.save()
+
+    reloaded = VaultManifest(tmp_path / 'manifest.json')
+    assert reloaded.check('note.md', note) is None
+
+    # Même contenu, nouveau mtime : pas de ré-enrichissement
+    stat = note.stat()
+    os.utime(note, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert reloaded.check('note.md', note) is None
+
+    note.write_text('Habermas 1992\nLatour 1987\n', encoding='utf-8')
+    assert reloaded.check('note.md', note) is not None
+
+    previous = reloaded.previous_results('note.md')
+    assert reference_key(make_result(1, 'Habermas 1992')) in previous
+    assert 'context' not in previous[reference_key(make_result(1, 'Habermas 1992'))]
+
+
+def test_prune_forgets_deleted_notes(tmp_path):
+    note = tmp_path / 'note.md'
+    note.write_text('x', encoding='utf-8')
+    manifest = VaultManifest(tmp_path / 'manifest.json')
+    manifest.update('note.md', note, manifest.check('note.md', note), [])
+    note.unlink()
+    manifest.prune(tmp_path)
+    assert manifest.files == {}
+
+
+def test_unreadable_manifest_starts_empty(tmp_path, capsys):
+    path = tmp_path / 'manifest.json'
+    path.write_text('{tronqué', encoding='utf-8')
+    assert VaultManifest(path).files == {}
+
+
+def test_vault_notes_are_streamed_one_at_a_time(tmp_path, monkeypatch):
+    from agent import BiblioEnricher
+
+    (tmp_path / 'a.md').write_text('==(Habermas 1992)== %% #reflitterature Habermas %%\n'
+                                   '==(Latour 1987)== %% #reflitterature Latour %%\n', encoding='utf-8')
+    (tmp_path / 'b.md').write_text('==(Bourdieu 1979)== %% #reflitterature Bourdieu %%\n', encoding='utf-8')
+    enricher = BiblioEnricher(vault_path=str(tmp_path))
+    events, enriched = [], []
+
+    def fake_iter_enriched(references, journal=None):
+        for ref in references:
+            enriched.append(ref['raw_text'])
+            yield {**ref, 'api_result': None, 'extracted_metadata': {}, 'full_reference': None}
+
+    scan_file = enricher.scan_file
+    monkeypatch.setattr(enricher, 'iter_enriched', fake_iter_enriched)
+    monkeypatch.setattr(enricher, 'scan_file', lambda rel: events.append(('scan', rel)) or scan_file(rel))
+
+    for result in enricher.process_vault():
+        events.append((result['file'], result['line']))
+
+    # a.md est rendue (et peut être écrite) avant que b.md ne soit lue
+    assert events == [('scan', 'a.md'), ('a.md', 1), ('a.md', 2), ('scan', 'b.md'), ('b.md', 1)]
+
+    # Passage suivant : seule la référence ajoutée est enrichie, les autres sont reprises
+    enriched.clear()
+    (tmp_path / 'b.md').write_text('Introduction\n==(Bourdieu 1979)== %% #reflitterature Bourdieu %%\n'
+                                   '==(Weber 1905)== %% #reflitterature Weber %%\n', encoding='utf-8')
+    results = list(enricher.process_vault())
+    assert enriched == ['Weber 1905']
+    assert [(r['file'], r['line'], r['raw_text']) for r in results] == [
+        ('b.md', 2, 'Bourdieu 1979'), ('b.md', 3, 'Weber 1905')]
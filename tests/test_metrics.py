@@ -0,0 +1,66 @@
+"""Tests des métriques de l'enrichisseur"""
+
+import json
+
+import pytest
+
+from metrics import Histogram, Metrics
+
+
+def test_snapshot_groups_counters_and_gauges_by_label():
+    metrics = Metrics()
+    metrics.incr('extraction_path', 'llm')
+    metrics.incr('extraction_path', 'llm')
+    metrics.incr('extraction_path', 'parser')
+    metrics.incr('resumed_references')
+    metrics.set_gauge('cache_hit_ratio', 0.5, 'http')
+    snapshot = metrics.snapshot()
+    assert snapshot['counters'] == {'extraction_path': {'llm': 2, 'parser': 1}, 'resumed_references': 1}
+    assert snapshot['gauges'] == {'cache_hit_ratio': {'http': 0.5}}
+    assert metrics.count('extraction_path', 'llm') == 2
+
+
+def test_timer_counts_errors_and_durations():
+    metrics = Metrics()
+    with metrics.timer('llm'):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.timer('llm'):
+            raise ValueError
+    stage = metrics.snapshot()['stages']['llm']
+    assert (stage['count'], stage['errors']) == (2, 1)
+
+
+def test_histogram_quantiles_stay_within_observed_range():
+    histogram = Histogram()
+    for value in (0.002, 0.003, 0.004, 0.2, 3.0):
+        histogram.observe(value)
+    assert 0.002 <= histogram.quantile(0.5) <= 0.005
+    assert histogram.quantile(0.99) <= 3.0
+    assert histogram.to_dict()['count'] == 5
+
+
+def test_prometheus_and_trace_exports(tmp_path):
+    metrics = Metrics(trace=True)
+    metrics.observe('api', 0.02)
+    metrics.incr('search_fallback', 'crossref')
+    text = metrics.to_prometheus()
+    assert 'biblio_stage_duration_seconds_bucket{stage="api",le="0.025"} 1' in text
+    assert 'biblio_stage_duration_seconds_count{stage="api"} 1' in text
+    assert 'biblio_search_fallback_total{label="crossref"} 1' in text
+
+    metrics.write_chrome_trace(tmp_path / 'trace.json')
+    events = json.loads((tmp_path / 'trace.json').read_text())['traceEvents']
+    assert [(e['name'], e['ph']) for e in events] == [('api', 'X')]
+
+
+def test_collect_metrics_includes_async_requests(tmp_path):
+    from agent import BiblioEnricher
+
+    enricher = BiblioEnricher(vault_path=str(tmp_path), use_cache=False)
+    enricher.http.requests_sent = 3
+    enricher.async_http_stats.update({'requests_sent': 5, 'revalidated': 2})
+
+    gauges = enricher.collect_metrics()['gauges']
+    assert gauges['http_requests_sent'] == 8
+    assert gauges['http_revalidated'] == 2
@@ -0,0 +1,89 @@
+"""Tests de l'exécuteur en pipeline"""
+
+import random
+import threading
+import time
+
+import pytest
+
+from pipeline import Pipeline
+
+
+def slow_double(x: int) -> int:
+    time.sleep(random.random() / 500)
+    return x * 2
+
+
+def test_results_keep_input_order():
+    pipeline = Pipeline([
+        ('double', slow_double, 4),
+        ('batch', lambda items: [x + 1 for x in items], 2, 8),
+    ], queue_size=4)
+    assert list(pipeline.run(iter(range(200)))) == [x * 2 + 1 for x in range(200)]
+
+
+def test_stage_error_is_raised_at_its_position():
+    def fail_on_three(x):
+        if x == 3:
+            raise ValueError('boom')
+        return x
+
+    results = []
+    with pytest.raises(ValueError, match='boom'):
+        for value in Pipeline([('check', fail_on_three, 2), ('id', lambda x: x, 1)]).run(range(6)):
+            results.append(value)
+    assert results == [0, 1, 2]
+
+
+def test_batched_stage_receives_lists():
+    sizes = []
+
+    def record(items):
+        sizes.append(len(items))
+        return items
+
+    assert list(Pipeline([('batch', record, 1, 5)]).run(range(12))) == list(range(12))
+    assert sum(sizes) == 12 and max(sizes) <= 5
+
+
+def wait_for_threads(count: int, timeout: float = 5.0):
+    """Attend que seuls `count` threads restent actifs"""
+    deadline = time.time() + timeout
+    while threading.active_count() > count and time.time() < deadline:
+        time.sleep(0.01)
+    return threading.active_count()
+
+
+def test_closing_early_stops_the_workers():
+    calls = []
+
+    def slow(x):
+        calls.append(x)
+        time.sleep(0.01)
+        return x
+
+    before = threading.active_count()
+    results = Pipeline([('slow', slow, 2), ('batch', lambda items: items, 1, 4)], queue_size=2).run(range(1000))
+    assert [next(results) for _ in range(3)] == [0, 1, 2]
+    results.close()
+
+    assert wait_for_threads(before) == before
+    # Entrée plus lue : seuls les éléments déjà en file ont pu être traités
+    assert len(calls) < 20
+
+
+def test_stage_error_stops_the_remaining_work():
+    calls = []
+
+    def fail_first(x):
+        calls.append(x)
+        if x == 0:
+            raise ValueError('boom')
+        time.sleep(0.01)
+        return x
+
+    before = threading.active_count()
+    with pytest.raises(ValueError):
+        list(Pipeline([('check', fail_first, 1)], queue_size=2).run(range(1000)))
+    assert wait_for_threads(before) == before
+    assert len(calls) < 10
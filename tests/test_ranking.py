@@ -0,0 +1,69 @@
+"""Tests du classement des candidats OpenAlex et CrossRef"""
+
+import pytest
+
+import config
+from ranking import author_score, normalize_doi, rank_candidates, year_score
+
+METADATA = {'author': 'Habermas, Jürgen', 'title': 'The Structural Transformation of the Public Sphere',
+            'year': '1992'}
+
+
+def candidate(source: str, doi: str, title: str, authors: list, year: int) -> dict:
+    return {'source': source, 'doi': doi, 'title': title, 'authors': authors, 'year': year,
+            'url': f'https://doi.org/{doi}'}
+
+
+def test_best_candidate_across_sources():
+    openalex = candidate('OpenAlex', '10.5555/review', 'A Review of Habermas', ['Smith, John'], 1993)
+    crossref = candidate('CrossRef', '10.7551/mitpress/2253.001.0001', METADATA['title'],
+                         ['Habermas, Jürgen'], 1991)
+    best = rank_candidates(METADATA, [openalex, crossref], config.RANKING_WEIGHTS)
+    assert best['source'] == 'CrossRef'
+    assert best['score_breakdown'] == {'title': 1.0, 'author': 1.0, 'year': 0.5, 'doi': 0.0}
+    assert best['confidence'] == pytest.approx(0.55 + 0.2 + 0.15 * 0.5)
+
+
+def test_doi_returned_by_both_sources_scores_higher():
+    title = 'Structural Transformation of the Public Sphere'
+    alone = candidate('OpenAlex', '10.5555/other', title, ['Jürgen Habermas'], 1992)
+    shared = [candidate('OpenAlex', 'https://doi.org/10.5555/ABC', title, ['Jürgen Habermas'], 1992),
+              candidate('CrossRef', '10.5555/abc', title, ['Habermas, Jürgen'], 1992)]
+    best = rank_candidates(METADATA, [alone] + shared, config.RANKING_WEIGHTS)
+    assert normalize_doi(best['doi']) == '10.5555/abc'
+    assert best['score_breakdown']['doi'] == 1.0
+
+
+def test_equal_scores_keep_input_order():
+    first = candidate('OpenAlex', '10.5555/a', METADATA['title'], ['Habermas'], 1992)
+    second = candidate('CrossRef', '10.5555/b', METADATA['title'], ['Habermas'], 1992)
+    assert rank_candidates(METADATA, [first, second], config.RANKING_WEIGHTS)['doi'] == '10.5555/a'
+
+
+def test_custom_weights_and_no_candidates():
+    only_title = {'title': 1.0, 'author': 0.0, 'year': 0.0, 'doi': 0.0}
+    found = candidate('CrossRef', '10.5555/a', METADATA['title'], [], None)
+    assert rank_candidates(METADATA, [found], only_title)['confidence'] == 1.0
+    assert rank_candidates(METADATA, [], config.RANKING_WEIGHTS) is None
+
+
+@pytest.mark.parametrize('authors, expected', [
+    (['Habermas, Jürgen', 'Rehg, William'], 1.0),
+    (['Rehg, William', 'Jürgen Habermas'], 0.8),
+    (['Rehg, William'], 0.0),
+    ([None], 0.0),
+])
+def test_author_score(authors, expected):
+    assert author_score('Habermas, J.', authors) == expected
+
+
+@pytest.mark.parametrize('year, candidate_year, expected', [
+    ('1992', 1992, 1.0), ('1992', '1993-05-01', 0.5), ('1992', 1995, 0.0), ('Unknown', 1992, 0.0),
+])
+def test_year_score(year, candidate_year, expected):
+    assert year_score(year, candidate_year) == expected
+
+
+@pytest.mark.parametrize('doi', ['https://doi.org/10.5555/ABC', 'doi:10.5555/abc', ' 10.5555/Abc '])
+def test_normalize_doi(doi):
+    assert normalize_doi(doi) == '10.5555/abc'
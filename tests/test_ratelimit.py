@@ -0,0 +1,43 @@
+"""Tests du débit, des reprises et du disjoncteur"""
+
+import pytest
+
+from ratelimit import CircuitOpenError, RateLimiter, parse_retry_after
+
+
+def make_limiter(**kwargs) -> RateLimiter:
+    options = dict(max_retries=2, backoff_base=0.01, backoff_max=0.05,
+                   breaker_threshold=3, breaker_cooldown=60)
+    options.update(kwargs)
+    return RateLimiter({'openalex': {'rate': 100, 'burst': 100}}, **options)
+
+
+def test_retry_after_and_retry_budget():
+    guard = make_limiter().guard('openalex')
+    assert guard.on_response(429, {'Retry-After': '0.2'}, attempt=0) >= 0.2
+    assert guard.on_response(503, {}, attempt=1) is not None
+    # Reprises épuisées : réponse définitive
+    assert guard.on_response(503, {}, attempt=2) is None
+    assert guard.retries == 2
+
+
+def test_breaker_opens_after_consecutive_failures():
+    guard = make_limiter(breaker_threshold=2).guard('crossref')
+    guard.before_request()
+    guard.on_error(attempt=0)
+    guard.on_response(500, {}, attempt=1)
+    with pytest.raises(CircuitOpenError):
+        guard.before_request()
+
+
+def test_success_resets_breaker():
+    guard = make_limiter(breaker_threshold=2).guard('openalex')
+    guard.on_error(attempt=0)
+    guard.on_response(200, {}, attempt=1)
+    guard.on_error(attempt=0)
+    assert guard.before_request() >= 0
+
+
+@pytest.mark.parametrize('value, expected', [('3', 3.0), ('-1', 0.0), (None, None), ('demain', None)])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
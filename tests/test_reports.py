@@ -0,0 +1,81 @@
+"""Tests des rapports écrits en flux"""
+
+import json
+
+import pytest
+
+from reports import (JsonArrayWriter, JsonLinesWriter, MarkdownReportWriter, ReportWriters,
+                     compact_context)
+
+
+def make_result(line: int, text: str, doi=None) -> dict:
+    api = {'source': 'OpenAlex', 'doi': doi, 'url': f'https://doi.org/{doi}', 'confidence': 0.4} if doi else None
+    return {
+        'file': 'note.md', 'line': line, 'raw_text': text, 'comment': text,
+        'context': 'ligne 1\nligne 2\n', 'context_range': [line - 1, line + 1],
+        'line_text': text, 'full_reference': None,
+        'extracted_metadata': {'author': text.split()[0], 'title': 'Titre', 'year': '1992'},
+        'api_result': api, 'final_confidence': 0.4,
+    }
+
+
+@pytest.mark.parametrize('count', [0, 1, 3])
+def test_json_array_matches_json_dump(tmp_path, count):
+    results = [make_result(i + 2, f'Habermas {1990 + i}') for i in range(count)]
+    writer = JsonArrayWriter(tmp_path / 'out.json')
+    for result in results:
+        writer.write(result)
+    writer.close()
+    assert json.loads((tmp_path / 'out.json').read_text(encoding='utf-8')) == results
+
+
+def test_json_lines_one_reference_per_line(tmp_path):
+    writer = JsonLinesWriter(tmp_path / 'out.jsonl')
+    writer.write(make_result(2, 'Sphère 1992'))
+    writer.write(make_result(5, 'Latour 1987'))
+    writer.close()
+    lines = (tmp_path / 'out.jsonl').read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['line'] for line in lines] == [2, 5]
+    assert 'Sphère' in lines[0]
+
+
+def test_markdown_summary_counts_unique_references(tmp_path):
+    writer = MarkdownReportWriter(tmp_path / 'report.md', 'note.md', 0.5, lambda r: r['raw_text'])
+    writer.write(make_result(2, 'Habermas 1992', doi='10.5555/h'))
+    writer.write(make_result(9, 'Habermas 1992', doi='10.5555/h'))
+    writer.write(make_result(12, 'Latour 1987'))
+    writer.close()
+    report = (tmp_path / 'report.md').read_text(encoding='utf-8')
+    assert report.count('## Référence ') == 3
+    assert '**Références uniques**: 2' in report
+    assert '**DOI trouvés**: 2/3' in report
+    assert '*Correspondance incertaine*' in report
+
+
+def test_compact_context_replaces_text_by_line_range():
+    compact = compact_context(make_result(4, 'Habermas 1992'))
+    assert compact['context'] == {'file': 'note.md', 'start': 3, 'end': 5}
+    assert 'context_range' not in compact
+    without_range = {'file': 'note.md', 'context': 'texte'}
+    assert compact_context(without_range) is without_range
+
+
+def test_report_writers_context_storage(tmp_path):
+    reports = ReportWriters([JsonLinesWriter(tmp_path / 'out.jsonl')], context_storage='reference')
+    reports.write(make_result(4, 'Habermas 1992', doi='10.5555/h'))
+    reports.write(make_result(8, 'Latour 1987'))
+    reports.close()
+    written = [json.loads(line) for line in (tmp_path / 'out.jsonl').read_text(encoding='utf-8').splitlines()]
+    assert [r['context'] for r in written] == [{'file': 'note.md', 'start': 3, 'end': 5},
+                                               {'file': 'note.md', 'start': 7, 'end': 9}]
+    assert (reports.count, reports.with_doi) == (2, 1)
+    assert reports.paths == [tmp_path / 'out.jsonl']
+
+
+def test_inline_context_drops_only_the_range(tmp_path):
+    reports = ReportWriters([JsonLinesWriter(tmp_path / 'out.jsonl')])
+    reports.write(make_result(4, 'Habermas 1992'))
+    reports.close()
+    written = json.loads((tmp_path / 'out.jsonl').read_text(encoding='utf-8'))
+    assert written['context'] == 'ligne 1\nligne 2\n'
+    assert 'context_range' not in written
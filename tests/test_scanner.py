@@ -0,0 +1,39 @@
+"""Tests du scan des notes en flux (fenêtre glissante)"""
+
+import config
+
+NOTE = """# Chapitre
+Texte avant.
+La sphère publique ==(Habermas 1992)== %% #reflitterature espace public %%
+Texte après.
+Fin de note %% #reflitterature Latour 1987 %%
+"""
+
+
+def test_iter_references_with_context_window(tmp_path, monkeypatch):
+    from agent import BiblioEnricher
+
+    monkeypatch.setattr(config, 'CONTEXT_LINES', 1)
+    (tmp_path / 'note.md').write_text(NOTE, encoding='utf-8')
+    enricher = BiblioEnricher(vault_path=str(tmp_path), use_cache=False)
+
+    refs = list(enricher.iter_references('note'))
+
+    assert [(r['line'], r['raw_text'], r['comment']) for r in refs] == [
+        (3, 'Habermas 1992', 'espace public'),
+        # Sans citation surlignée, le commentaire du tag sert de citation
+        (5, 'Latour 1987', 'Latour 1987'),
+    ]
+    lines = NOTE.splitlines(keepends=True)
+    assert refs[0]['context'] == ''.join(lines[1:4])
+    # Dernière ligne : contexte suivant tronqué par la fin du fichier
+    assert refs[1]['context'] == ''.join(lines[3:5])
+    assert all(r['file'] == 'note.md' for r in refs)
+
+
+def test_missing_note_yields_nothing(tmp_path, capsys):
+    from agent import BiblioEnricher
+
+    enricher = BiblioEnricher(vault_path=str(tmp_path), use_cache=False)
+    assert enricher.scan_file('absente.md') == []
+    assert "n'existe pas" in capsys.readouterr().out
@@ -0,0 +1,125 @@
+"""Tests du démon HTTP (validation des requêtes, sans enrichissement)"""
+
+import http.client
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+import server
+from metrics import Metrics
+
+
+@pytest.fixture
+def daemon():
+    enricher = SimpleNamespace(metrics=Metrics(), collect_metrics=lambda: {'gauges': {}})
+    handler = type('Handler', (server._Handler,), {'service': server.EnrichmentService(enricher)})
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(address, path, body: bytes, length: str):
+    conn = http.client.HTTPConnection(*address, timeout=5)
+    conn.putrequest('POST', path)
+    conn.putheader('Content-Length', length)
+    conn.endheaders()
+    conn.send(body)
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    return response.status, payload
+
+
+@pytest.mark.parametrize('length', ['abc', '-5', '1.5'])
+def test_malformed_content_length(daemon, length):
+    status, payload = post(daemon, '/enrich', b'{"text": "Habermas 1992"}', length)
+    assert status == 400
+    assert 'Content-Length' in payload['error']
+
+
+def test_body_too_large_is_rejected_before_reading(daemon):
+    status, _ = post(daemon, '/enrich', b'{}', str(server.MAX_BODY_SIZE + 1))
+    assert status == 413
+
+
+def test_missing_field(daemon):
+    status, payload = post(daemon, '/enrich', b'{}', '2')
+    assert status == 400
+    assert "'text'" in payload['error']
+
+
+def test_unknown_route_and_metrics(daemon):
+    status, payload = post(daemon, '/inconnue', b'{}', '2')
+    assert status == 404
+
+    conn = http.client.HTTPConnection(*daemon, timeout=5)
+    conn.request('GET', '/metrics')
+    response = conn.getresponse()
+    assert (response.status, json.loads(response.read())) == (200, {'gauges': {}})
+    conn.close()
+
+
+def test_prometheus_metrics_go_through_the_handler(daemon):
+    responses = []
+    for _ in range(2):
+        conn = http.client.HTTPConnection(*daemon, timeout=5)
+        conn.request('GET', '/metrics?format=prometheus')
+        response = conn.getresponse()
+        responses.append((response.status, response.getheader('Content-Type'), response.read().decode('utf-8')))
+        conn.close()
+
+    assert [r[:2] for r in responses] == [(200, server.PROMETHEUS_CONTENT_TYPE)] * 2
+    # La première requête est comptée et chronométrée comme les autres routes
+    assert 'server_requests' in responses[1][2]
+    assert 'stage="server_metrics"' in responses[1][2]
+
+
+class FakeEnricher:
+    """Enrichissement lent : mesure les passages simultanés et les recherches bibliographiques"""
+
+    def __init__(self):
+        self.metrics = Metrics()
+        self.lookups = []
+        self.running = self.max_running = 0
+        self._lock = threading.Lock()
+
+    def search_in_bibliography(self, text):
+        self.lookups.append(text)
+        return None
+
+    @staticmethod
+    def dedup_key(raw_text, full_ref):
+        return full_ref or raw_text
+
+    def iter_enriched(self, refs):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self._lock:
+            self.running -= 1
+        for ref in refs:
+            assert 'full_reference' in ref
+            yield {**ref, 'api_result': None}
+
+
+def test_pipeline_passes_are_bounded_and_lookups_done_once():
+    enricher = FakeEnricher()
+    service = server.EnrichmentService(enricher, workers=1)
+    texts = [f'Auteur {1990 + i}' for i in range(4)]
+    threads = [threading.Thread(target=service.enrich_text, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.close()
+
+    assert enricher.max_running == 1
+    assert sorted(enricher.lookups) == texts
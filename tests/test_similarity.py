@@ -0,0 +1,33 @@
+"""Tests de la similarité de titres"""
+
+from similarity import TitleMatcher, title_similarity
+
+TITLE = 'The Structural Transformation of the Public Sphere'
+
+
+def test_identical_after_normalization():
+    assert TitleMatcher('La Sphère publique !').score('la sphere publique') == 1.0
+
+
+def test_ocr_errors_score_above_unrelated_titles():
+    matcher = TitleMatcher(TITLE)
+    ocr, reordered, unrelated = matcher.scores([
+        'The Structural Transf0rmation of the Pub1ic Sphere',
+        'Public Sphere: The Structural Transformation',
+        'Science in Action',
+    ])
+    assert ocr > 0.6
+    assert reordered > 0.7
+    assert unrelated < 0.2
+
+
+def test_missing_titles_score_zero():
+    assert TitleMatcher(None).score(TITLE) == 0.0
+    assert TitleMatcher(TITLE).score('') == 0.0
+    assert title_similarity('?!', TITLE) == 0.0
+
+
+def test_scores_keep_candidate_order():
+    matcher = TitleMatcher(TITLE)
+    candidates = ['Science in Action', TITLE, None]
+    assert matcher.scores(candidates) == [matcher.score(c) for c in candidates]
@@ -0,0 +1,34 @@
+"""Tests de la surveillance du vault (scrutation, sans inotify)"""
+
+import threading
+
+import watcher
+
+
+def next_batch(vault_watcher):
+    batches = []
+    thread = threading.Thread(target=lambda: batches.append(next(vault_watcher.changes())),
+                              daemon=True)
+    thread.start()
+    return thread, batches
+
+
+def test_polling_reports_debounced_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(watcher, 'INotify', None)
+    (tmp_path / 'results').mkdir()
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'old.md').write_text('x', encoding='utf-8')
+
+    vault_watcher = watcher.VaultWatcher(tmp_path, ignored=[tmp_path / 'results'],
+                                         debounce=0.2, poll_interval=0.05)
+    assert vault_watcher.mode == 'polling'
+    thread, batches = next_batch(vault_watcher)
+
+    (tmp_path / 'sub' / 'new.md').write_text('Habermas 1992', encoding='utf-8')
+    (tmp_path / 'results' / 'report.md').write_text('ignoré', encoding='utf-8')
+    (tmp_path / 'notes.txt').write_text('ignoré', encoding='utf-8')
+    (tmp_path / 'old.md').unlink()
+
+    thread.join(timeout=5)
+    vault_watcher.close()
+    assert batches == [{'sub/new.md', 'old.md'}]
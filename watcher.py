@@ -0,0 +1,144 @@
+"""
+Surveillance du vault pour le mode --watch
+inotify si disponible (pip install inotify_simple, Linux), sinon scrutation
+des mtime ; les enregistrements rapprochés (sauvegarde automatique
+d'Obsidian) sont regroupés avant d'être signalés
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+
+def _walk_dirs(root: Path, ignored: Iterable[Path]) -> Iterator[Path]:
+    """Dossiers du vault (dossiers cachés et ignorés exclus)"""
+    ignored = {p.resolve() for p in ignored}
+    for dirpath, dirnames, _ in os.walk(root):
+        current = Path(dirpath)
+        dirnames[:] = [d for d in dirnames
+                       if not d.startswith('.') and (current / d).resolve() not in ignored]
+        yield current
+
+
+class _PollingBackend:
+    """Compare périodiquement mtime et taille des notes"""
+
+    def __init__(self, root: Path, ignored: Iterable[Path], interval: float):
+        self.root = root
+        self.ignored = list(ignored)
+        self.interval = interval
+        self._state = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        state = {}
+        for directory in _walk_dirs(self.root, self.ignored):
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.endswith('.md') and entry.is_file():
+                    stat = entry.stat()
+                    rel_path = Path(entry.path).relative_to(self.root).as_posix()
+                    state[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def poll(self, timeout: Optional[float]) -> Set[str]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        state = self._snapshot()
+        changed = {p for p, sig in state.items() if self._state.get(p) != sig}
+        changed |= self._state.keys() - state.keys()
+        self._state = state
+        return changed
+
+    def close(self):
+        pass
+
+
+class _InotifyBackend:
+    """Événements inotify sur tous les dossiers du vault (nouveaux dossiers inclus)"""
+
+    def __init__(self, root: Path, ignored: Iterable[Path]):
+        self.root = root
+        self.ignored = [p.resolve() for p in ignored]
+        self._inotify = INotify()
+        self._mask = (flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM
+                      | flags.CREATE | flags.DELETE)
+        self._dirs: Dict[int, Path] = {}
+        self._watch_tree(root)
+
+    def _watch_tree(self, directory: Path):
+        for path in _walk_dirs(directory, self.ignored):
+            try:
+                self._dirs[self._inotify.add_watch(path, self._mask)] = path
+            except OSError:
+                continue
+
+    def poll(self, timeout: Optional[float]) -> Set[str]:
+        events = self._inotify.read(timeout=None if timeout is None else int(timeout * 1000))
+        changed = set()
+        for event in events:
+            directory = self._dirs.get(event.wd)
+            if directory is None or not event.name:
+                continue
+            path = directory / event.name
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO) and not event.name.startswith('.'):
+                    self._watch_tree(path)
+                continue
+            if event.name.endswith('.md') and not any(p in path.parents for p in self.ignored):
+                changed.add(path.relative_to(self.root).as_posix())
+        return changed
+
+    def close(self):
+        self._inotify.close()
+
+
+class VaultWatcher:
+    """Signale les notes modifiées, créées ou supprimées, par rafales regroupées"""
+
+    def __init__(self, root: Path, ignored: Iterable[Path] = (), debounce: float = 2.0,
+                 poll_interval: float = 1.0):
+        """
+        Args:
+            root: Dossier du vault
+            ignored: Dossiers à ne pas surveiller (ex: dossier de sortie)
+            debounce: Délai sans nouvelle modification avant de signaler une rafale (secondes)
+            poll_interval: Période de scrutation sans inotify (secondes)
+        """
+        self.root = root
+        self.debounce = debounce
+        if INotify is not None:
+            self._backend = _InotifyBackend(root, ignored)
+            self.mode = 'inotify'
+        else:
+            self._backend = _PollingBackend(root, ignored, poll_interval)
+            self.mode = 'polling'
+
+    def changes(self) -> Iterator[Set[str]]:
+        """
+        Rafales de modifications, sans fin
+
+        Yields:
+            Chemins relatifs (POSIX) des notes .md touchées depuis la rafale précédente
+        """
+        pending: Set[str] = set()
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if pending else None
+            changed = self._backend.poll(timeout)
+            if changed:
+                pending |= changed
+                deadline = time.monotonic() + self.debounce
+            elif pending and time.monotonic() >= deadline:
+                yield pending
+                pending = set()
+
+    def close(self):
+        self._backend.close()